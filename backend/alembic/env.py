@@ -10,7 +10,7 @@ from alembic import context
 # import Base from your project's database.py
 from app.database import Base
 # Import models so they are registered with Base.metadata
-from app.models import Bet, Transaction
+from app.models import Bet, BetClosure, BetRollup, BetSnapshot, LedgerBucket, Snapshot, SyncWatermark, Transaction
 import os
 
 # this is the Alembic Config object, which provides
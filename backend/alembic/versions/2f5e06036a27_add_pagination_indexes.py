@@ -0,0 +1,34 @@
+"""Add keyset pagination indexes
+
+Revision ID: 2f5e06036a27
+Revises: fdd7d6b4637f
+Create Date: 2026-10-18 11:00:00.000000
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+revision: str = "2f5e06036a27"
+down_revision: Union[str, Sequence[str], None] = "fdd7d6b4637f"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+INDEXES = [
+    ("ix_transactions_date_id", "transactions", ["date", "id"]),
+    ("ix_transactions_bet_id_date_id", "transactions", ["bet_id", "date", "id"]),
+    ("ix_bets_created_at_id", "bets", ["created_at", "id"]),
+    ("ix_bets_status_created_at_id", "bets", ["status", "created_at", "id"]),
+]
+
+
+def upgrade() -> None:
+    # Build concurrently so a large ledger stays writable during the upgrade.
+    with op.get_context().autocommit_block():
+        for name, table, columns in INDEXES:
+            op.create_index(name, table, columns, postgresql_concurrently=True, if_not_exists=True)
+
+
+def downgrade() -> None:
+    with op.get_context().autocommit_block():
+        for name, table, _ in INDEXES:
+            op.drop_index(name, table_name=table, postgresql_concurrently=True, if_exists=True)
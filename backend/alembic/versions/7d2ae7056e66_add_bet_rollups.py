@@ -0,0 +1,72 @@
+"""Add bet rollups table
+
+Revision ID: 7d2ae7056e66
+Revises: 7f9c4b7c1c2a
+Create Date: 2026-10-18 09:00:00.000000
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+revision: str = "7d2ae7056e66"
+down_revision: Union[str, Sequence[str], None] = "7f9c4b7c1c2a"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "bet_rollups",
+        sa.Column("bet_id", sa.UUID(), nullable=False),
+        sa.Column("direct_revenue", sa.Numeric(precision=18, scale=2), nullable=False, server_default="0"),
+        sa.Column("direct_expenses", sa.Numeric(precision=18, scale=2), nullable=False, server_default="0"),
+        sa.Column("total_revenue", sa.Numeric(precision=18, scale=2), nullable=False, server_default="0"),
+        sa.Column("total_expenses", sa.Numeric(precision=18, scale=2), nullable=False, server_default="0"),
+        sa.Column("last_transaction_at", sa.DateTime(), nullable=True),
+        sa.Column("updated_at", sa.DateTime(), nullable=True),
+        sa.ForeignKeyConstraint(["bet_id"], ["bets.id"]),
+        sa.PrimaryKeyConstraint("bet_id"),
+    )
+    # Backfill from the existing ledger; `python -m app.cli rebuild-rollups` does the same at runtime.
+    op.execute(
+        """
+        WITH RECURSIVE subtree AS (
+            SELECT id AS root_id, id AS bet_id FROM bets
+            UNION ALL
+            SELECT subtree.root_id, bets.id FROM bets JOIN subtree ON bets.parent_id = subtree.bet_id
+        ),
+        direct AS (
+            SELECT
+                bet_id,
+                COALESCE(SUM(amount) FILTER (WHERE type = 'REVENUE'), 0) AS revenue,
+                COALESCE(SUM(amount) FILTER (WHERE type = 'EXPENSE'), 0) AS expenses,
+                MAX(date) AS last_transaction_at
+            FROM transactions
+            GROUP BY bet_id
+        ),
+        totals AS (
+            SELECT subtree.root_id, SUM(direct.revenue) AS revenue, SUM(direct.expenses) AS expenses
+            FROM subtree JOIN direct ON direct.bet_id = subtree.bet_id
+            GROUP BY subtree.root_id
+        )
+        INSERT INTO bet_rollups (
+            bet_id, direct_revenue, direct_expenses, total_revenue, total_expenses, last_transaction_at, updated_at
+        )
+        SELECT
+            bets.id,
+            COALESCE(direct.revenue, 0),
+            COALESCE(direct.expenses, 0),
+            COALESCE(totals.revenue, 0),
+            COALESCE(totals.expenses, 0),
+            direct.last_transaction_at,
+            now()
+        FROM bets
+        LEFT JOIN direct ON direct.bet_id = bets.id
+        LEFT JOIN totals ON totals.root_id = bets.id
+        """
+    )
+
+
+def downgrade() -> None:
+    op.drop_table("bet_rollups")
@@ -0,0 +1,50 @@
+"""Add ledger sync dedupe keys and per-source watermarks
+
+Revision ID: a3c5e1f20b7d
+Revises: f7ca49698996
+Create Date: 2026-10-18 15:00:00.000000
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+revision: str = "a3c5e1f20b7d"
+down_revision: Union[str, Sequence[str], None] = "f7ca49698996"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.add_column("transactions", sa.Column("external_id", sa.String(), nullable=True))
+    op.add_column("transactions", sa.Column("dedupe_key", sa.String(length=64), nullable=True))
+    op.create_table(
+        "sync_watermarks",
+        sa.Column("source", sa.String(length=255), nullable=False),
+        sa.Column("watermark", sa.DateTime(), nullable=True),
+        sa.Column("synced_at", sa.DateTime(), nullable=True),
+        sa.PrimaryKeyConstraint("source"),
+    )
+    # Existing rows have no dedupe key; NULLs never conflict, so the build only has to scan.
+    with op.get_context().autocommit_block():
+        op.create_index(
+            "ux_transactions_source_dedupe_key",
+            "transactions",
+            ["source", "dedupe_key"],
+            unique=True,
+            postgresql_concurrently=True,
+            if_not_exists=True,
+        )
+
+
+def downgrade() -> None:
+    with op.get_context().autocommit_block():
+        op.drop_index(
+            "ux_transactions_source_dedupe_key",
+            table_name="transactions",
+            postgresql_concurrently=True,
+            if_exists=True,
+        )
+    op.drop_table("sync_watermarks")
+    op.drop_column("transactions", "dedupe_key")
+    op.drop_column("transactions", "external_id")
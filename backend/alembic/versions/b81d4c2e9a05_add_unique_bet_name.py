@@ -0,0 +1,39 @@
+"""Enforce unique bet names with an index
+
+Revision ID: b81d4c2e9a05
+Revises: a3c5e1f20b7d
+Create Date: 2026-10-18 16:00:00.000000
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+revision: str = "b81d4c2e9a05"
+down_revision: Union[str, Sequence[str], None] = "a3c5e1f20b7d"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # Names were only checked by a racy pre-query, so duplicates may exist: keep the
+    # oldest bet's name and suffix the others with their id before building the index.
+    op.execute(
+        """
+        UPDATE bets
+        SET name = bets.name || ' (' || bets.id || ')'
+        FROM (
+            SELECT id, row_number() OVER (PARTITION BY name ORDER BY created_at, id) AS position
+            FROM bets
+        ) AS ranked
+        WHERE ranked.id = bets.id AND ranked.position > 1
+        """
+    )
+    with op.get_context().autocommit_block():
+        op.create_index(
+            "ux_bets_name", "bets", ["name"], unique=True, postgresql_concurrently=True, if_not_exists=True
+        )
+
+
+def downgrade() -> None:
+    with op.get_context().autocommit_block():
+        op.drop_index("ux_bets_name", table_name="bets", postgresql_concurrently=True, if_exists=True)
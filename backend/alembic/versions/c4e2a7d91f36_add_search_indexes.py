@@ -0,0 +1,50 @@
+"""Add full-text indexes for /v1/search
+
+Revision ID: c4e2a7d91f36
+Revises: b81d4c2e9a05
+Create Date: 2026-10-18 17:00:00.000000
+"""
+from typing import Sequence, Union
+
+import sqlalchemy as sa
+from alembic import op
+
+revision: str = "c4e2a7d91f36"
+down_revision: Union[str, Sequence[str], None] = "b81d4c2e9a05"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# Copied from models.BET_SEARCH_DOCUMENT / TRANSACTION_SEARCH_DOCUMENT; keep them in step.
+INDEXES = [
+    (
+        "ix_bets_search_document",
+        "bets",
+        "setweight(to_tsvector('simple'::regconfig, coalesce(name, '')), 'A') || "
+        "setweight(to_tsvector('simple'::regconfig, coalesce(description, '')), 'B')",
+    ),
+    (
+        "ix_transactions_search_document",
+        "transactions",
+        "setweight(to_tsvector('simple'::regconfig, coalesce(description, '')), 'A') || "
+        "setweight(to_tsvector('simple'::regconfig, coalesce(source, '')), 'B')",
+    ),
+]
+
+
+def upgrade() -> None:
+    with op.get_context().autocommit_block():
+        for name, table, document in INDEXES:
+            op.create_index(
+                name,
+                table,
+                [sa.text(f"({document})")],
+                postgresql_using="gin",
+                postgresql_concurrently=True,
+                if_not_exists=True,
+            )
+
+
+def downgrade() -> None:
+    with op.get_context().autocommit_block():
+        for name, table, _ in INDEXES:
+            op.drop_index(name, table_name=table, postgresql_concurrently=True, if_exists=True)
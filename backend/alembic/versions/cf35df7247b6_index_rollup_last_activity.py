@@ -0,0 +1,22 @@
+"""Index rollup last activity for the dormancy sweeper
+
+Revision ID: cf35df7247b6
+Revises: 2f5e06036a27
+Create Date: 2026-10-18 12:00:00.000000
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+revision: str = "cf35df7247b6"
+down_revision: Union[str, Sequence[str], None] = "2f5e06036a27"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_index("ix_bet_rollups_last_transaction_at", "bet_rollups", ["last_transaction_at"])
+
+
+def downgrade() -> None:
+    op.drop_index("ix_bet_rollups_last_transaction_at", table_name="bet_rollups")
@@ -0,0 +1,61 @@
+"""Add point-in-time bet snapshots
+
+Revision ID: d5f8b3e6a274
+Revises: c4e2a7d91f36
+Create Date: 2026-10-18 18:00:00.000000
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+revision: str = "d5f8b3e6a274"
+down_revision: Union[str, Sequence[str], None] = "c4e2a7d91f36"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "snapshots",
+        sa.Column("id", sa.Integer(), autoincrement=True, nullable=False),
+        sa.Column("taken_at", sa.DateTime(), nullable=False),
+        sa.Column("changed_bets", sa.Integer(), nullable=False),
+        sa.PrimaryKeyConstraint("id"),
+    )
+    op.create_index("ix_snapshots_taken_at", "snapshots", ["taken_at"])
+    op.create_table(
+        "bet_snapshots",
+        sa.Column("bet_id", sa.UUID(), nullable=False),
+        sa.Column("snapshot_id", sa.Integer(), nullable=False),
+        sa.Column("name", sa.String(), nullable=False),
+        sa.Column("description", sa.Text(), nullable=True),
+        sa.Column("budget", sa.Numeric(precision=14, scale=2), nullable=False),
+        sa.Column(
+            "status",
+            postgresql.ENUM("ACTIVE", "DORMANT", "ZOMBIE", "WON", "LOST", name="betstatus", create_type=False),
+            nullable=False,
+        ),
+        sa.Column("flagged", sa.Boolean(), nullable=False),
+        sa.Column("parent_id", sa.UUID(), nullable=True),
+        sa.Column("created_at", sa.DateTime(), nullable=True),
+        sa.Column("updated_at", sa.DateTime(), nullable=True),
+        sa.Column("direct_revenue", sa.Numeric(precision=18, scale=2), nullable=False),
+        sa.Column("direct_expenses", sa.Numeric(precision=18, scale=2), nullable=False),
+        sa.Column("total_revenue", sa.Numeric(precision=18, scale=2), nullable=False),
+        sa.Column("total_expenses", sa.Numeric(precision=18, scale=2), nullable=False),
+        sa.Column("last_transaction_at", sa.DateTime(), nullable=True),
+        sa.Column("health", sa.String(length=16), nullable=False),
+        sa.ForeignKeyConstraint(["bet_id"], ["bets.id"]),
+        sa.ForeignKeyConstraint(["snapshot_id"], ["snapshots.id"]),
+        sa.PrimaryKeyConstraint("bet_id", "snapshot_id"),
+    )
+    op.create_index("ix_bet_snapshots_snapshot_id", "bet_snapshots", ["snapshot_id"])
+
+
+def downgrade() -> None:
+    op.drop_index("ix_bet_snapshots_snapshot_id", table_name="bet_snapshots")
+    op.drop_table("bet_snapshots")
+    op.drop_index("ix_snapshots_taken_at", table_name="snapshots")
+    op.drop_table("snapshots")
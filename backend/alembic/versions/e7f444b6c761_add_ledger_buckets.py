@@ -0,0 +1,52 @@
+"""Add day/month ledger buckets
+
+Revision ID: e7f444b6c761
+Revises: cf35df7247b6
+Create Date: 2026-10-18 13:00:00.000000
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+revision: str = "e7f444b6c761"
+down_revision: Union[str, Sequence[str], None] = "cf35df7247b6"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "ledger_buckets",
+        sa.Column("bet_id", sa.UUID(), nullable=False),
+        sa.Column("granularity", sa.String(length=8), nullable=False),
+        sa.Column("bucket_start", sa.Date(), nullable=False),
+        sa.Column("revenue", sa.Numeric(precision=18, scale=2), nullable=False, server_default="0"),
+        sa.Column("expenses", sa.Numeric(precision=18, scale=2), nullable=False, server_default="0"),
+        sa.Column("transaction_count", sa.Integer(), nullable=False, server_default="0"),
+        sa.ForeignKeyConstraint(["bet_id"], ["bets.id"]),
+        sa.PrimaryKeyConstraint("bet_id", "granularity", "bucket_start"),
+    )
+    op.create_index("ix_ledger_buckets_granularity_start", "ledger_buckets", ["granularity", "bucket_start"])
+    # Backfill from the existing ledger; `python -m app.cli rebuild-buckets` does the same at runtime.
+    for granularity in ("day", "month"):
+        op.execute(
+            f"""
+            INSERT INTO ledger_buckets (bet_id, granularity, bucket_start, revenue, expenses, transaction_count)
+            SELECT
+                bet_id,
+                '{granularity}',
+                date_trunc('{granularity}', date)::date,
+                COALESCE(SUM(amount) FILTER (WHERE type = 'REVENUE'), 0),
+                COALESCE(SUM(amount) FILTER (WHERE type = 'EXPENSE'), 0),
+                COUNT(*)
+            FROM transactions
+            WHERE date IS NOT NULL
+            GROUP BY bet_id, date_trunc('{granularity}', date)::date
+            """
+        )
+
+
+def downgrade() -> None:
+    op.drop_index("ix_ledger_buckets_granularity_start", table_name="ledger_buckets")
+    op.drop_table("ledger_buckets")
@@ -0,0 +1,31 @@
+"""Add indexes for depth-limited tree reads
+
+Revision ID: f7ca49698996
+Revises: e7f444b6c761
+Create Date: 2026-10-18 14:00:00.000000
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+revision: str = "f7ca49698996"
+down_revision: Union[str, Sequence[str], None] = "e7f444b6c761"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+INDEXES = [
+    ("ix_bet_closure_ancestor_depth", "bet_closure", ["ancestor_id", "depth"]),
+    ("ix_bets_parent_id", "bets", ["parent_id"]),
+]
+
+
+def upgrade() -> None:
+    with op.get_context().autocommit_block():
+        for name, table, columns in INDEXES:
+            op.create_index(name, table, columns, postgresql_concurrently=True, if_not_exists=True)
+
+
+def downgrade() -> None:
+    with op.get_context().autocommit_block():
+        for name, table, _ in INDEXES:
+            op.drop_index(name, table_name=table, postgresql_concurrently=True, if_exists=True)
@@ -0,0 +1,45 @@
+"""Add bet closure table
+
+Revision ID: fdd7d6b4637f
+Revises: 7d2ae7056e66
+Create Date: 2026-10-18 10:00:00.000000
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+revision: str = "fdd7d6b4637f"
+down_revision: Union[str, Sequence[str], None] = "7d2ae7056e66"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "bet_closure",
+        sa.Column("ancestor_id", sa.UUID(), nullable=False),
+        sa.Column("descendant_id", sa.UUID(), nullable=False),
+        sa.Column("depth", sa.Integer(), nullable=False),
+        sa.ForeignKeyConstraint(["ancestor_id"], ["bets.id"]),
+        sa.ForeignKeyConstraint(["descendant_id"], ["bets.id"]),
+        sa.PrimaryKeyConstraint("ancestor_id", "descendant_id"),
+    )
+    op.create_index("ix_bet_closure_descendant_depth", "bet_closure", ["descendant_id", "depth"])
+    op.execute(
+        """
+        WITH RECURSIVE paths AS (
+            SELECT id AS ancestor_id, id AS descendant_id, 0 AS depth FROM bets
+            UNION ALL
+            SELECT paths.ancestor_id, bets.id, paths.depth + 1
+            FROM bets JOIN paths ON bets.parent_id = paths.descendant_id
+        )
+        INSERT INTO bet_closure (ancestor_id, descendant_id, depth)
+        SELECT ancestor_id, descendant_id, depth FROM paths
+        """
+    )
+
+
+def downgrade() -> None:
+    op.drop_index("ix_bet_closure_descendant_depth", table_name="bet_closure")
+    op.drop_table("bet_closure")
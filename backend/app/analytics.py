@@ -0,0 +1,256 @@
+"""Declarative analytics over the ledger and bet hierarchy.
+
+A JSON ``AnalyticsSpec`` (filters, group-by dimensions, aggregates, having,
+order and a mandatory limit) compiles to one parameterized ``SELECT`` that
+the database aggregates, so callers such as the Escrow Agent never page
+through ``/v1/transactions`` themselves.
+
+The compiler reads the smallest table that can answer the spec:
+
+* ``month_buckets`` when any date bounds fall on month starts;
+* ``day_buckets`` when they fall on whole days;
+* ``ledger`` (raw transactions) only for what buckets cannot answer: the
+  ``source`` and ``type`` dimensions, a type filter, ``max``, counts of one
+  side of the ledger, or bounds within a day.
+
+Ledger plans must carry a date range of at most ``ANALYTICS_MAX_LEDGER_DAYS``;
+specs that would scan the whole ledger are refused.
+"""
+from __future__ import annotations
+
+import operator
+import os
+from datetime import datetime, time, timedelta
+from typing import Optional
+
+from sqlalchemy import Date, and_, case, cast, func, literal_column, select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import aliased
+
+from . import hierarchy
+from .timeseries import naive_utc
+from .crud import WARNING_THRESHOLD, ZOMBIE_DAYS
+from .models import Bet, BetClosure, BetRollup, BetStatus, LedgerBucket, Transaction, TransactionType
+from .schemas import (
+    AnalyticsComparison,
+    AnalyticsDimension,
+    AnalyticsFunction,
+    AnalyticsMeasure,
+    AnalyticsResult,
+    AnalyticsSpec,
+    BetHealth,
+    TimeGranularity,
+)
+
+ANALYTICS_MAX_LEDGER_DAYS = int(os.getenv("ANALYTICS_MAX_LEDGER_DAYS", "400"))
+
+MONTH_BUCKETS = "month_buckets"
+DAY_BUCKETS = "day_buckets"
+LEDGER = "ledger"
+# Inlined rather than bound, so GROUP BY matches the selected expression.
+MONTH = literal_column("'month'")
+
+COMPARISONS = {
+    AnalyticsComparison.LT: operator.lt,
+    AnalyticsComparison.LE: operator.le,
+    AnalyticsComparison.GT: operator.gt,
+    AnalyticsComparison.GE: operator.ge,
+    AnalyticsComparison.EQ: operator.eq,
+    AnalyticsComparison.NE: operator.ne,
+}
+LEDGER_DIMENSIONS = {AnalyticsDimension.SOURCE, AnalyticsDimension.TYPE}
+ONE_SIDED = {AnalyticsMeasure.REVENUE, AnalyticsMeasure.EXPENSES}
+
+
+def _plan(spec: AnalyticsSpec, start: Optional[datetime], end: Optional[datetime]) -> str:
+    bounds = [moment for moment in (start, end) if moment is not None]
+    needs_ledger = (
+        LEDGER_DIMENSIONS.intersection(spec.group_by)
+        or spec.filters.type is not None
+        or any(
+            aggregate.fn == AnalyticsFunction.MAX
+            or (aggregate.fn == AnalyticsFunction.COUNT and aggregate.measure in ONE_SIDED)
+            for aggregate in spec.aggregates
+        )
+        or any(moment.time() != time.min for moment in bounds)
+    )
+    if needs_ledger:
+        if start is None or end is None or end - start > timedelta(days=ANALYTICS_MAX_LEDGER_DAYS):
+            raise ValueError(
+                f"This spec reads individual transactions: give filters.start and filters.end "
+                f"at most {ANALYTICS_MAX_LEDGER_DAYS} days apart"
+            )
+        return LEDGER
+    if all(moment.day == 1 for moment in bounds):
+        return MONTH_BUCKETS
+    return DAY_BUCKETS
+
+
+def health_expression(now: datetime):
+    """``crud._health_for_bet`` as SQL over ``Bet`` outer-joined to ``BetRollup``."""
+    total_revenue = func.coalesce(BetRollup.total_revenue, 0)
+    total_expenses = func.coalesce(BetRollup.total_expenses, 0)
+    last_activity = func.coalesce(BetRollup.last_transaction_at, Bet.created_at)
+    return case(
+        (
+            and_(
+                last_activity <= now - timedelta(days=ZOMBIE_DAYS),
+                Bet.status.not_in([BetStatus.WON, BetStatus.LOST]),
+            ),
+            BetHealth.ZOMBIE.value,
+        ),
+        (and_(Bet.budget > 0, total_expenses >= Bet.budget * WARNING_THRESHOLD), BetHealth.WARNING.value),
+        (total_revenue > total_expenses, BetHealth.PROFIT.value),
+        (total_expenses > total_revenue, BetHealth.BURN.value),
+        else_=BetHealth.WARNING.value,
+    )
+
+
+class _Facts:
+    """Columns of the table a plan reads, under common names."""
+
+    def __init__(self, plan: str) -> None:
+        self.plan = plan
+        if plan == LEDGER:
+            self.table = Transaction
+            self.bet_id = Transaction.bet_id
+            self.revenue = case((Transaction.type == TransactionType.REVENUE, Transaction.amount), else_=0)
+            self.expenses = case((Transaction.type == TransactionType.EXPENSE, Transaction.amount), else_=0)
+            self.amount = Transaction.amount
+            self.month = cast(func.date_trunc(MONTH, Transaction.date), Date)
+        else:
+            self.table = LedgerBucket
+            self.bet_id = LedgerBucket.bet_id
+            self.revenue = LedgerBucket.revenue
+            self.expenses = LedgerBucket.expenses
+            self.amount = LedgerBucket.revenue + LedgerBucket.expenses
+            if plan == MONTH_BUCKETS:
+                self.month = LedgerBucket.bucket_start
+            else:
+                self.month = cast(func.date_trunc(MONTH, LedgerBucket.bucket_start), Date)
+
+    def measure(self, measure: AnalyticsMeasure):
+        if measure == AnalyticsMeasure.REVENUE:
+            return self.revenue
+        if measure == AnalyticsMeasure.EXPENSES:
+            return self.expenses
+        if measure == AnalyticsMeasure.NET:
+            return self.revenue - self.expenses
+        return self.amount
+
+    def aggregate(self, fn: AnalyticsFunction, measure: AnalyticsMeasure):
+        if fn == AnalyticsFunction.MAX:
+            return func.max(self.measure(measure))
+        if fn == AnalyticsFunction.SUM:
+            return func.coalesce(func.sum(self.measure(measure)), 0)
+        if self.plan != LEDGER:
+            return func.coalesce(func.sum(LedgerBucket.transaction_count), 0)
+        if measure in ONE_SIDED:
+            side = TransactionType.REVENUE if measure == AnalyticsMeasure.REVENUE else TransactionType.EXPENSE
+            return func.count().filter(Transaction.type == side)
+        return func.count()
+
+    def in_range(self, start: Optional[datetime], end: Optional[datetime]) -> list:
+        conditions = []
+        if self.plan == LEDGER:
+            conditions.extend([Transaction.date >= start, Transaction.date < end])
+            return conditions
+        granularity = TimeGranularity.MONTH if self.plan == MONTH_BUCKETS else TimeGranularity.DAY
+        conditions.append(LedgerBucket.granularity == granularity.value)
+        if start is not None:
+            conditions.append(LedgerBucket.bucket_start >= start.date())
+        if end is not None:
+            conditions.append(LedgerBucket.bucket_start < end.date())
+        return conditions
+
+
+def compile_spec(spec: AnalyticsSpec, now: Optional[datetime] = None):
+    """The single ``SELECT`` answering ``spec``, and the plan it reads from."""
+    now = now or datetime.utcnow()
+    filters = spec.filters
+    start, end = naive_utc(filters.start), naive_utc(filters.end)
+    if start is not None and end is not None and start >= end:
+        raise ValueError("filters.start must be before filters.end")
+    if len(set(spec.group_by)) != len(spec.group_by):
+        raise ValueError("group_by lists a dimension twice")
+    if AnalyticsDimension.CHILD in spec.group_by and filters.root_id is None:
+        raise ValueError("Grouping by child needs filters.root_id")
+
+    plan = _plan(spec, start, end)
+    facts = _Facts(plan)
+    query = select().select_from(facts.table)
+    conditions = facts.in_range(start, end)
+
+    dimensions = []
+    needs_bet = AnalyticsDimension.BET in spec.group_by or filters.status or filters.health
+    if needs_bet:
+        query = query.join(Bet, Bet.id == facts.bet_id)
+    if filters.health:
+        query = query.outerjoin(BetRollup, BetRollup.bet_id == Bet.id)
+        conditions.append(health_expression(now).in_([health.value for health in filters.health]))
+    if filters.status:
+        conditions.append(Bet.status.in_(filters.status))
+    if filters.root_id is not None:
+        conditions.append(facts.bet_id.in_(hierarchy.descendant_ids(filters.root_id)))
+    if filters.type is not None:
+        conditions.append(Transaction.type == filters.type)
+
+    for dimension in spec.group_by:
+        if dimension == AnalyticsDimension.BET:
+            dimensions += [facts.bet_id.label("bet_id"), Bet.name.label("bet_name")]
+        elif dimension == AnalyticsDimension.CHILD:
+            # Rows booked on the root itself belong to no child and drop out of the join.
+            closure = aliased(BetClosure, name="child_closure")
+            child = aliased(Bet, name="child")
+            query = query.join(closure, closure.descendant_id == facts.bet_id).join(
+                child, and_(child.id == closure.ancestor_id, child.parent_id == filters.root_id)
+            )
+            dimensions += [child.id.label("child_id"), child.name.label("child_name")]
+        elif dimension == AnalyticsDimension.MONTH:
+            dimensions.append(facts.month.label("month"))
+        elif dimension == AnalyticsDimension.SOURCE:
+            dimensions.append(Transaction.source.label("source"))
+        else:
+            dimensions.append(Transaction.type.label("type"))
+
+    aggregates = {}
+    for aggregate in spec.aggregates:
+        if aggregate.name in aggregates or aggregate.name in {column.name for column in dimensions}:
+            raise ValueError(f"Duplicate column name: {aggregate.name}")
+        aggregates[aggregate.name] = facts.aggregate(aggregate.fn, aggregate.measure).label(aggregate.name)
+    columns = {column.name: column for column in dimensions}
+    columns.update(aggregates)
+
+    having = []
+    for condition in spec.having:
+        if condition.aggregate not in aggregates:
+            raise ValueError(f"having refers to unknown aggregate: {condition.aggregate}")
+        having.append(COMPARISONS[condition.op](aggregates[condition.aggregate].element, condition.value))
+
+    order_by = []
+    for order in spec.order_by:
+        if order.key not in columns:
+            raise ValueError(f"order_by refers to unknown column: {order.key}")
+        column = columns[order.key]
+        order_by.append(column.desc().nulls_last() if order.descending else column.asc().nulls_first())
+    # Dimensions break ties so a limited answer is the same on every run.
+    ordered = {order.key for order in spec.order_by}
+    order_by += [column for column in dimensions if column.name not in ordered]
+
+    query = query.add_columns(*columns.values()).where(*conditions)
+    if dimensions:
+        query = query.group_by(*(column.element for column in dimensions))
+    if having:
+        query = query.having(*having)
+    return query.order_by(*order_by).limit(spec.limit), plan
+
+
+async def run(db: AsyncSession, spec: AnalyticsSpec, query=None, plan: Optional[str] = None) -> AnalyticsResult:
+    if query is None:
+        query, plan = compile_spec(spec)
+    result = await db.execute(query)
+    return AnalyticsResult(
+        plan=plan,
+        columns=list(result.keys()),
+        rows=[dict(row) for row in result.mappings()],
+    )
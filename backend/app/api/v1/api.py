@@ -1,8 +1,13 @@
 from fastapi import APIRouter
 
-from app.api.v1.endpoints import bets, transactions, metrics
+from app.api.v1.endpoints import analytics, bets, transactions, metrics, scenarios, search, snapshots, stream
 
 api_router = APIRouter()
 api_router.include_router(bets.router)
 api_router.include_router(transactions.router)
 api_router.include_router(metrics.router)
+api_router.include_router(scenarios.router)
+api_router.include_router(analytics.router)
+api_router.include_router(search.router)
+api_router.include_router(snapshots.router)
+api_router.include_router(stream.router)
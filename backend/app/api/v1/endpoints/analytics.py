@@ -0,0 +1,23 @@
+from fastapi import APIRouter, Depends, HTTPException
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app import analytics, schemas
+from app.cache import summary_cache
+from app.database import get_read_db
+
+router = APIRouter(
+    prefix="/analytics",
+    tags=["Analytics"],
+)
+
+
+@router.post("/query", response_model=schemas.AnalyticsResult)
+async def run_analytics_query(spec: schemas.AnalyticsSpec, db: AsyncSession = Depends(get_read_db)):
+    """Answer a declarative spec with one aggregate query; see ``app.analytics``."""
+    try:
+        query, plan = analytics.compile_spec(spec)
+    except ValueError as exc:
+        raise HTTPException(status_code=400, detail=str(exc)) from exc
+    return await summary_cache.get_or_compute(
+        ("analytics", spec.model_dump_json()), lambda: analytics.run(db, spec, query, plan), db=db
+    )
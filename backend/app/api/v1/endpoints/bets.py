@@ -1,11 +1,19 @@
+from datetime import datetime
 from typing import List, Optional
 from uuid import UUID
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response, status
+from fastapi.responses import StreamingResponse
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from app import crud, schemas
+from app import crud, export, schemas, serialization, snapshots, sweeper
+from app.timeseries import naive_utc
+from app.cache import summary_cache
 from app.models import BetStatus
-from app.database import get_db
+from app.database import get_db, get_read_db, read_session_factory
+from app.pagination import NEXT_CURSOR_HEADER, encode_cursor
+
+SNAPSHOT_ID_HEADER = "X-Snapshot-Id"
+SNAPSHOT_TAKEN_AT_HEADER = "X-Snapshot-Taken-At"
 
 router = APIRouter(
     prefix="/bets",
@@ -14,58 +22,138 @@ router = APIRouter(
 )
 
 @router.get("/tree", response_model=List[schemas.BetTree])
-async def get_full_tree(db: AsyncSession = Depends(get_db)):
-    try:
-        return await crud.get_full_bet_tree(db)
-    except Exception as e:
-        import traceback
-        traceback.print_exc()
-        raise HTTPException(status_code=500, detail=f"INTERNAL ERROR DEBUG: {str(e)} Type: {type(e).__name__}")
+async def get_full_tree(
+    request: Request,
+    response: Response,
+    stream: bool = False,
+    depth: Optional[int] = Query(None, ge=0),
+    root: Optional[UUID] = None,
+    as_of: Optional[datetime] = None,
+    db: AsyncSession = Depends(get_read_db),
+):
+    if as_of is not None:
+        if depth is not None or root is not None:
+            raise HTTPException(status_code=400, detail="as_of cannot be combined with depth or root")
+        # Served from the latest snapshot taken at or before ``as_of``.
+        return await _tree_as_of(response, db, as_of)
+    if depth is not None or root is not None:
+        # A slice: nodes from each root (or ``root``) down to ``depth``, with child counts.
+        return await _tree_slice(request, response, db, depth, root)
+    not_modified = summary_cache.conditional(request, response, ("tree",))
+    if not_modified:
+        return not_modified
+    if stream:
+        tree = await crud.get_full_bet_tree(db)
+        return StreamingResponse(
+            serialization.iter_forest(tree), media_type=serialization.MEDIA_TYPE, headers=response.headers
+        )
+    body = await crud.get_full_bet_tree_json(db)
+    return Response(body, media_type=serialization.MEDIA_TYPE, headers=response.headers)
+
+async def _tree_slice(
+    request: Request,
+    response: Response,
+    db: AsyncSession,
+    depth: Optional[int],
+    root: Optional[UUID],
+    children_only: bool = False,
+):
+    key = crud.tree_slice_key(depth, root, children_only)
+    not_modified = summary_cache.conditional(request, response, key)
+    if not_modified:
+        return not_modified
+    body = await crud.get_tree_slice_json(db, depth, root, children_only)
+    if body is None:
+        raise HTTPException(status_code=404, detail="Bet not found")
+    return Response(body, media_type=serialization.MEDIA_TYPE, headers=response.headers)
+
+async def _tree_as_of(response: Response, db: AsyncSession, as_of: datetime):
+    found = await snapshots.get_tree_as_of_json(db, naive_utc(as_of))
+    if found is None:
+        raise HTTPException(status_code=404, detail="No snapshot taken at or before as_of")
+    snapshot, body = found
+    response.headers[SNAPSHOT_ID_HEADER] = str(snapshot.id)
+    response.headers[SNAPSHOT_TAKEN_AT_HEADER] = snapshot.taken_at.isoformat()
+    return Response(body, media_type=serialization.MEDIA_TYPE, headers=response.headers)
 
 @router.get("/tree/{bet_id}", response_model=schemas.BetTree)
-async def get_bet_subtree(bet_id: UUID, db: AsyncSession = Depends(get_db)):
+async def get_bet_subtree(bet_id: UUID, db: AsyncSession = Depends(get_read_db)):
     bet = await crud.get_bet_tree(db, bet_id)
     if bet is None:
         raise HTTPException(status_code=404, detail="Bet not found")
-    return bet
+    return Response(serialization.encode_tree(bet), media_type=serialization.MEDIA_TYPE)
 
 @router.get("/root", response_model=List[schemas.BetInDB])
-async def get_root_bets(db: AsyncSession = Depends(get_db)):
+async def get_root_bets(db: AsyncSession = Depends(get_read_db)):
     return await crud.get_root_bets(db)
 
 @router.post("/", response_model=schemas.BetInDB, status_code=status.HTTP_201_CREATED)
 async def create_bet(bet: schemas.BetCreate, db: AsyncSession = Depends(get_db)):
-    db_bet = await crud.get_bet_by_name(db, name=bet.name)
-    if db_bet:
-        raise HTTPException(status_code=400, detail="Bet with this name already registered")
     try:
         return await crud.create_bet(db=db, bet=bet)
     except ValueError as exc:
         raise HTTPException(status_code=400, detail=str(exc)) from exc
 
+@router.post("/dormancy/sweep", response_model=schemas.DormancySweepResult)
+async def sweep_dormancy():
+    return await sweeper.sweep_once()
+
 @router.get("/", response_model=List[schemas.BetSummary])
 async def read_bets(
+    request: Request,
+    response: Response,
     skip: int = 0, 
     limit: int = 100, 
     status: Optional[BetStatus] = None, 
-    db: AsyncSession = Depends(get_db)
+    after: Optional[str] = None,
+    db: AsyncSession = Depends(get_read_db)
 ):
+    not_modified = summary_cache.conditional(request, response, ("bets", skip, limit, status, after))
+    if not_modified:
+        return not_modified
     try:
-        return await crud.get_bet_summaries(db, skip=skip, limit=limit, status=status)
-    except Exception as e:
-        import traceback
-        traceback.print_exc()
-        raise HTTPException(status_code=500, detail=f"INTERNAL ERROR DEBUG: {str(e)} Type: {type(e).__name__}")
+        bets = await crud.get_bet_summaries(db, skip=skip, limit=limit, status=status, after=after)
+    except ValueError as exc:
+        raise HTTPException(status_code=400, detail=str(exc)) from exc
+    if bets and len(bets) == limit:
+        response.headers[NEXT_CURSOR_HEADER] = encode_cursor(bets[-1].created_at, bets[-1].id)
+    return bets
+
+@router.get("/export", response_class=StreamingResponse)
+async def export_bets(
+    request: Request,
+    format: schemas.ExportFormat = schemas.ExportFormat.CSV,
+    root: Optional[UUID] = None,
+):
+    query = export.bet_export_query(root)
+    return StreamingResponse(
+        export.stream_export(
+            query, export.BET_COLUMNS, export.bet_record_factory(), format, read_session_factory(request)
+        ),
+        media_type=export.MEDIA_TYPES[format],
+        headers={"Content-Disposition": f'attachment; filename="bets.{format.value}"'},
+    )
 
 @router.get("/{bet_id}", response_model=schemas.BetSummary)
-async def read_bet(bet_id: UUID, db: AsyncSession = Depends(get_db)):
+async def read_bet(bet_id: UUID, db: AsyncSession = Depends(get_read_db)):
     summary = await crud.get_bet_summary(db, bet_id)
     if summary is None:
         raise HTTPException(status_code=404, detail="Bet not found")
     return summary
 
+@router.get("/{bet_id}/children", response_model=List[schemas.BetTreeNode])
+async def expand_bet(
+    bet_id: UUID,
+    request: Request,
+    response: Response,
+    depth: int = Query(1, ge=1),
+    db: AsyncSession = Depends(get_read_db),
+):
+    """The next ``depth`` levels below a bet, for expanding a node of a tree slice."""
+    return await _tree_slice(request, response, db, depth, bet_id, children_only=True)
+
 @router.get("/{bet_id}/financials", response_model=schemas.BetFinancials)
-async def get_bet_financials(bet_id: UUID, db: AsyncSession = Depends(get_db)):
+async def get_bet_financials(bet_id: UUID, db: AsyncSession = Depends(get_read_db)):
     financials = await crud.get_bet_financials(db, bet_id=bet_id)
     if financials is None:
         raise HTTPException(status_code=404, detail="Bet not found")
@@ -1,8 +1,12 @@
-from fastapi import APIRouter, Depends
+from datetime import date
+from typing import List, Optional
+from uuid import UUID
+from fastapi import APIRouter, Depends, Query, Request, Response
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from app import crud, schemas
-from app.database import get_db
+from app import crud, runway, schemas, timeseries
+from app.cache import summary_cache
+from app.database import get_read_db
 
 router = APIRouter(
     prefix="/metrics",
@@ -11,5 +15,33 @@ router = APIRouter(
 
 
 @router.get("/summary", response_model=schemas.SummaryMetrics)
-async def get_summary(db: AsyncSession = Depends(get_db)):
+async def get_summary(request: Request, response: Response, db: AsyncSession = Depends(get_read_db)):
+    not_modified = summary_cache.conditional(request, response, ("metrics",))
+    if not_modified:
+        return not_modified
     return await crud.get_summary_metrics(db)
+
+
+@router.get("/timeseries", response_model=List[schemas.BetTimeseries])
+async def get_timeseries(
+    granularity: schemas.TimeGranularity = schemas.TimeGranularity.DAY,
+    bet_id: Optional[UUID] = None,
+    start: Optional[date] = None,
+    end: Optional[date] = None,
+    db: AsyncSession = Depends(get_read_db),
+):
+    return await timeseries.get_timeseries(db, granularity, bet_id=bet_id, start=start, end=end)
+
+
+@router.get("/runway", response_model=List[schemas.RunwayNode])
+async def get_runway(
+    request: Request,
+    response: Response,
+    window_days: int = Query(runway.RUNWAY_WINDOW_DAYS, ge=1, le=730),
+    db: AsyncSession = Depends(get_read_db),
+):
+    key = ("runway", window_days)
+    not_modified = summary_cache.conditional(request, response, key)
+    if not_modified:
+        return not_modified
+    return await summary_cache.get_or_compute(key, lambda: runway.get_runway(db, window_days), db=db)
@@ -0,0 +1,67 @@
+from typing import List
+from uuid import UUID
+from fastapi import APIRouter, Depends, HTTPException, Response, status
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app import schemas, scenarios
+from app.database import get_db
+from app.scenarios import scenario_store
+
+router = APIRouter(
+    prefix="/scenarios",
+    tags=["Scenarios"],
+    responses={404: {"description": "Scenario not found"}},
+)
+
+
+def _get_scenario(scenario_id: UUID) -> scenarios.Scenario:
+    scenario = scenario_store.get(scenario_id)
+    if scenario is None:
+        raise HTTPException(status_code=404, detail="Scenario not found")
+    return scenario
+
+
+@router.post("/", response_model=schemas.Scenario, status_code=status.HTTP_201_CREATED)
+async def create_scenario(payload: schemas.ScenarioCreate, db: AsyncSession = Depends(get_db)):
+    scenario = scenarios.Scenario(await scenarios.load_base(db), name=payload.name)
+    try:
+        scenario.apply(payload.changes)
+    except ValueError as exc:
+        raise HTTPException(status_code=400, detail=str(exc)) from exc
+    scenario_store.add(scenario)
+    return scenario.to_schema()
+
+
+@router.get("/{scenario_id}", response_model=schemas.Scenario)
+async def read_scenario(scenario_id: UUID):
+    return _get_scenario(scenario_id).to_schema()
+
+
+@router.post("/{scenario_id}/changes", response_model=schemas.Scenario)
+async def apply_changes(scenario_id: UUID, changes: List[schemas.ScenarioChange]):
+    scenario = _get_scenario(scenario_id)
+    try:
+        scenario.apply(changes)
+    except ValueError as exc:
+        raise HTTPException(status_code=400, detail=str(exc)) from exc
+    return scenario.to_schema()
+
+
+@router.post("/{scenario_id}/commit", response_model=List[schemas.BetInDB])
+async def commit_scenario(scenario_id: UUID, db: AsyncSession = Depends(get_db)):
+    # Taken out of the store for the duration so the same draft cannot be committed twice.
+    scenario = scenario_store.pop(scenario_id)
+    if scenario is None:
+        raise HTTPException(status_code=404, detail="Scenario not found")
+    try:
+        return await scenario.commit(db)
+    except ValueError as exc:
+        scenario_store.add(scenario)
+        raise HTTPException(status_code=400, detail=str(exc)) from exc
+
+
+@router.delete("/{scenario_id}", status_code=status.HTTP_204_NO_CONTENT)
+async def discard_scenario(scenario_id: UUID):
+    if scenario_store.pop(scenario_id) is None:
+        raise HTTPException(status_code=404, detail="Scenario not found")
+    return Response(status_code=status.HTTP_204_NO_CONTENT)
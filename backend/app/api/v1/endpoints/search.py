@@ -0,0 +1,32 @@
+from typing import List, Optional
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app import schemas, search
+from app.cache import summary_cache
+from app.database import get_read_db
+
+router = APIRouter(
+    prefix="/search",
+    tags=["Search"],
+)
+
+
+@router.get("", response_model=List[schemas.SearchHit])
+async def search_bets_and_ledger(
+    request: Request,
+    response: Response,
+    q: str = Query(..., min_length=1, max_length=200),
+    kind: Optional[schemas.SearchKind] = None,
+    skip: int = Query(0, ge=0, le=search.SEARCH_MAX_CANDIDATES),
+    limit: int = Query(20, ge=1, le=100),
+    db: AsyncSession = Depends(get_read_db),
+):
+    """Bets and transactions whose text contains every word of ``q`` as a prefix, best match first."""
+    not_modified = summary_cache.conditional(request, response, ("search", q, kind, skip, limit))
+    if not_modified:
+        return not_modified
+    try:
+        return await search.search(db, q, kind=kind, skip=skip, limit=limit)
+    except ValueError as exc:
+        raise HTTPException(status_code=400, detail=str(exc)) from exc
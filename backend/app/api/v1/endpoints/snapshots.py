@@ -0,0 +1,36 @@
+from typing import List, Optional
+from fastapi import APIRouter, Depends, HTTPException, Query, status
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app import schemas, snapshots
+from app.database import get_db, get_read_db
+
+router = APIRouter(
+    prefix="/snapshots",
+    tags=["Snapshots"],
+)
+
+
+@router.post("/", response_model=schemas.SnapshotInfo, status_code=status.HTTP_201_CREATED)
+async def take_snapshot(db: AsyncSession = Depends(get_db)):
+    return await snapshots.take_snapshot(db)
+
+
+@router.get("/", response_model=List[schemas.SnapshotInfo])
+async def list_snapshots(limit: int = Query(50, ge=1, le=500), db: AsyncSession = Depends(get_read_db)):
+    return await snapshots.list_snapshots(db, limit=limit)
+
+
+@router.get("/diff", response_model=schemas.SnapshotDiff)
+async def diff_snapshots(
+    base: int,
+    target: Optional[int] = Query(None, description="Defaults to the latest snapshot"),
+    db: AsyncSession = Depends(get_read_db),
+):
+    try:
+        result = await snapshots.diff(db, base, target)
+    except ValueError as exc:
+        raise HTTPException(status_code=400, detail=str(exc)) from exc
+    if result is None:
+        raise HTTPException(status_code=404, detail="Snapshot not found")
+    return result
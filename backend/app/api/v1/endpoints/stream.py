@@ -0,0 +1,47 @@
+from typing import AsyncIterator, Optional
+from fastapi import APIRouter, Header, Request
+from fastapi.responses import StreamingResponse
+
+from app.events import STREAM_HEARTBEAT_SECONDS, Subscriber, stream_broker
+
+router = APIRouter(
+    prefix="/stream",
+    tags=["Stream"],
+)
+
+MEDIA_TYPE = "text/event-stream"
+
+
+async def _event_stream(request: Request, subscriber: Subscriber) -> AsyncIterator[bytes]:
+    try:
+        yield b"retry: 3000\n\n"
+        while True:
+            frames = await subscriber.next_frames(STREAM_HEARTBEAT_SECONDS)
+            if await request.is_disconnected():
+                break
+            yield b"".join(frames) if frames else b": keepalive\n\n"
+            if subscriber.overflowed:
+                # Too far behind; the client reconnects with Last-Event-ID and replays from the backlog.
+                break
+    finally:
+        stream_broker.unsubscribe(subscriber)
+
+
+@router.get("", response_class=StreamingResponse)
+async def stream_deltas(
+    request: Request,
+    after: Optional[str] = None,
+    last_event_id: Optional[str] = Header(None),
+):
+    """Server-sent ``delta`` events for committed writes, with the changed node and its ancestor chain.
+
+    Resume with the ``Last-Event-ID`` header (sent automatically by ``EventSource``)
+    or ``?after=<event id>``. A ``resync`` event means deltas were missed and the
+    tree should be refetched.
+    """
+    subscriber = stream_broker.subscribe(last_event_id or after)
+    return StreamingResponse(
+        _event_stream(request, subscriber),
+        media_type=MEDIA_TYPE,
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
@@ -1,10 +1,18 @@
 from typing import List, Optional
 from uuid import UUID
-from fastapi import APIRouter, Depends, HTTPException, status
+import os
+from datetime import datetime
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response, status
+from fastapi.responses import StreamingResponse
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from app import crud, schemas
-from app.database import get_db
+from app import crud, export, ingest, schemas, sync
+from app.database import get_db, get_read_db, read_session_factory
+from app.pagination import NEXT_CURSOR_HEADER, encode_cursor
+from app.timeseries import naive_utc
+
+BULK_MAX_ROWS = int(os.getenv("BULK_MAX_ROWS", "200000"))
+BULK_MAX_BYTES = int(os.getenv("BULK_MAX_BYTES", str(64 * 1024 * 1024)))
 
 router = APIRouter(
     prefix="/transactions",
@@ -12,38 +20,123 @@ router = APIRouter(
     responses={404: {"description": "Transaction not found"}},
 )
 
+async def _read_upload(request: Request) -> bytes:
+    """The request body, refused with a 413 once it passes ``BULK_MAX_BYTES``."""
+    too_large = HTTPException(
+        status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
+        detail=f"Uploads are limited to {BULK_MAX_BYTES} bytes",
+    )
+    declared = request.headers.get("content-length")
+    if declared is not None and declared.isdigit() and int(declared) > BULK_MAX_BYTES:
+        raise too_large
+    body = bytearray()
+    async for chunk in request.stream():
+        body += chunk
+        if len(body) > BULK_MAX_BYTES:
+            raise too_large
+    return bytes(body)
+
 @router.post("/", response_model=schemas.TransactionOut, status_code=status.HTTP_201_CREATED)
 async def create_transaction(transaction: schemas.TransactionCreate, db: AsyncSession = Depends(get_db)):
-    # Optional: Check if bet_id exists
-    bet = await crud.get_bet(db, transaction.bet_id)
-    if not bet:
+    created = await crud.create_transaction(db=db, transaction=transaction)
+    if created is None:
         raise HTTPException(status_code=404, detail=f"Bet with id {transaction.bet_id} not found")
-    
-    db_tx = await crud.create_transaction(db=db, transaction=transaction)
-    return schemas.TransactionOut(
-        id=db_tx.id,
-        bet_id=db_tx.bet_id,
-        amount=db_tx.amount,
-        type=db_tx.type,
-        description=db_tx.description,
-        source=db_tx.source,
-        date=db_tx.date,
-        created_at=db_tx.created_at,
-        updated_at=db_tx.updated_at,
-        bet_name=bet.name,
+    return created
+
+@router.post("/bulk", response_model=schemas.BulkTransactionResult)
+async def bulk_create_transactions(request: Request, db: AsyncSession = Depends(get_db)):
+    """Ingest a JSON array, NDJSON (`application/x-ndjson`) or CSV (`text/csv`) body.
+
+    Valid rows are inserted in one DB transaction; invalid rows are reported by index.
+    """
+    body = await _read_upload(request)
+    try:
+        rows = list(ingest.parse_rows(body, request.headers.get("content-type", "application/json")))
+    except ValueError as exc:
+        raise HTTPException(status_code=400, detail=str(exc)) from exc
+    if len(rows) > BULK_MAX_ROWS:
+        raise HTTPException(
+            status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
+            detail=f"Bulk uploads are limited to {BULK_MAX_ROWS} rows",
+        )
+
+    valid, errors = ingest.validate_rows(rows)
+    inserted, insert_errors = await crud.bulk_create_transactions(db, valid)
+    errors = sorted(errors + insert_errors)
+    return schemas.BulkTransactionResult(
+        received=len(rows),
+        inserted=inserted,
+        errors=[schemas.BulkRowError(index=index, error=error) for index, error in errors],
     )
 
+@router.post("/sync", response_model=schemas.SyncResult)
+async def sync_transactions(
+    request: Request,
+    source: str = Query(..., min_length=1, max_length=255),
+    db: AsyncSession = Depends(get_db),
+):
+    """Incrementally import an export from ``source`` (same body formats as `/bulk`).
+
+    Rows need a `date` and may carry the exporter's `external_id`. Rows older than
+    the source's watermark are skipped and rows already imported are ignored, so
+    overlapping exports can be re-sent safely.
+    """
+    body = await _read_upload(request)
+    try:
+        rows = list(ingest.parse_rows(body, request.headers.get("content-type", "application/json")))
+    except ValueError as exc:
+        raise HTTPException(status_code=400, detail=str(exc)) from exc
+    if len(rows) > BULK_MAX_ROWS:
+        raise HTTPException(
+            status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
+            detail=f"Sync uploads are limited to {BULK_MAX_ROWS} rows",
+        )
+    return await sync.sync_rows(db, source, rows)
+
 @router.get("/", response_model=List[schemas.TransactionOut])
 async def read_transactions(
+    response: Response,
     bet_id: Optional[UUID] = None,
     skip: int = 0,
     limit: int = 100,
-    db: AsyncSession = Depends(get_db)
+    after: Optional[str] = None,
+    db: AsyncSession = Depends(get_read_db)
+):
+    try:
+        items = await crud.get_transactions_with_bet(db, bet_id=bet_id, skip=skip, limit=limit, after=after)
+    except ValueError as exc:
+        raise HTTPException(status_code=400, detail=str(exc)) from exc
+    if items and len(items) == limit:
+        response.headers[NEXT_CURSOR_HEADER] = encode_cursor(items[-1].date, items[-1].id)
+    return items
+
+@router.get("/export", response_class=StreamingResponse)
+async def export_transactions(
+    request: Request,
+    format: schemas.ExportFormat = schemas.ExportFormat.CSV,
+    bet_id: Optional[UUID] = None,
+    include_descendants: bool = True,
+    start: Optional[datetime] = None,
+    end: Optional[datetime] = None,
 ):
-    return await crud.get_transactions_with_bet(db, bet_id=bet_id, skip=skip, limit=limit)
+    # Checked before streaming starts: once the headers are sent an error can only cut the body short.
+    try:
+        start, end = naive_utc(start), naive_utc(end)
+    except OverflowError as exc:
+        raise HTTPException(status_code=400, detail=f"start/end out of range: {exc}") from exc
+    if start is not None and end is not None and start >= end:
+        raise HTTPException(status_code=400, detail="start must be before end")
+    query = export.transaction_export_query(bet_id, include_descendants, start, end)
+    return StreamingResponse(
+        export.stream_export(
+            query, export.TRANSACTION_COLUMNS, export.transaction_record, format, read_session_factory(request)
+        ),
+        media_type=export.MEDIA_TYPES[format],
+        headers={"Content-Disposition": f'attachment; filename="transactions.{format.value}"'},
+    )
 
 @router.get("/{transaction_id}", response_model=schemas.TransactionInDB)
-async def read_transaction(transaction_id: UUID, db: AsyncSession = Depends(get_db)):
+async def read_transaction(transaction_id: UUID, db: AsyncSession = Depends(get_read_db)):
     db_transaction = await crud.get_transaction(db, transaction_id=transaction_id)
     if db_transaction is None:
         raise HTTPException(status_code=404, detail="Transaction not found")
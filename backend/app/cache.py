@@ -0,0 +1,178 @@
+"""In-process cache for computed summaries, keyed by a write generation.
+
+Every write path in ``crud`` calls ``summary_cache.bump()`` after it commits,
+which invalidates all entries at once. Entries also expire after
+``SUMMARY_CACHE_TTL_SECONDS`` so time-derived fields (inactive days, dormancy)
+and writes made by other worker processes are picked up.
+
+Misses are single-flight: concurrent callers asking for the same key in the
+same generation await the first caller's computation instead of each running
+their own.
+
+Values computed on a replica session (``database.read_session`` marks it in
+``session.info``) are cached under their own key. A lagging replica can then
+never answer for the primary within a generation.
+"""
+from __future__ import annotations
+
+import asyncio
+import hashlib
+import os
+import time
+import uuid
+from collections import OrderedDict
+from typing import Any, Awaitable, Callable, Hashable, Optional
+
+from fastapi import Request, Response, status
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from . import telemetry
+
+SUMMARY_CACHE_SIZE = int(os.getenv("SUMMARY_CACHE_SIZE", "256"))
+SUMMARY_CACHE_TTL_SECONDS = float(os.getenv("SUMMARY_CACHE_TTL_SECONDS", "30"))
+SUMMARY_CACHE_COALESCE = os.getenv("SUMMARY_CACHE_COALESCE", "true").lower() in ("1", "true", "yes")
+# ``session.info`` key naming the database a read session is bound to.
+READ_TARGET = "read_target"
+REPLICA = "replica"
+
+CACHE_LOOKUPS = telemetry.Counter(
+    "betmetric_summary_cache_lookups_total",
+    "Summary cache lookups by key kind and outcome (hit, miss = computed, coalesced = joined an in-flight miss).",
+    ("kind", "result"),
+)
+
+
+# Tells a miss from a cached ``None`` (e.g. a tree slice for a root that does not exist).
+_MISSING = object()
+
+
+def _kind(key: Hashable) -> str:
+    return str(key[0]) if isinstance(key, tuple) and key else str(key)
+
+
+def _routed(key: Hashable, db: Optional[AsyncSession]) -> Hashable:
+    if db is None or db.info.get(READ_TARGET) != REPLICA:
+        return key
+    return (*key, REPLICA) if isinstance(key, tuple) else (key, REPLICA)
+
+
+class SummaryCache:
+    def __init__(self, max_entries: int, ttl_seconds: float, coalesce: bool = True) -> None:
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self.coalesce = coalesce
+        self.generation = 0
+        self.bumped_at = float("-inf")  # time.monotonic() of the last bump
+        # Distinguishes ETags issued by different worker processes sharing a generation number.
+        self._instance = uuid.uuid4().hex[:8]
+        self._entries: OrderedDict[Hashable, tuple[int, int, Any]] = OrderedDict()
+        self._in_flight: dict[tuple[Hashable, int], asyncio.Future] = {}
+
+    @property
+    def in_flight(self) -> int:
+        return len(self._in_flight)
+
+    def _window(self) -> int:
+        if self.ttl_seconds <= 0:
+            return 0
+        return int(time.time() // self.ttl_seconds)
+
+    def bump(self) -> None:
+        self.generation += 1
+        self.bumped_at = time.monotonic()
+        self._entries.clear()
+
+    def invalidate(self) -> None:
+        self.bump()
+
+    def get(self, key: Hashable, default: Any = None) -> Any:
+        entry = self._entries.get(key)
+        if entry is None:
+            return default
+        generation, window, value = entry
+        if generation != self.generation or window != self._window():
+            del self._entries[key]
+            return default
+        self._entries.move_to_end(key)
+        return value
+
+    def set(self, key: Hashable, value: Any, generation: int) -> None:
+        if generation != self.generation:
+            return
+        self._entries[key] = (generation, self._window(), value)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    async def get_or_compute(
+        self, key: Hashable, compute: Callable[[], Awaitable[Any]], db: Optional[AsyncSession] = None
+    ) -> Any:
+        """Cached value of ``compute()``; pass the session it reads so replica results stay apart."""
+        key = _routed(key, db)
+        cached = self.get(key, _MISSING)
+        if cached is not _MISSING:
+            CACHE_LOOKUPS.inc(kind=_kind(key), result="hit")
+            return cached
+        generation = self.generation
+        flight = (key, generation)
+
+        shared = self._in_flight.get(flight)
+        if shared is not None:
+            try:
+                # Shielded so a follower's cancellation does not cancel the shared result.
+                value = await asyncio.shield(shared)
+            except asyncio.CancelledError:
+                if not shared.cancelled():
+                    raise
+                # The computing caller was cancelled; take over.
+                return await self.get_or_compute(key, compute)
+            CACHE_LOOKUPS.inc(kind=_kind(key), result="coalesced")
+            return value
+
+        CACHE_LOOKUPS.inc(kind=_kind(key), result="miss")
+        if not self.coalesce:
+            value = await compute()
+            self.set(key, value, generation)
+            return value
+
+        future = asyncio.get_running_loop().create_future()
+        # Followers re-raise the error themselves; this only marks it retrieved when there are none.
+        future.add_done_callback(lambda done: done.cancelled() or done.exception())
+        self._in_flight[flight] = future
+        try:
+            value = await compute()
+        except Exception as exc:
+            future.set_exception(exc)
+            raise
+        else:
+            future.set_result(value)
+        finally:
+            del self._in_flight[flight]
+            if not future.done():
+                # Cancelled: followers see a cancelled future and compute for themselves.
+                future.cancel()
+        self.set(key, value, generation)
+        return value
+
+    def etag(self, key: Hashable) -> str:
+        digest = hashlib.sha1(repr(key).encode()).hexdigest()[:12]
+        return f'W/"{self._instance}.{self.generation}.{self._window()}.{digest}"'
+
+    def conditional(self, request: Request, response: Response, key: Hashable) -> Optional[Response]:
+        """Tag ``response`` with the current ETag; return a 304 if the client already has it."""
+        etag = self.etag(key)
+        headers = {"ETag": etag, "Cache-Control": "no-cache"}
+        response.headers.update(headers)
+
+        if_none_match = request.headers.get("if-none-match")
+        if if_none_match:
+            candidates = {candidate.strip() for candidate in if_none_match.split(",")}
+            if "*" in candidates or etag in candidates or etag.removeprefix("W/") in candidates:
+                return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=headers)
+        return None
+
+
+summary_cache = SummaryCache(SUMMARY_CACHE_SIZE, SUMMARY_CACHE_TTL_SECONDS, SUMMARY_CACHE_COALESCE)
+telemetry.GaugeFunction(
+    "betmetric_summary_cache_in_flight", "Summary computations currently being shared.", lambda: summary_cache.in_flight
+)
@@ -0,0 +1,74 @@
+"""Maintenance commands, run as ``python -m app.cli <command>``."""
+import argparse
+import asyncio
+from pathlib import Path
+
+from app import crud, sweeper, sync
+from app.database import AsyncSessionLocal
+
+
+async def rebuild_rollups(args: argparse.Namespace) -> None:
+    async with AsyncSessionLocal() as session:
+        count = await crud.rebuild_rollups(session)
+    print(f"Rebuilt rollups for {count} bets")
+
+
+async def rebuild_buckets(args: argparse.Namespace) -> None:
+    async with AsyncSessionLocal() as session:
+        await crud.rebuild_ledger_buckets(session)
+    print("Rebuilt ledger buckets")
+
+
+async def verify_rollups(args: argparse.Namespace) -> None:
+    async with AsyncSessionLocal() as session:
+        mismatched = await crud.verify_rollups(session)
+    for bet_id in mismatched:
+        print(f"Rollup drift: {bet_id}")
+    if mismatched:
+        raise SystemExit(1)
+    print("Rollups match the ledger")
+
+
+async def sweep_dormancy(args: argparse.Namespace) -> None:
+    result = await sweeper.sweep_once()
+    print(f"Dormancy sweep: {result.zombified} zombified, {result.revived} revived")
+
+
+async def sync_ledger(args: argparse.Namespace) -> None:
+    async with AsyncSessionLocal() as session:
+        result = await sync.sync_file(session, args.source, args.path)
+    for error in result.errors:
+        print(f"Row {error.index}: {error.error}")
+    print(
+        f"Synced {args.source}: {result.inserted} inserted, {result.duplicates} duplicates, "
+        f"{result.skipped} before watermark, {len(result.errors)} rejected; watermark {result.watermark}"
+    )
+
+
+def main(argv=None) -> None:
+    parser = argparse.ArgumentParser(prog="python -m app.cli", description="BetMetric maintenance commands")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    rebuild = subparsers.add_parser("rebuild-rollups", help="Recompute bet_rollups from the ledger")
+    rebuild.set_defaults(handler=rebuild_rollups)
+
+    buckets = subparsers.add_parser("rebuild-buckets", help="Recompute ledger_buckets from the ledger")
+    buckets.set_defaults(handler=rebuild_buckets)
+
+    verify = subparsers.add_parser("verify-rollups", help="Compare bet_rollups against a fresh ledger recompute")
+    verify.set_defaults(handler=verify_rollups)
+
+    sweep = subparsers.add_parser("sweep-dormancy", help="Flip ACTIVE/ZOMBIE statuses from last activity")
+    sweep.set_defaults(handler=sweep_dormancy)
+
+    ledger_sync = subparsers.add_parser("sync-ledger", help="Incrementally import a bank/CSV export file")
+    ledger_sync.add_argument("source", help="Export source name; each source keeps its own watermark")
+    ledger_sync.add_argument("path", type=Path, help="CSV, NDJSON (.ndjson/.jsonl) or JSON array file")
+    ledger_sync.set_defaults(handler=sync_ledger)
+
+    args = parser.parse_args(argv)
+    asyncio.run(args.handler(args))
+
+
+if __name__ == "__main__":
+    main()
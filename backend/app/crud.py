@@ -1,28 +1,45 @@
 from __future__ import annotations
 
+import os
+import uuid
 from datetime import datetime, timedelta
 from decimal import Decimal
 from typing import Dict, List, Optional
 from uuid import UUID
 
-from sqlalchemy import func, select
+from sqlalchemy import and_, delete, exists, func, insert, literal, or_, select, text, union_all, update
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.exc import DBAPIError, IntegrityError
 from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import aliased
 
-from .models import Bet, Transaction, BetStatus, TransactionType
+from . import hierarchy, ledger, pagination, rollups, serialization, telemetry, timeseries
+from .cache import summary_cache
+from .events import stream_broker
+from .models import Bet, BetClosure, BetRollup, SyncWatermark, Transaction, BetStatus, TransactionType
 from .schemas import (
     BetCreate,
     BetUpdate,
     BetFinancials,
     BetSummary,
     BetTree,
+    BetTreeNode,
     BetHealth,
+    DormancySweepResult,
+    StreamOperation,
     SummaryMetrics,
     TransactionCreate,
     TransactionOut,
 )
 
-ZOMBIE_DAYS = 30
+ZOMBIE_DAYS = int(os.getenv("ZOMBIE_DAYS", "30"))
 WARNING_THRESHOLD = Decimal("0.80")
+BULK_INSERT_BATCH_SIZE = 5000
+
+
+async def _commit(db: AsyncSession) -> None:
+    await db.commit()
+    summary_cache.bump()
 
 
 def _calculate_inactive_days(last_activity: Optional[datetime], now: datetime) -> Optional[int]:
@@ -50,147 +67,222 @@ def _health_for_bet(
     return BetHealth.WARNING
 
 
-async def _load_bets_and_transactions(db: AsyncSession) -> tuple[list[Bet], list[Transaction]]:
+async def _load_bets_and_ledger_aggregates(db: AsyncSession) -> tuple[list[Bet], list]:
     result_bets = await db.execute(select(Bet))
-    result_txs = await db.execute(select(Transaction))
-    return result_bets.scalars().all(), result_txs.scalars().all()
-
+    result_aggregates = await db.execute(
+        select(
+            Transaction.bet_id,
+            func.coalesce(
+                func.sum(Transaction.amount).filter(Transaction.type == TransactionType.REVENUE), 0
+            ).label("direct_revenue"),
+            func.coalesce(
+                func.sum(Transaction.amount).filter(Transaction.type == TransactionType.EXPENSE), 0
+            ).label("direct_expenses"),
+            func.max(Transaction.date).label("last_transaction_at"),
+        ).group_by(Transaction.bet_id)
+    )
+    return result_bets.scalars().all(), result_aggregates.all()
+
+
+def _rollup_totals(rollup: Optional[BetRollup]) -> dict[str, Decimal]:
+    if rollup is None:
+        return {
+            "direct_revenue": Decimal("0"),
+            "direct_expenses": Decimal("0"),
+            "total_revenue": Decimal("0"),
+            "total_expenses": Decimal("0"),
+        }
+    return {
+        "direct_revenue": rollup.direct_revenue,
+        "direct_expenses": rollup.direct_expenses,
+        "total_revenue": rollup.total_revenue,
+        "total_expenses": rollup.total_expenses,
+    }
 
-def _build_maps(
-    bets: list[Bet],
-    transactions: list[Transaction],
-) -> tuple[dict[UUID, list[UUID]], dict[UUID, list[Transaction]], dict[UUID, Optional[datetime]]]:
-    children_map: dict[UUID, list[UUID]] = {bet.id: [] for bet in bets}
-    transactions_map: dict[UUID, list[Transaction]] = {bet.id: [] for bet in bets}
-    last_tx_map: dict[UUID, Optional[datetime]] = {bet.id: None for bet in bets}
 
-    for bet in bets:
-        if bet.parent_id and bet.parent_id in children_map:
-            children_map[bet.parent_id].append(bet.id)
-
-    for tx in transactions:
-        if tx.bet_id in transactions_map:
-            transactions_map[tx.bet_id].append(tx)
-            current_last = last_tx_map[tx.bet_id]
-            if current_last is None or (tx.date and tx.date > current_last):
-                last_tx_map[tx.bet_id] = tx.date
-
-    return children_map, transactions_map, last_tx_map
-
-
-def _calculate_totals(
-    bet_id: UUID,
-    children_map: dict[UUID, list[UUID]],
-    transactions_map: dict[UUID, list[Transaction]],
-    cache: dict[UUID, dict[str, Decimal]],
-) -> dict[str, Decimal]:
-    if bet_id in cache:
-        return cache[bet_id]
-
-    direct_revenue = sum(
-        (tx.amount for tx in transactions_map.get(bet_id, []) if tx.type == TransactionType.REVENUE),
-        Decimal("0"),
-    )
-    direct_expenses = sum(
-        (tx.amount for tx in transactions_map.get(bet_id, []) if tx.type == TransactionType.EXPENSE),
-        Decimal("0"),
+def _summary_for_bet(
+    bet: Bet,
+    totals: dict[str, Decimal],
+    last_transaction_at: Optional[datetime],
+    inactive_days: Optional[int],
+) -> BetSummary:
+    net_profit = totals["total_revenue"] - totals["total_expenses"]
+    roi = 0.0
+    if totals["total_expenses"] > 0:
+        roi = float((net_profit / totals["total_expenses"]) * 100)
+
+    health = _health_for_bet(bet.status, totals["total_expenses"], totals["total_revenue"], bet.budget, inactive_days)
+
+    return BetSummary(
+        id=bet.id,
+        name=bet.name,
+        description=bet.description,
+        budget=bet.budget,
+        status=bet.status,
+        flagged=bet.flagged,
+        parent_id=bet.parent_id,
+        created_at=bet.created_at,
+        updated_at=bet.updated_at,
+        direct_revenue=totals["direct_revenue"],
+        direct_expenses=totals["direct_expenses"],
+        total_revenue=totals["total_revenue"],
+        total_expenses=totals["total_expenses"],
+        net_profit=net_profit,
+        roi=roi,
+        health=health,
+        last_transaction_at=last_transaction_at,
+        inactive_days=inactive_days,
     )
 
-    total_revenue = direct_revenue
-    total_expenses = direct_expenses
-
-    for child_id in children_map.get(bet_id, []):
-        child_totals = _calculate_totals(child_id, children_map, transactions_map, cache)
-        total_revenue += child_totals["total_revenue"]
-        total_expenses += child_totals["total_expenses"]
 
-    cache[bet_id] = {
-        "direct_revenue": direct_revenue,
-        "direct_expenses": direct_expenses,
-        "total_revenue": total_revenue,
-        "total_expenses": total_expenses,
-    }
-    return cache[bet_id]
+def _bets_with_rollups():
+    return select(Bet, BetRollup).outerjoin(BetRollup, BetRollup.bet_id == Bet.id)
 
 
-def _apply_zombie_statuses(
-    bets: list[Bet],
-    last_tx_map: dict[UUID, Optional[datetime]],
-    now: datetime,
-) -> tuple[dict[UUID, Optional[int]], bool]:
-    inactive_days_map: dict[UUID, Optional[int]] = {}
-    changed = False
-    for bet in bets:
-        last_activity = last_tx_map.get(bet.id) or bet.created_at
-        inactive_days = _calculate_inactive_days(last_activity, now)
-        inactive_days_map[bet.id] = inactive_days
+def summary_from_rollup(bet: Bet, rollup: Optional[BetRollup], now: datetime) -> BetSummary:
+    last_transaction_at = rollup.last_transaction_at if rollup else None
+    inactive_days = _calculate_inactive_days(last_transaction_at or bet.created_at, now)
+    return _summary_for_bet(bet, _rollup_totals(rollup), last_transaction_at, inactive_days)
 
-        if bet.status in (BetStatus.WON, BetStatus.LOST):
-            continue
-        if inactive_days is None:
-            continue
-        if inactive_days >= ZOMBIE_DAYS and bet.status != BetStatus.ZOMBIE:
-            bet.status = BetStatus.ZOMBIE
-            changed = True
-        elif inactive_days < ZOMBIE_DAYS and bet.status == BetStatus.ZOMBIE:
-            bet.status = BetStatus.ACTIVE
-            changed = True
 
-    return inactive_days_map, changed
+def _summarize_rows(rows) -> tuple[list[Bet], dict[UUID, BetSummary]]:
+    now = datetime.utcnow()
+    bets = [bet for bet, _ in rows]
+    summaries = {bet.id: summary_from_rollup(bet, rollup, now) for bet, rollup in rows}
+    return bets, summaries
 
 
 async def _build_bet_summaries(db: AsyncSession) -> tuple[list[Bet], dict[UUID, BetSummary]]:
-    bets, transactions = await _load_bets_and_transactions(db)
-    if not bets:
+    with telemetry.stage("load"):
+        result = await db.execute(_bets_with_rollups())
+        rows = result.all()
+    if not rows:
         return [], {}
+    with telemetry.stage("summarize"):
+        return _summarize_rows(rows)
 
-    children_map, transactions_map, last_tx_map = _build_maps(bets, transactions)
-    now = datetime.utcnow()
-    inactive_days_map, changed = _apply_zombie_statuses(bets, last_tx_map, now)
 
-    totals_cache: dict[UUID, dict[str, Decimal]] = {}
-    summaries: dict[UUID, BetSummary] = {}
+async def _compute_totals_from_ledger(
+    db: AsyncSession,
+) -> tuple[list[Bet], dict[UUID, dict[str, Decimal]], dict[UUID, Optional[datetime]]]:
+    bets, aggregates = await _load_bets_and_ledger_aggregates(db)
+    snapshot = ledger.LedgerSnapshot([(bet.id, bet.parent_id) for bet in bets])
+    snapshot.add_aggregates(aggregates)
+    totals_cache, last_tx_map = snapshot.totals()
+    return bets, totals_cache, last_tx_map
+
 
+async def _build_bet_summaries_from_ledger(db: AsyncSession) -> tuple[list[Bet], dict[UUID, BetSummary]]:
+    bets, totals_cache, last_tx_map = await _compute_totals_from_ledger(db)
+    now = datetime.utcnow()
+    summaries: dict[UUID, BetSummary] = {}
     for bet in bets:
-        totals = _calculate_totals(bet.id, children_map, transactions_map, totals_cache)
-        net_profit = totals["total_revenue"] - totals["total_expenses"]
-        roi = 0.0
-        if totals["total_expenses"] > 0:
-            roi = float((net_profit / totals["total_expenses"]) * 100)
-
-        inactive_days = inactive_days_map.get(bet.id)
-        health = _health_for_bet(bet.status, totals["total_expenses"], totals["total_revenue"], bet.budget, inactive_days)
-
-        summaries[bet.id] = BetSummary(
-            id=bet.id,
-            name=bet.name,
-            description=bet.description,
-            budget=bet.budget,
-            status=bet.status,
-            flagged=bet.flagged,
-            parent_id=bet.parent_id,
-            created_at=bet.created_at,
-            updated_at=bet.updated_at,
-            direct_revenue=totals["direct_revenue"],
-            direct_expenses=totals["direct_expenses"],
-            total_revenue=totals["total_revenue"],
-            total_expenses=totals["total_expenses"],
-            net_profit=net_profit,
-            roi=roi,
-            health=health,
-            last_transaction_at=last_tx_map.get(bet.id),
-            inactive_days=inactive_days,
+        last_activity = last_tx_map.get(bet.id) or bet.created_at
+        summaries[bet.id] = _summary_for_bet(
+            bet,
+            totals_cache[bet.id],
+            last_tx_map.get(bet.id),
+            _calculate_inactive_days(last_activity, now),
         )
+    return bets, summaries
 
-    if changed:
-        await db.commit()
 
-    return bets, summaries
+async def verify_rollups(db: AsyncSession) -> list[UUID]:
+    """Return the ids of bets whose stored rollup differs from a fresh ledger recompute."""
+    _, expected = await _build_bet_summaries_from_ledger(db)
+    result = await db.execute(_bets_with_rollups())
+    stored = {
+        bet.id: (_rollup_totals(rollup), rollup.last_transaction_at if rollup else None)
+        for bet, rollup in result.all()
+    }
+
+    mismatched: list[UUID] = []
+    for bet_id, summary in expected.items():
+        totals, last_transaction_at = stored.get(bet_id, (None, None))
+        if (
+            totals is None
+            or totals["direct_revenue"] != summary.direct_revenue
+            or totals["direct_expenses"] != summary.direct_expenses
+            or totals["total_revenue"] != summary.total_revenue
+            or totals["total_expenses"] != summary.total_expenses
+            or last_transaction_at != summary.last_transaction_at
+        ):
+            mismatched.append(bet_id)
+    return mismatched
+
+
+async def rebuild_rollups(db: AsyncSession) -> int:
+    # Block ledger writers so no delta lands between the recompute and the swap.
+    await db.execute(text("LOCK TABLE bets, transactions IN SHARE MODE"))
+    bets, totals_cache, last_tx_map = await _compute_totals_from_ledger(db)
+
+    await db.execute(delete(BetRollup))
+    if bets:
+        await db.execute(
+            insert(BetRollup),
+            [
+                {
+                    "bet_id": bet.id,
+                    **totals_cache[bet.id],
+                    "last_transaction_at": last_tx_map.get(bet.id),
+                }
+                for bet in bets
+            ],
+        )
+    await _commit(db)
+    return len(bets)
+
+
+async def rebuild_ledger_buckets(db: AsyncSession) -> None:
+    await db.execute(text("LOCK TABLE transactions IN SHARE MODE"))
+    await timeseries.rebuild(db)
+    await _commit(db)
+
+
+async def sweep_dormancy(db: AsyncSession, now: Optional[datetime] = None) -> DormancySweepResult:
+    """Apply the status rules reads used to apply per request, as two set-based updates.
+
+    The rules are the old ``_apply_zombie_statuses`` ones, unchanged. A bet that
+    is not WON, LOST or already ZOMBIE (so ACTIVE or DORMANT) becomes ZOMBIE
+    after ``ZOMBIE_DAYS`` without a direct transaction, counting from its
+    creation if it has none. A ZOMBIE bet with more recent activity goes back
+    to ACTIVE.
+    """
+    now = now or datetime.utcnow()
+    cutoff = now - timedelta(days=ZOMBIE_DAYS)
+    joined = BetRollup.bet_id == Bet.id
+    dormant = or_(
+        BetRollup.last_transaction_at <= cutoff,
+        and_(BetRollup.last_transaction_at.is_(None), Bet.created_at <= cutoff),
+    )
+    awake = or_(
+        BetRollup.last_transaction_at > cutoff,
+        and_(BetRollup.last_transaction_at.is_(None), Bet.created_at > cutoff),
+    )
+
+    zombified = await db.execute(
+        update(Bet)
+        .where(joined, Bet.status.not_in([BetStatus.WON, BetStatus.LOST, BetStatus.ZOMBIE]), dormant)
+        .values(status=BetStatus.ZOMBIE)
+        .execution_options(synchronize_session=False)
+    )
+    revived = await db.execute(
+        update(Bet)
+        .where(joined, Bet.status == BetStatus.ZOMBIE, awake)
+        .values(status=BetStatus.ACTIVE)
+        .execution_options(synchronize_session=False)
+    )
+
+    if zombified.rowcount or revived.rowcount:
+        await _commit(db)
+    else:
+        await db.rollback()
+
+    return DormancySweepResult(zombified=zombified.rowcount, revived=revived.rowcount, swept_at=now)
 
 
 async def get_bet_financials(db: AsyncSession, bet_id: UUID) -> Optional[BetFinancials]:
-    _, summaries = await _build_bet_summaries(db)
-    summary = summaries.get(bet_id)
+    summary = await get_bet_summary(db, bet_id)
     if summary is None:
         return None
 
@@ -214,42 +306,56 @@ async def get_bet(db: AsyncSession, bet_id: UUID) -> Optional[Bet]:
     return result.scalar_one_or_none()
 
 
-async def get_bet_by_name(db: AsyncSession, name: str) -> Optional[Bet]:
-    result = await db.execute(select(Bet).filter(Bet.name == name))
-    return result.scalar_one_or_none()
+async def _lock_bets(db: AsyncSession, bet_ids: set[UUID]) -> dict[UUID, Bet]:
+    """Lock ``bet_ids`` and their current parents, in id order so concurrent writers cannot deadlock.
+
+    Every write that changes how much of a parent's budget is allocated holds
+    the parent's row lock, and checks run in a later statement, so they see
+    every sibling committed before the lock was granted.
+    """
+    current_parents = select(Bet.parent_id).where(Bet.id.in_(bet_ids), Bet.parent_id.is_not(None))
+    result = await db.execute(
+        select(Bet).where(or_(Bet.id.in_(bet_ids), Bet.id.in_(current_parents))).order_by(Bet.id).with_for_update()
+    )
+    return {bet.id: bet for bet in result.scalars().all()}
 
 
-async def _sum_children_budgets(db: AsyncSession, parent_id: UUID, exclude_id: Optional[UUID] = None) -> Decimal:
+def _allocated_to_children(parent_id: UUID, exclude_id: Optional[UUID] = None):
     query = select(func.coalesce(func.sum(Bet.budget), 0)).where(Bet.parent_id == parent_id)
     if exclude_id:
         query = query.where(Bet.id != exclude_id)
-    result = await db.execute(query)
-    return result.scalar_one() or Decimal("0")
-
-
-async def _validate_no_cycle(db: AsyncSession, bet_id: UUID, parent_id: UUID) -> None:
-    result = await db.execute(select(Bet.id, Bet.parent_id))
-    parent_map = {row.id: row.parent_id for row in result}
-    current = parent_id
-    while current is not None:
-        if current == bet_id:
+    return query.scalar_subquery()
+
+
+async def _validate_allocation(db: AsyncSession, bet_id: UUID, parent_id: Optional[UUID], budget: Decimal) -> None:
+    """Check an existing bet's cycle and budget rules against ``parent_id`` and ``budget`` in one query."""
+    columns = [_allocated_to_children(bet_id).label("children")]
+    if parent_id:
+        cycle = exists().where(BetClosure.ancestor_id == bet_id, BetClosure.descendant_id == parent_id)
+        columns += [
+            cycle.label("cycle"),
+            select(Bet.budget).where(Bet.id == parent_id).scalar_subquery().label("parent_budget"),
+            _allocated_to_children(parent_id, exclude_id=bet_id).label("siblings"),
+        ]
+    row = (await db.execute(select(*columns))).one()
+    if parent_id:
+        if row.cycle:
             raise ValueError("A bet cannot be its own ancestor")
-        current = parent_map.get(current)
+        if row.parent_budget is None:
+            raise ValueError("Parent bet not found")
+        if row.siblings + budget > row.parent_budget:
+            raise ValueError("Child budget exceeds parent remaining allocation")
+    if row.children > budget:
+        raise ValueError("Bet budget cannot be lower than allocated child budgets")
 
 
-async def _validate_parent_budget(db: AsyncSession, parent_id: UUID, budget: Decimal, exclude_id: Optional[UUID] = None) -> None:
-    parent_bet = await get_bet(db, parent_id)
-    if parent_bet is None:
-        raise ValueError("Parent bet not found")
-    allocated = await _sum_children_budgets(db, parent_id, exclude_id=exclude_id)
-    if allocated + budget > parent_bet.budget:
-        raise ValueError("Child budget exceeds parent remaining allocation")
+def _is_unique_violation(exc: IntegrityError, index_name: str) -> bool:
+    return index_name in str(exc.orig)
 
 
-async def _validate_children_budget(db: AsyncSession, bet_id: UUID, new_budget: Decimal) -> None:
-    allocated = await _sum_children_budgets(db, bet_id)
-    if allocated > new_budget:
-        raise ValueError("Bet budget cannot be lower than allocated child budgets")
+async def _validate_no_cycle(db: AsyncSession, bet_id: UUID, parent_id: UUID) -> None:
+    if await hierarchy.is_descendant(db, bet_id, parent_id):
+        raise ValueError("A bet cannot be its own ancestor")
 
 
 async def get_bet_summaries(
@@ -257,63 +363,187 @@ async def get_bet_summaries(
     skip: int = 0,
     limit: int = 100,
     status: Optional[BetStatus] = None,
+    after: Optional[str] = None,
 ) -> List[BetSummary]:
-    bets, summaries = await _build_bet_summaries(db)
-    if not bets:
-        return []
+    return await summary_cache.get_or_compute(
+        ("bets", skip, limit, status, after),
+        lambda: _compute_bet_summaries(db, skip, limit, status, after),
+        db=db,
+    )
+
+
+async def _compute_bet_summaries(
+    db: AsyncSession,
+    skip: int,
+    limit: int,
+    status: Optional[BetStatus],
+    after: Optional[str],
+) -> List[BetSummary]:
+    query = _bets_with_rollups()
+    if status is not None:
+        query = query.where(Bet.status == status)
+    if after:
+        query = query.where(pagination.after_ascending(Bet.created_at, Bet.id, after))
+    query = query.order_by(Bet.created_at.asc().nullsfirst(), Bet.id).offset(skip).limit(limit)
 
-    filtered = [bet for bet in bets if status is None or bet.status == status]
-    filtered.sort(key=lambda bet: bet.created_at or datetime.min)
-    paged = filtered[skip : skip + limit]
-    return [summaries[bet.id] for bet in paged]
+    result = await db.execute(query)
+    rows = result.all()
+    if not rows:
+        return []
+    bets, summaries = _summarize_rows(rows)
+    return [summaries[bet.id] for bet in bets]
 
 
 async def get_bet_summary(db: AsyncSession, bet_id: UUID) -> Optional[BetSummary]:
-    _, summaries = await _build_bet_summaries(db)
+    result = await db.execute(_bets_with_rollups().where(Bet.id == bet_id))
+    row = result.one_or_none()
+    if row is None:
+        return None
+    _, summaries = _summarize_rows([row])
     return summaries.get(bet_id)
 
 
 async def create_bet(db: AsyncSession, bet: BetCreate) -> Bet:
-    if bet.parent_id:
-        await _validate_parent_budget(db, bet.parent_id, bet.budget)
+    """Insert a bet with its closure and rollup rows in one statement (two with a parent).
 
-    db_bet = Bet(**bet.model_dump())
-    db.add(db_bet)
-    await db.commit()
-    await db.refresh(db_bet)
-    return db_bet
+    The parent budget check is a guard on the ``INSERT ... SELECT``; name
+    uniqueness is enforced by ``ux_bets_name``.
+    """
+    if bet.parent_id and bet.parent_id not in await _lock_bets(db, {bet.parent_id}):
+        raise ValueError("Parent bet not found")
+
+    now = datetime.utcnow()
+    values = {"id": uuid.uuid4(), **bet.model_dump(), "created_at": now, "updated_at": now}
+    row = select(*(literal(value, Bet.__table__.c[key].type).label(key) for key, value in values.items()))
+    if bet.parent_id:
+        parent_budget = select(Bet.budget).where(Bet.id == bet.parent_id).scalar_subquery()
+        row = row.where(_allocated_to_children(bet.parent_id) + bet.budget <= parent_budget)
+    new_bet = insert(Bet).from_select(list(values), row).returning(*Bet.__table__.c).cte("new_bet")
+    closure = insert(BetClosure).from_select(
+        ["ancestor_id", "descendant_id", "depth"],
+        union_all(
+            select(new_bet.c.id, new_bet.c.id, literal(0)),
+            select(BetClosure.ancestor_id, new_bet.c.id, BetClosure.depth + 1).join(
+                new_bet, BetClosure.descendant_id == new_bet.c.parent_id
+            ),
+        ),
+    ).cte("new_closure")
+    rollup = insert(BetRollup).from_select(
+        ["bet_id", "direct_revenue", "direct_expenses", "total_revenue", "total_expenses", "updated_at"],
+        select(new_bet.c.id, rollups.ZERO, rollups.ZERO, rollups.ZERO, rollups.ZERO, literal(now)),
+    ).cte("new_rollup")
+
+    try:
+        result = await db.execute(select(new_bet).add_cte(closure, rollup))
+        row = result.mappings().one_or_none()
+    except IntegrityError as exc:
+        await db.rollback()
+        if _is_unique_violation(exc, "ux_bets_name"):
+            raise ValueError("Bet with this name already registered") from exc
+        raise
+    if row is None:
+        await db.rollback()
+        raise ValueError("Child budget exceeds parent remaining allocation")
+    await _commit(db)
+    stream_broker.notify(StreamOperation.BET_CREATED, [row["id"]])
+    return Bet(**row)
 
 
 async def update_bet(db: AsyncSession, bet_id: UUID, bet_update: BetUpdate) -> Optional[Bet]:
-    db_bet = await get_bet(db, bet_id)
-    if not db_bet:
-        return None
-
     update_data = bet_update.model_dump(exclude_unset=True)
     if "budget" in update_data and update_data["budget"] is None:
         raise ValueError("Budget must be greater than 0")
+
+    locked = await _lock_bets(db, {bet_id, update_data.get("parent_id")} - {None})
+    db_bet = locked.get(bet_id)
+    if not db_bet:
+        await db.rollback()
+        return None
     new_parent_id = update_data.get("parent_id", db_bet.parent_id)
     new_budget = update_data.get("budget", db_bet.budget)
 
-    if new_parent_id:
-        await _validate_no_cycle(db, db_bet.id, new_parent_id)
-        await _validate_parent_budget(db, new_parent_id, new_budget, exclude_id=db_bet.id)
-    await _validate_children_budget(db, db_bet.id, new_budget)
+    try:
+        await _validate_allocation(db, db_bet.id, new_parent_id, new_budget)
+    except ValueError:
+        await db.rollback()
+        raise
+
+    old_parent_id = db_bet.parent_id
+    if new_parent_id != db_bet.parent_id:
+        await rollups.move_subtree(db, db_bet.id, db_bet.parent_id, new_parent_id)
+        await hierarchy.move(db, db_bet.id, new_parent_id)
 
     for key, value in update_data.items():
         setattr(db_bet, key, value)
 
-    await db.commit()
-    await db.refresh(db_bet)
+    try:
+        await _commit(db)
+    except IntegrityError as exc:
+        await db.rollback()
+        if _is_unique_violation(exc, "ux_bets_name"):
+            raise ValueError("Bet with this name already registered") from exc
+        raise
+    # A move also changes the old parent's rolled-up totals.
+    stream_broker.notify(
+        StreamOperation.BET_UPDATED, [db_bet.id, old_parent_id if old_parent_id != new_parent_id else None]
+    )
     return db_bet
 
 
+async def apply_bet_changes(
+    db: AsyncSession,
+    reparents: list[tuple[UUID, Optional[UUID]]],
+    budgets: dict[UUID, Decimal],
+) -> list[Bet]:
+    """Apply a batch of re-parents (in order) and final budgets in one transaction.
+
+    Allocation rules are checked against the end state, so a batch may pass
+    through intermediate states that ``update_bet`` would reject one at a time.
+    """
+    touched = {bet_id for bet_id, _ in reparents} | set(budgets)
+    locked = await _lock_bets(db, touched | {parent_id for _, parent_id in reparents if parent_id})
+    if not touched <= set(locked):
+        await db.rollback()
+        raise ValueError("Bet not found")
+    bets = {bet_id: locked[bet_id] for bet_id in touched}
+    changed = set(touched) | {bet.parent_id for bet in bets.values()}
+
+    try:
+        for bet_id, parent_id in reparents:
+            db_bet = bets[bet_id]
+            if parent_id == db_bet.parent_id:
+                continue
+            if parent_id:
+                await _validate_no_cycle(db, bet_id, parent_id)
+            await rollups.move_subtree(db, bet_id, db_bet.parent_id, parent_id)
+            await hierarchy.move(db, bet_id, parent_id)
+            db_bet.parent_id = parent_id
+        for bet_id, budget in budgets.items():
+            bets[bet_id].budget = budget
+        await db.flush()
+
+        for db_bet in bets.values():
+            await _validate_allocation(db, db_bet.id, db_bet.parent_id, db_bet.budget)
+    except ValueError:
+        await db.rollback()
+        raise
+
+    await _commit(db)
+    stream_broker.notify(StreamOperation.BET_UPDATED, changed)
+    return list(bets.values())
+
+
 async def delete_bet(db: AsyncSession, bet_id: UUID) -> Optional[Bet]:
-    db_bet = await get_bet(db, bet_id)
+    result = await db.execute(
+        update(Bet)
+        .where(Bet.id == bet_id)
+        .values(status=BetStatus.LOST, updated_at=datetime.utcnow())
+        .returning(Bet)
+    )
+    db_bet = result.scalar_one_or_none()
     if db_bet:
-        db_bet.status = BetStatus.LOST
-        await db.commit()
-        await db.refresh(db_bet)
+        await _commit(db)
+        stream_broker.notify(StreamOperation.BET_DELETED, [db_bet.id])
     return db_bet
 
 
@@ -328,11 +558,14 @@ async def get_transactions_with_bet(
     bet_id: Optional[UUID] = None,
     skip: int = 0,
     limit: int = 100,
+    after: Optional[str] = None,
 ) -> List[TransactionOut]:
     query = select(Transaction, Bet.name).join(Bet, Transaction.bet_id == Bet.id)
     if bet_id:
         query = query.where(Transaction.bet_id == bet_id)
-    query = query.order_by(Transaction.date.desc()).offset(skip).limit(limit)
+    if after:
+        query = query.where(pagination.after_descending(Transaction.date, Transaction.id, after))
+    query = query.order_by(Transaction.date.desc().nullslast(), Transaction.id.desc()).offset(skip).limit(limit)
 
     result = await db.execute(query)
     items: List[TransactionOut] = []
@@ -354,56 +587,337 @@ async def get_transactions_with_bet(
     return items
 
 
-async def create_transaction(db: AsyncSession, transaction: TransactionCreate) -> Transaction:
-    db_transaction = Transaction(**transaction.model_dump())
-    db.add(db_transaction)
-    await db.commit()
-    await db.refresh(db_transaction)
-    return db_transaction
+async def create_transaction(db: AsyncSession, transaction: TransactionCreate) -> Optional[TransactionOut]:
+    """Insert a ledger row guarded on its bet existing, returning it with the bet's name.
+
+    Returns ``None`` (having written nothing) when the bet does not exist.
+    """
+    now = datetime.utcnow()
+    values = {"id": uuid.uuid4(), **transaction.model_dump(), "created_at": now, "updated_at": now}
+    row = select(*(literal(value, Transaction.__table__.c[key].type).label(key) for key, value in values.items()))
+    new_transaction = (
+        insert(Transaction)
+        .from_select(list(values), row.where(exists().where(Bet.id == transaction.bet_id)))
+        .returning(*Transaction.__table__.c)
+        .cte("new_transaction")
+    )
+    result = await db.execute(
+        select(new_transaction, Bet.name.label("bet_name")).join(Bet, Bet.id == new_transaction.c.bet_id)
+    )
+    created = result.mappings().one_or_none()
+    if created is None:
+        await db.rollback()
+        return None
+
+    db_transaction = Transaction(**{key: created[key] for key in values})
+    await rollups.record_transaction(db, db_transaction)
+    await timeseries.record_transaction(db, db_transaction)
+    await _commit(db)
+    stream_broker.notify(StreamOperation.TRANSACTION_CREATED, [db_transaction.bet_id])
+    return TransactionOut(**created)
+
+
+async def _insert_transaction_batch(
+    db: AsyncSession,
+    batch: list[tuple[int, dict]],
+    statement=None,
+) -> tuple[list[dict], list[tuple[int, str]]]:
+    """Insert ``batch`` in one multi-row statement, falling back to per-row savepoints on failure.
+
+    Returns the rows ``statement`` returns (if it has RETURNING) and ``(index, error)`` pairs.
+    """
+    statement = insert(Transaction) if statement is None else statement
+    try:
+        async with db.begin_nested():
+            result = await db.execute(statement, [values for _, values in batch])
+        return ([dict(row) for row in result.mappings()] if result.returns_rows else []), []
+    except DBAPIError:
+        pass
+
+    returned: list[dict] = []
+    errors: list[tuple[int, str]] = []
+    for index, values in batch:
+        try:
+            async with db.begin_nested():
+                result = await db.execute(statement, [values])
+            if result.returns_rows:
+                returned.extend(dict(row) for row in result.mappings())
+        except DBAPIError as exc:
+            errors.append((index, str(exc.orig)))
+    return returned, errors
+
+
+async def bulk_create_transactions(
+    db: AsyncSession,
+    transactions: list[tuple[int, TransactionCreate]],
+) -> tuple[int, list[tuple[int, str]]]:
+    """Insert validated rows in batches inside one DB transaction.
+
+    Returns the inserted count and ``(index, error)`` pairs for rejected rows.
+    """
+    errors: list[tuple[int, str]] = []
+    if not transactions:
+        return 0, errors
+
+    bet_ids = {transaction.bet_id for _, transaction in transactions}
+    result = await db.execute(select(Bet.id).where(Bet.id.in_(bet_ids)))
+    known_bet_ids = set(result.scalars().all())
+
+    pending: list[tuple[int, dict]] = []
+    for index, transaction in transactions:
+        if transaction.bet_id in known_bet_ids:
+            pending.append((index, transaction.model_dump()))
+        else:
+            errors.append((index, f"Bet with id {transaction.bet_id} not found"))
+
+    # Rollups and buckets are fed the stored (rounded) values, not the request's.
+    statement = insert(Transaction).returning(
+        Transaction.bet_id, Transaction.amount, Transaction.type, Transaction.date
+    )
+    inserted: list[dict] = []
+    for start in range(0, len(pending), BULK_INSERT_BATCH_SIZE):
+        returned, batch_errors = await _insert_transaction_batch(
+            db, pending[start : start + BULK_INSERT_BATCH_SIZE], statement
+        )
+        inserted.extend(returned)
+        errors.extend(batch_errors)
+
+    if inserted:
+        await rollups.record_batch(db, inserted)
+        await timeseries.record_rows(db, inserted)
+        await _commit(db)
+        stream_broker.notify(StreamOperation.TRANSACTION_CREATED, {values["bet_id"] for values in inserted})
+
+    errors.sort()
+    return len(inserted), errors
+
+
+async def sync_transactions(
+    db: AsyncSession,
+    source: str,
+    rows: list[tuple[int, dict]],
+) -> tuple[int, int, list[tuple[int, str]], Optional[datetime]]:
+    """Upsert keyed export rows for ``source`` and advance its watermark in one DB transaction.
+
+    Rows dated before the watermark are skipped without a query; the rest are
+    inserted in batches that ignore ``(source, dedupe_key)`` conflicts. Returns
+    the skipped and inserted counts, ``(index, error)`` pairs and the new watermark.
+    """
+    # Lock the source's watermark so concurrent syncs of one source run one after another.
+    await db.execute(pg_insert(SyncWatermark).values(source=source).on_conflict_do_nothing())
+    result = await db.execute(select(SyncWatermark).where(SyncWatermark.source == source).with_for_update())
+    state = result.scalar_one()
+
+    # The watermark date itself is re-read: later rows for that day may not have been exported yet.
+    considered = [row for row in rows if state.watermark is None or row[1]["date"] >= state.watermark]
+    skipped = len(rows) - len(considered)
+
+    bet_ids = {values["bet_id"] for _, values in considered}
+    result = await db.execute(select(Bet.id).where(Bet.id.in_(bet_ids)))
+    known_bet_ids = set(result.scalars().all())
+
+    pending: list[tuple[int, dict]] = []
+    errors: list[tuple[int, str]] = []
+    for index, values in considered:
+        if values["bet_id"] in known_bet_ids:
+            pending.append((index, values))
+        else:
+            errors.append((index, f"Bet with id {values['bet_id']} not found"))
+
+    statement = (
+        pg_insert(Transaction)
+        .on_conflict_do_nothing(index_elements=[Transaction.source, Transaction.dedupe_key])
+        .returning(Transaction.bet_id, Transaction.amount, Transaction.type, Transaction.date)
+    )
+    inserted: list[dict] = []
+    for start in range(0, len(pending), BULK_INSERT_BATCH_SIZE):
+        returned, batch_errors = await _insert_transaction_batch(
+            db, pending[start : start + BULK_INSERT_BATCH_SIZE], statement
+        )
+        inserted.extend(returned)
+        errors.extend(batch_errors)
+
+    if inserted:
+        await rollups.record_batch(db, inserted)
+        await timeseries.record_rows(db, inserted)
+
+    # Advance to the newest row seen, but not past a rejected one, so the next sync retries it.
+    watermark = max((values["date"] for _, values in considered), default=state.watermark)
+    if errors:
+        dates = {index: values["date"] for index, values in considered}
+        watermark = min(watermark, *(dates[index] for index, _ in errors))
+    state.watermark = watermark
+    state.synced_at = datetime.utcnow()
+    await _commit(db)
+    if inserted:
+        stream_broker.notify(StreamOperation.TRANSACTION_CREATED, {row["bet_id"] for row in inserted})
+
+    errors.sort()
+    return skipped, len(inserted), errors, watermark
 
 
 async def delete_transaction(db: AsyncSession, transaction_id: UUID) -> Optional[Transaction]:
-    db_transaction = await get_transaction(db, transaction_id)
+    result = await db.execute(delete(Transaction).where(Transaction.id == transaction_id).returning(Transaction))
+    db_transaction = result.scalar_one_or_none()
     if db_transaction:
-        await db.delete(db_transaction)
-        await db.commit()
+        await rollups.remove_transaction(db, db_transaction)
+        await timeseries.remove_transaction(db, db_transaction)
+        await _commit(db)
+        stream_broker.notify(StreamOperation.TRANSACTION_DELETED, [db_transaction.bet_id])
     return db_transaction
 
 
 # --- Tree Operations ---
-async def get_full_bet_tree(db: AsyncSession) -> List[BetTree]:
-    bets, summaries = await _build_bet_summaries(db)
-    visible_bets = [bet for bet in bets if bet.status != BetStatus.LOST]
-    if not visible_bets:
-        return []
+def _tree_node(summary: BetSummary, node_type: type = BetTree, **extra):
+    """A tree node sharing ``summary``'s already-validated values.
+
+    Sets the same instance state ``model_construct`` does, without its per-field
+    loop, which is slower than validating again.
+    """
+    node = node_type.__new__(node_type)
+    object.__setattr__(node, "__dict__", {**summary.__dict__, "children": [], **extra})
+    object.__setattr__(node, "__pydantic_fields_set__", {*summary.model_fields_set, "children", *extra})
+    object.__setattr__(node, "__pydantic_extra__", None)
+    object.__setattr__(node, "__pydantic_private__", None)
+    return node
 
-    nodes: dict[UUID, BetTree] = {
-        bet.id: BetTree(**summaries[bet.id].model_dump(), children=[])
-        for bet in visible_bets
-    }
+
+def _assemble_tree(bets: list[Bet], summaries: dict[UUID, BetSummary]) -> dict[UUID, BetTree]:
+    visible_bets = [bet for bet in bets if bet.status != BetStatus.LOST]
+    nodes: dict[UUID, BetTree] = {bet.id: _tree_node(summaries[bet.id]) for bet in visible_bets}
 
     for bet in visible_bets:
         if bet.parent_id and bet.parent_id in nodes:
             nodes[bet.parent_id].children.append(nodes[bet.id])
 
-    roots = [nodes[bet.id] for bet in visible_bets if bet.parent_id is None]
+    return nodes
+
+
+async def get_full_bet_tree(db: AsyncSession) -> List[BetTree]:
+    return await summary_cache.get_or_compute(("tree",), lambda: _compute_full_bet_tree(db), db=db)
+
+
+async def get_full_bet_tree_json(db: AsyncSession) -> bytes:
+    async def compute() -> bytes:
+        tree = await get_full_bet_tree(db)
+        with telemetry.stage("serialize"):
+            return serialization.encode_forest(tree)
+
+    return await summary_cache.get_or_compute(("tree", "json"), compute, db=db)
+
+
+async def _compute_full_bet_tree(db: AsyncSession) -> List[BetTree]:
+    bets, summaries = await _build_bet_summaries(db)
+    with telemetry.stage("assemble"):
+        nodes = _assemble_tree(bets, summaries)
+    if not nodes:
+        return []
+
+    roots = [node for node in nodes.values() if node.parent_id is None]
     roots.sort(key=lambda node: node.created_at or datetime.min)
     return roots
 
 
 async def get_bet_tree(db: AsyncSession, bet_id: UUID) -> Optional[BetTree]:
-    full_tree = await get_full_bet_tree(db)
-
-    def find_node(nodes: list[BetTree], target: UUID) -> Optional[BetTree]:
-        for node in nodes:
-            if node.id == target:
-                return node
-            child_match = find_node(node.children, target)
-            if child_match:
-                return child_match
+    result = await db.execute(_bets_with_rollups().where(Bet.id.in_(hierarchy.descendant_ids(bet_id))))
+    rows = result.all()
+    if not rows:
         return None
 
-    return find_node(full_tree, bet_id)
+    bets, summaries = _summarize_rows(rows)
+    return _assemble_tree(bets, summaries).get(bet_id)
+
+
+async def get_tree_slice_json(
+    db: AsyncSession,
+    depth: Optional[int],
+    root_id: Optional[UUID] = None,
+    children_only: bool = False,
+) -> Optional[bytes]:
+    async def compute() -> Optional[bytes]:
+        nodes = await _compute_tree_slice(db, depth, root_id, children_only)
+        if nodes is None:
+            return None
+        with telemetry.stage("serialize"):
+            return serialization.encode_nodes(nodes)
+
+    return await summary_cache.get_or_compute(tree_slice_key(depth, root_id, children_only), compute, db=db)
+
+
+def tree_slice_key(depth: Optional[int], root_id: Optional[UUID], children_only: bool) -> tuple:
+    return ("tree-slice", depth, root_id, children_only)
+
+
+async def _compute_tree_slice(
+    db: AsyncSession,
+    depth: Optional[int],
+    root_id: Optional[UUID],
+    children_only: bool,
+) -> Optional[List[BetTreeNode]]:
+    """Nodes from each root (or ``root_id``) down to ``depth`` levels (all if ``None``), read through the closure.
+
+    Only visible rows are loaded; each node carries its live child count so a
+    client knows whether it can be expanded.
+    """
+    child = aliased(Bet)
+    child_count = (
+        select(func.count())
+        .where(child.parent_id == Bet.id, child.status != BetStatus.LOST)
+        .scalar_subquery()
+        .label("child_count")
+    )
+    if root_id is not None:
+        anchor = BetClosure.ancestor_id == root_id
+    else:
+        root = aliased(Bet)
+        anchor = BetClosure.ancestor_id.in_(select(root.id).where(root.parent_id.is_(None)))
+
+    query = (
+        _bets_with_rollups()
+        .add_columns(BetClosure.depth, child_count)
+        .join(BetClosure, BetClosure.descendant_id == Bet.id)
+        .where(anchor, Bet.status != BetStatus.LOST)
+        .order_by(BetClosure.depth, Bet.created_at.asc().nullsfirst(), Bet.id)
+    )
+    if depth is not None:
+        query = query.where(BetClosure.depth <= depth)
+    result = await db.execute(query)
+
+    now = datetime.utcnow()
+    nodes: dict[UUID, BetTreeNode] = {}
+    top: list[BetTreeNode] = []
+    # Rows arrive shallowest first, so a parent is always placed before its children.
+    for bet, rollup, node_depth, count in result.all():
+        node = _tree_node(summary_from_rollup(bet, rollup, now), BetTreeNode, child_count=count)
+        nodes[bet.id] = node
+        if node_depth == 0:
+            top.append(node)
+        elif bet.parent_id in nodes:
+            nodes[bet.parent_id].children.append(node)
+
+    if root_id is not None:
+        if not top:
+            return None
+        return top[0].children if children_only else top
+    return top
+
+
+async def get_ancestor_chains(db: AsyncSession, bet_ids: set[UUID]) -> dict[UUID, list[BetSummary]]:
+    """Each bet's summary preceded by its ancestors' (root first), in one closure query."""
+    if not bet_ids:
+        return {}
+    result = await db.execute(
+        _bets_with_rollups()
+        .add_columns(BetClosure.descendant_id)
+        .join(BetClosure, BetClosure.ancestor_id == Bet.id)
+        .where(BetClosure.descendant_id.in_(bet_ids))
+        .order_by(BetClosure.descendant_id, BetClosure.depth.desc())
+    )
+    now = datetime.utcnow()
+    chains: dict[UUID, list[BetSummary]] = {}
+    for bet, rollup, descendant_id in result.all():
+        chains.setdefault(descendant_id, []).append(summary_from_rollup(bet, rollup, now))
+    return chains
 
 
 async def get_root_bets(db: AsyncSession) -> List[Bet]:
@@ -412,34 +926,29 @@ async def get_root_bets(db: AsyncSession) -> List[Bet]:
 
 
 async def get_summary_metrics(db: AsyncSession) -> SummaryMetrics:
-    bets, transactions = await _load_bets_and_transactions(db)
-    if not bets:
+    return await summary_cache.get_or_compute(("metrics",), lambda: _compute_summary_metrics(db), db=db)
+
+
+async def _compute_summary_metrics(db: AsyncSession) -> SummaryMetrics:
+    result = await db.execute(_bets_with_rollups())
+    rows = result.all()
+    if not rows:
         return SummaryMetrics()
 
     now = datetime.utcnow()
-    children_map, transactions_map, last_tx_map = _build_maps(bets, transactions)
-    _, changed = _apply_zombie_statuses(bets, last_tx_map, now)
+    bets = [bet for bet, _ in rows]
+    totals_map = {bet.id: _rollup_totals(rollup) for bet, rollup in rows}
 
-    totals_cache: dict[UUID, dict[str, Decimal]] = {}
-    total_expenses = Decimal("0")
-    total_revenue = Decimal("0")
-
-    for bet in bets:
-        totals = _calculate_totals(bet.id, children_map, transactions_map, totals_cache)
-        total_expenses += totals["direct_expenses"]
-        total_revenue += totals["direct_revenue"]
+    total_expenses = sum((totals["direct_expenses"] for totals in totals_map.values()), Decimal("0"))
+    total_revenue = sum((totals["direct_revenue"] for totals in totals_map.values()), Decimal("0"))
 
     active_bets = len([bet for bet in bets if bet.status not in (BetStatus.LOST, BetStatus.WON, BetStatus.ZOMBIE)])
 
-    thirty_days_ago = now - timedelta(days=30)
-    recent_burn = sum(
-        (tx.amount for tx in transactions if tx.type == TransactionType.EXPENSE and tx.date and tx.date >= thirty_days_ago),
-        Decimal("0"),
-    )
+    recent_burn = await timeseries.expenses_since(db, now - timedelta(days=30))
 
     root_budgets = sum((bet.budget for bet in bets if bet.parent_id is None), Decimal("0"))
     root_spend = sum(
-        (totals_cache[bet.id]["total_expenses"] for bet in bets if bet.parent_id is None),
+        (totals_map[bet.id]["total_expenses"] for bet in bets if bet.parent_id is None),
         Decimal("0"),
     )
     remaining_budget = max(root_budgets - root_spend, Decimal("0"))
@@ -448,9 +957,6 @@ async def get_summary_metrics(db: AsyncSession) -> SummaryMetrics:
     if recent_burn > 0:
         runway_months = float(remaining_budget / recent_burn)
 
-    if changed:
-        await db.commit()
-
     return SummaryMetrics(
         total_burn=total_expenses,
         total_revenue=total_revenue,
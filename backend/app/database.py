@@ -1,20 +1,48 @@
 import os
+import time
+from contextlib import asynccontextmanager
+from typing import AsyncContextManager, AsyncIterator, Callable, Optional
+from fastapi import Request, Response
+from sqlalchemy.exc import DBAPIError
 from sqlalchemy.ext.asyncio import create_async_engine, AsyncSession
 from sqlalchemy.orm import sessionmaker, declarative_base
 
+from app import telemetry
+from app.cache import READ_TARGET, REPLICA, summary_cache
+
 print("Initializing Database module...")
 
 # Default to the internal Docker URL if not set
 DATABASE_URL = os.getenv("DATABASE_URL", "postgresql+asyncpg://user:password@db:5432/betmetric_db")
+# Optional streaming replica for GET endpoints; unset means reads use the primary too.
+DATABASE_READ_URL = os.getenv("DATABASE_READ_URL")
+
+
+def _asyncpg_url(url: str) -> str:
+    # Asyncpg (used by SQLAlchemy) does not support 'sslmode' in the connection string.
+    # It expects 'ssl'. Common cloud providers (like Neon/Railway) might add 'sslmode'.
+    return url.replace("sslmode=", "ssl=") if "sslmode=" in url else url
 
-# Asyncpg (used by SQLAlchemy) does not support 'sslmode' in the connection string.
-# It expects 'ssl'. Common cloud providers (like Neon/Railway) might add 'sslmode'.
-if "sslmode=" in DATABASE_URL:
-    DATABASE_URL = DATABASE_URL.replace("sslmode=", "ssl=")
+
+DATABASE_URL = _asyncpg_url(DATABASE_URL)
 
 print(f"DATABASE_URL configured: {DATABASE_URL.split('@')[1] if '@' in DATABASE_URL else 'UNKNOWN'}")
 
-engine = create_async_engine(DATABASE_URL, echo=True)
+# Per-statement logging is opt-in; query counts and timings are exported on /metrics instead.
+SQL_ECHO = os.getenv("SQL_ECHO", "false").lower() in ("1", "true", "yes")
+# After a write, reads stay on the primary this long: for every caller of this process
+# (so the summary cache is refilled from fresh data) and, via a cookie, for the writing client.
+READ_YOUR_WRITES_SECONDS = float(os.getenv("READ_YOUR_WRITES_SECONDS", "5"))
+# How long reads skip the replica after it failed to hand out a connection.
+REPLICA_RETRY_SECONDS = float(os.getenv("REPLICA_RETRY_SECONDS", "30"))
+# Browsers only send this cookie on credentialed requests: clients on another origin must use
+# fetch's ``credentials: "include"`` (axios ``withCredentials``), or their reads after a write
+# can come from a replica that has not caught up. The cookie is SameSite=Lax, so the frontend
+# must be served from the same site as the API.
+WROTE_COOKIE = "betmetric_wrote"
+
+engine = create_async_engine(DATABASE_URL, echo=SQL_ECHO)
+telemetry.instrument_engine(engine)
 Base = declarative_base()
 AsyncSessionLocal = sessionmaker(
     autocommit=False,
@@ -24,6 +52,78 @@ AsyncSessionLocal = sessionmaker(
     expire_on_commit=False,
 )
 
+read_engine = None
+ReadSessionLocal = None
+if DATABASE_READ_URL:
+    # Pre-ping so connections broken by a replica restart are replaced at checkout.
+    read_engine = create_async_engine(_asyncpg_url(DATABASE_READ_URL), echo=SQL_ECHO, pool_pre_ping=True)
+    telemetry.instrument_engine(read_engine, pool_name="db_replica_pool")
+    ReadSessionLocal = sessionmaker(
+        autocommit=False,
+        autoflush=False,
+        bind=read_engine,
+        class_=AsyncSession,
+        expire_on_commit=False,
+    )
+
+READ_ROUTES = telemetry.Counter(
+    "betmetric_db_read_routes_total", "Read sessions opened, by target database and reason.", ("target", "reason")
+)
+_replica_down_until = float("-inf")
+
+
+def _primary_reason(request: Request) -> Optional[str]:
+    """Why a read must use the primary, or None if the replica may serve it."""
+    if ReadSessionLocal is None:
+        return "no_replica"
+    if time.monotonic() < _replica_down_until:
+        return "replica_down"
+    if request.cookies.get(WROTE_COOKIE):
+        return "client_wrote"
+    if time.monotonic() - summary_cache.bumped_at < READ_YOUR_WRITES_SECONDS:
+        return "recent_write"
+    return None
+
+
 async def get_db():
     async with AsyncSessionLocal() as session:
         yield session
+
+@asynccontextmanager
+async def read_session(request: Request) -> AsyncIterator[AsyncSession]:
+    """Session for a read: the replica when it is configured, healthy and fresh enough."""
+    global _replica_down_until
+    reason = _primary_reason(request)
+    if reason is None:
+        async with ReadSessionLocal() as session:
+            try:
+                await session.connection()
+            except (DBAPIError, OSError, TimeoutError):
+                _replica_down_until = time.monotonic() + REPLICA_RETRY_SECONDS
+                reason = "replica_down"
+            else:
+                READ_ROUTES.inc(target="replica", reason="default")
+                session.info[READ_TARGET] = REPLICA
+                yield session
+                return
+    READ_ROUTES.inc(target="primary", reason=reason)
+    async with AsyncSessionLocal() as session:
+        yield session
+
+
+def read_session_factory(request: Request) -> Callable[[], AsyncContextManager[AsyncSession]]:
+    """``read_session`` for a read that outlives its handler, such as a streaming export."""
+    return lambda: read_session(request)
+
+
+async def get_read_db(request: Request):
+    """Session for read-only endpoints; see ``read_session``."""
+    async with read_session(request) as session:
+        yield session
+
+def mark_write(request: Request, response: Response) -> None:
+    """Pin the writing client's reads to the primary for ``READ_YOUR_WRITES_SECONDS``; see ``WROTE_COOKIE``."""
+    if ReadSessionLocal is None or request.method in ("GET", "HEAD", "OPTIONS") or response.status_code >= 400:
+        return
+    max_age = max(int(READ_YOUR_WRITES_SECONDS), 1)
+    response.set_cookie(WROTE_COOKIE, "1", max_age=max_age, httponly=True, samesite="lax")
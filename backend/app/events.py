@@ -0,0 +1,201 @@
+"""In-process broker for the ``/v1/stream`` server-sent events feed.
+
+Write paths in ``crud`` call ``stream_broker.notify`` after they commit. That
+only enqueues the touched bet ids; a single background task drains the queue,
+loads each bet's new summary and ancestor chain in one query per batch,
+assigns sequence numbers and appends the encoded frames to every
+subscriber's buffer. Publishing never awaits a subscriber: a client whose
+buffer is full is disconnected and resumes with ``Last-Event-ID``.
+
+The notification queue is bounded by ``STREAM_PENDING_LIMIT``. When a burst
+of writes overflows it, further notifications are dropped and the broker
+publishes one ``resync`` instead of the deltas it lost. A batch that fails to
+load or publish also becomes a ``resync``, and the broker keeps running.
+
+Recent frames are kept in a bounded backlog for resuming. Event ids are
+``<instance>:<seq>``; a client resuming from another process, or from a
+sequence number that has left the backlog, gets a ``resync`` event and
+should refetch the tree. Like ``summary_cache``, this covers writes made by
+this worker process.
+"""
+from __future__ import annotations
+
+import asyncio
+import contextlib
+import json
+import os
+import traceback
+import uuid
+from collections import deque
+from typing import Awaitable, Callable, Iterable, Optional
+from uuid import UUID
+
+from . import telemetry
+from .schemas import BetSummary, StreamDelta, StreamOperation
+
+STREAM_BACKLOG = int(os.getenv("STREAM_BACKLOG", "1000"))
+STREAM_CLIENT_BUFFER = int(os.getenv("STREAM_CLIENT_BUFFER", "256"))
+STREAM_HEARTBEAT_SECONDS = float(os.getenv("STREAM_HEARTBEAT_SECONDS", "15"))
+STREAM_PENDING_LIMIT = int(os.getenv("STREAM_PENDING_LIMIT", "10000"))
+
+STREAM_EVENTS = telemetry.Counter("betmetric_stream_events_total", "Events published on /v1/stream.", ("event",))
+STREAM_DROPPED = telemetry.Counter(
+    "betmetric_stream_dropped_subscribers_total", "Stream clients disconnected for falling too far behind."
+)
+STREAM_OVERFLOWS = telemetry.Counter(
+    "betmetric_stream_pending_overflows_total", "Write notifications dropped because the broker queue was full."
+)
+
+ChainLoader = Callable[[set[UUID]], Awaitable[dict[UUID, list[BetSummary]]]]
+
+
+def _frame(event_id: str, event: str, data: str) -> bytes:
+    return f"id: {event_id}\nevent: {event}\ndata: {data}\n\n".encode("utf-8")
+
+
+class Subscriber:
+    def __init__(self, max_buffered: int) -> None:
+        self.max_buffered = max_buffered
+        self.frames: deque[bytes] = deque()
+        self.ready = asyncio.Event()
+        self.overflowed = False
+
+    def push(self, frame: bytes) -> None:
+        if len(self.frames) >= self.max_buffered:
+            self.overflowed = True
+        else:
+            self.frames.append(frame)
+        self.ready.set()
+
+    async def next_frames(self, timeout: float) -> list[bytes]:
+        """Buffered frames, or an empty list after ``timeout`` seconds without any."""
+        if not self.frames:
+            with contextlib.suppress(asyncio.TimeoutError):
+                await asyncio.wait_for(self.ready.wait(), timeout)
+        self.ready.clear()
+        frames = list(self.frames)
+        self.frames.clear()
+        return frames
+
+
+class StreamBroker:
+    def __init__(self, backlog: int, client_buffer: int, pending_limit: int = STREAM_PENDING_LIMIT) -> None:
+        self.instance = uuid.uuid4().hex[:8]
+        self.seq = 0
+        self.client_buffer = client_buffer
+        self.pending_limit = pending_limit
+        self._overflowed = False
+        self._backlog: deque[tuple[int, bytes]] = deque(maxlen=backlog)
+        self._subscribers: set[Subscriber] = set()
+        self._pending: Optional[asyncio.Queue] = None
+
+    @property
+    def subscriber_count(self) -> int:
+        return len(self._subscribers)
+
+    def event_id(self, seq: int) -> str:
+        return f"{self.instance}:{seq}"
+
+    def notify(self, op: StreamOperation, bet_ids: Iterable[Optional[UUID]]) -> None:
+        """Queue a committed change; each bet in ``bet_ids`` gets a delta."""
+        if self._pending is None:
+            return
+        bet_ids = tuple(bet_id for bet_id in bet_ids if bet_id is not None)
+        if not bet_ids:
+            return
+        try:
+            self._pending.put_nowait((op, bet_ids))
+        except asyncio.QueueFull:
+            # The resync published for the overflow covers this change too.
+            self._overflowed = True
+            STREAM_OVERFLOWS.inc()
+
+    def subscribe(self, last_event_id: Optional[str] = None) -> Subscriber:
+        """Register a subscriber, pre-loaded with the frames it missed since ``last_event_id``."""
+        subscriber = Subscriber(self.client_buffer)
+        if last_event_id:
+            for frame in self._replay(last_event_id):
+                subscriber.push(frame)
+        self._subscribers.add(subscriber)
+        return subscriber
+
+    def unsubscribe(self, subscriber: Subscriber) -> None:
+        self._subscribers.discard(subscriber)
+
+    def _replay(self, last_event_id: str) -> list[bytes]:
+        instance, _, after = last_event_id.partition(":")
+        try:
+            after = int(after)
+        except ValueError:
+            after = -1
+        oldest = self._backlog[0][0] if self._backlog else self.seq + 1
+        if instance != self.instance or not oldest - 1 <= after <= self.seq:
+            return [self._resync_frame()]
+        return [frame for seq, frame in self._backlog if seq > after]
+
+    def _resync_frame(self) -> bytes:
+        return _frame(self.event_id(self.seq), "resync", json.dumps({"seq": self.seq}))
+
+    def _publish(self, event: str, data: str) -> None:
+        self.seq += 1
+        frame = _frame(self.event_id(self.seq), event, data)
+        self._backlog.append((self.seq, frame))
+        STREAM_EVENTS.inc(event=event)
+        for subscriber in list(self._subscribers):
+            subscriber.push(frame)
+            if subscriber.overflowed:
+                self._subscribers.discard(subscriber)
+                STREAM_DROPPED.inc()
+
+    def _publish_deltas(self, batch: list[tuple[StreamOperation, tuple[UUID, ...]]], chains) -> None:
+        # Coalesce the batch: one delta per bet, carrying the last operation that touched it.
+        latest: dict[UUID, StreamOperation] = {}
+        for op, bet_ids in batch:
+            for bet_id in bet_ids:
+                latest.pop(bet_id, None)
+                latest[bet_id] = op
+        for bet_id, op in latest.items():
+            chain = chains.get(bet_id, [])
+            node = chain[-1] if chain and chain[-1].id == bet_id else None
+            ancestors = chain[:-1] if node else chain
+            delta = StreamDelta(seq=self.seq + 1, op=op, bet_id=bet_id, node=node, ancestors=ancestors)
+            self._publish("delta", delta.model_dump_json())
+
+    async def _run(self, load_chains: ChainLoader) -> None:
+        pending = self._pending
+        while True:
+            batch = [await pending.get()]
+            while not pending.empty():
+                batch.append(pending.get_nowait())
+            if self._overflowed:
+                self._overflowed = False
+                self._publish_resync()
+                continue
+            try:
+                chains = await load_chains({bet_id for _, bet_ids in batch for bet_id in bet_ids})
+                self._publish_deltas(batch, chains)
+            except Exception:
+                traceback.print_exc()
+                self._publish_resync()
+
+    def _publish_resync(self) -> None:
+        try:
+            self._publish("resync", json.dumps({"seq": self.seq + 1}))
+        except Exception:
+            traceback.print_exc()
+
+    def start(self, load_chains: ChainLoader) -> asyncio.Task:
+        self._pending = asyncio.Queue(maxsize=self.pending_limit)
+        return asyncio.create_task(self._run(load_chains), name="stream-broker")
+
+    async def stop(self, task: asyncio.Task) -> None:
+        self._pending = None
+        task.cancel()
+        with contextlib.suppress(asyncio.CancelledError):
+            await task
+
+
+stream_broker = StreamBroker(STREAM_BACKLOG, STREAM_CLIENT_BUFFER)
+telemetry.GaugeFunction(
+    "betmetric_stream_subscribers", "Clients connected to /v1/stream.", lambda: stream_broker.subscriber_count
+)
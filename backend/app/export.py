@@ -0,0 +1,128 @@
+"""Streaming CSV/NDJSON exports of the ledger and bet summaries.
+
+Rows are read through a server-side cursor in ``EXPORT_BATCH_SIZE`` chunks
+and written straight to the response, so memory stays flat however large
+the ledger is. Each export opens its own session from ``session_factory``
+because the stream outlives the request handler; GET exports pass
+``database.read_session_factory`` so they read from the replica.
+"""
+from __future__ import annotations
+
+import csv
+import io
+import json
+from datetime import datetime
+from decimal import Decimal
+from enum import Enum
+from typing import Any, AsyncContextManager, AsyncIterator, Callable, Optional
+from uuid import UUID
+
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from . import crud, hierarchy
+from .database import AsyncSessionLocal
+from .models import Bet, BetRollup, Transaction
+from .schemas import BetSummary, ExportFormat
+
+EXPORT_BATCH_SIZE = 1000
+
+MEDIA_TYPES = {
+    ExportFormat.CSV: "text/csv",
+    ExportFormat.NDJSON: "application/x-ndjson",
+}
+
+TRANSACTION_COLUMNS = [
+    "id",
+    "bet_id",
+    "bet_name",
+    "amount",
+    "type",
+    "description",
+    "source",
+    "external_id",
+    "date",
+    "created_at",
+    "updated_at",
+]
+BET_COLUMNS = list(BetSummary.model_fields)
+
+
+def _plain(value: Any) -> Any:
+    if isinstance(value, Enum):
+        return value.value
+    if isinstance(value, (UUID, Decimal)):
+        return str(value)
+    if isinstance(value, datetime):
+        return value.isoformat()
+    return value
+
+
+def transaction_export_query(
+    bet_id: Optional[UUID] = None,
+    include_descendants: bool = True,
+    start: Optional[datetime] = None,
+    end: Optional[datetime] = None,
+):
+    query = select(*(getattr(Transaction, column) for column in TRANSACTION_COLUMNS if column != "bet_name"))
+    query = query.add_columns(Bet.name.label("bet_name")).join(Bet, Transaction.bet_id == Bet.id)
+    if bet_id is not None:
+        if include_descendants:
+            query = query.where(Transaction.bet_id.in_(hierarchy.descendant_ids(bet_id)))
+        else:
+            query = query.where(Transaction.bet_id == bet_id)
+    if start is not None:
+        query = query.where(Transaction.date >= start)
+    if end is not None:
+        query = query.where(Transaction.date < end)
+    return query.order_by(Transaction.date, Transaction.id)
+
+
+def bet_export_query(root_id: Optional[UUID] = None):
+    query = select(Bet, BetRollup).outerjoin(BetRollup, BetRollup.bet_id == Bet.id)
+    if root_id is not None:
+        query = query.where(Bet.id.in_(hierarchy.descendant_ids(root_id)))
+    return query.order_by(Bet.created_at, Bet.id)
+
+
+def transaction_record(row) -> dict:
+    return {column: getattr(row, column) for column in TRANSACTION_COLUMNS}
+
+
+def bet_record_factory() -> Callable[[Any], dict]:
+    now = datetime.utcnow()
+
+    def record(row) -> dict:
+        bet, rollup = row
+        return crud.summary_from_rollup(bet, rollup, now).model_dump()
+
+    return record
+
+
+def _encode(records: list[dict], columns: list[str], export_format: ExportFormat) -> str:
+    buffer = io.StringIO()
+    if export_format == ExportFormat.CSV:
+        writer = csv.writer(buffer)
+        for record in records:
+            writer.writerow(["" if record[column] is None else _plain(record[column]) for column in columns])
+    else:
+        for record in records:
+            buffer.write(json.dumps({column: _plain(record[column]) for column in columns}))
+            buffer.write("\n")
+    return buffer.getvalue()
+
+
+async def stream_export(
+    query,
+    columns: list[str],
+    to_record: Callable[[Any], dict],
+    export_format: ExportFormat,
+    session_factory: Callable[[], AsyncContextManager[AsyncSession]] = AsyncSessionLocal,
+) -> AsyncIterator[str]:
+    if export_format == ExportFormat.CSV:
+        yield _encode([dict(zip(columns, columns))], columns, export_format)
+
+    async with session_factory() as session:
+        result = await session.stream(query.execution_options(yield_per=EXPORT_BATCH_SIZE))
+        async for partition in result.partitions():
+            yield _encode([to_record(row) for row in partition], columns, export_format)
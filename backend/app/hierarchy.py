@@ -0,0 +1,64 @@
+"""Ancestor/descendant lookups backed by the ``bet_closure`` table.
+
+The closure holds one row per (ancestor, descendant) pair, so subtree and
+ancestor-path queries are single indexed lookups. ``crud.create_bet`` writes
+a new bet's rows in the same statement as the bet; ``move`` keeps them in step
+with ``bets.parent_id`` inside the caller's transaction.
+"""
+from __future__ import annotations
+
+from typing import Optional
+from uuid import UUID
+
+from sqlalchemy import delete, exists, insert, select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import aliased
+
+from .models import BetClosure
+
+
+def ancestor_ids(bet_id: UUID):
+    """``bet_id`` and every ancestor above it."""
+    return select(BetClosure.ancestor_id).where(BetClosure.descendant_id == bet_id)
+
+
+def descendant_ids(bet_id: UUID):
+    """``bet_id`` and every bet below it."""
+    return select(BetClosure.descendant_id).where(BetClosure.ancestor_id == bet_id)
+
+
+async def is_descendant(db: AsyncSession, ancestor_id: UUID, bet_id: UUID) -> bool:
+    result = await db.execute(
+        select(
+            exists().where(
+                BetClosure.ancestor_id == ancestor_id,
+                BetClosure.descendant_id == bet_id,
+            )
+        )
+    )
+    return result.scalar_one()
+
+
+async def move(db: AsyncSession, bet_id: UUID, new_parent_id: Optional[UUID]) -> None:
+    """Re-hang the subtree rooted at ``bet_id`` under ``new_parent_id``."""
+    member = aliased(BetClosure)
+    subtree = select(member.descendant_id).where(member.ancestor_id == bet_id)
+    await db.execute(
+        delete(BetClosure).where(
+            BetClosure.descendant_id.in_(subtree),
+            BetClosure.ancestor_id.not_in(subtree),
+        )
+    )
+    if new_parent_id is None:
+        return
+    above = aliased(BetClosure)
+    below = aliased(BetClosure)
+    await db.execute(
+        insert(BetClosure).from_select(
+            ["ancestor_id", "descendant_id", "depth"],
+            select(above.ancestor_id, below.descendant_id, above.depth + below.depth + 1).where(
+                above.descendant_id == new_parent_id,
+                below.ancestor_id == bet_id,
+            ),
+        )
+    )
@@ -0,0 +1,82 @@
+"""Parsing and validation for bulk ledger uploads.
+
+Accepts a JSON array, NDJSON or CSV body. Rows that fail to parse or
+validate are reported by index instead of rejecting the whole upload.
+"""
+from __future__ import annotations
+
+import csv
+import io
+import json
+from typing import Iterable, Optional
+
+from pydantic import ValidationError
+
+from .schemas import TransactionCreate
+
+NDJSON_TYPES = ("application/x-ndjson", "application/ndjson", "application/jsonl")
+CSV_TYPES = ("text/csv", "application/csv")
+
+RowError = tuple[int, str]
+
+
+def _format_validation_error(exc: ValidationError) -> str:
+    return "; ".join(
+        f"{'.'.join(str(part) for part in error['loc']) or 'row'}: {error['msg']}" for error in exc.errors()
+    )
+
+
+def iter_ndjson(lines: Iterable[str]) -> Iterable[tuple[int, Optional[dict], Optional[str]]]:
+    index = 0
+    for line in lines:
+        if not line.strip():
+            continue
+        try:
+            yield index, json.loads(line), None
+        except ValueError as exc:
+            yield index, None, f"Invalid JSON: {exc}"
+        index += 1
+
+
+def iter_csv(lines: Iterable[str]) -> Iterable[tuple[int, Optional[dict], Optional[str]]]:
+    reader = csv.DictReader(lines)
+    try:
+        for index, record in enumerate(reader):
+            # Empty cells mean "not provided" so schema defaults (e.g. date) still apply.
+            yield index, {key: value for key, value in record.items() if key and value not in ("", None)}, None
+    except csv.Error as exc:
+        # Quoting or field-size errors leave the reader out of step with the rows; give up on the body.
+        raise ValueError(f"Invalid CSV: {exc}") from exc
+
+
+def parse_rows(body: bytes, content_type: str) -> Iterable[tuple[int, Optional[dict], Optional[str]]]:
+    media_type = content_type.split(";")[0].strip().lower()
+    text = body.decode("utf-8-sig")
+    if media_type in NDJSON_TYPES:
+        return iter_ndjson(text.splitlines())
+    if media_type in CSV_TYPES:
+        return iter_csv(io.StringIO(text, newline=""))
+
+    payload = json.loads(text)
+    if not isinstance(payload, list):
+        raise ValueError("Expected a JSON array of transactions")
+    return ((index, row, None) for index, row in enumerate(payload))
+
+
+def validate_rows(
+    rows: Iterable[tuple[int, Optional[dict], Optional[str]]],
+) -> tuple[list[tuple[int, TransactionCreate]], list[RowError]]:
+    valid: list[tuple[int, TransactionCreate]] = []
+    errors: list[RowError] = []
+    for index, row, error in rows:
+        if error is not None:
+            errors.append((index, error))
+            continue
+        if not isinstance(row, dict):
+            errors.append((index, "Expected an object"))
+            continue
+        try:
+            valid.append((index, TransactionCreate(**row)))
+        except ValidationError as exc:
+            errors.append((index, _format_validation_error(exc)))
+    return valid, errors
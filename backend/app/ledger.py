@@ -0,0 +1,158 @@
+"""Columnar ledger snapshot for recomputing rollups from scratch.
+
+Ledger entries are held as parallel arrays (bet index, signed integer cents,
+type, timestamp in microseconds) against a topologically ordered bet index.
+Per-bet totals are one group-by pass over the arrays and subtree totals one
+bottom-up pass over the bet order, all in integer cents; values become
+``Decimal`` and ``datetime`` again only in ``totals``.
+
+Entries may be raw transactions or per-bet aggregates from SQL; both are just
+rows of (bet, amount, type, date).
+"""
+from __future__ import annotations
+
+from array import array
+from datetime import datetime, timedelta
+from decimal import Decimal
+from typing import Iterable, Optional
+from uuid import UUID
+
+from .models import TransactionType
+
+EPOCH = datetime(1970, 1, 1)
+ONE_MICROSECOND = timedelta(microseconds=1)
+ZERO = Decimal("0")
+NO_TIME = -(2**63)
+REVENUE = 1
+EXPENSE = 0
+
+
+def to_cents(amount: Optional[Decimal]) -> int:
+    # Ledger amounts are NUMERIC(14, 2), so scaling by 100 is exact. A missing rollup counts as zero.
+    return int(amount.scaleb(2)) if amount else 0
+
+
+def from_cents(cents: int) -> Decimal:
+    # Zero stays Decimal("0") to match the totals Decimal arithmetic produced for empty bets.
+    return Decimal(cents).scaleb(-2) if cents else ZERO
+
+
+def to_micros(moment: Optional[datetime]) -> int:
+    return NO_TIME if moment is None else (moment - EPOCH) // ONE_MICROSECOND
+
+
+def from_micros(micros: int) -> Optional[datetime]:
+    return None if micros == NO_TIME else EPOCH + timedelta(microseconds=micros)
+
+
+def topological_order(parent_index: array) -> array:
+    """Bet indices ordered so every parent precedes its children (breadth-first)."""
+    count = len(parent_index)
+    first_child = array("l", [-1]) * count
+    next_sibling = array("l", [-1]) * count
+    order = array("l")
+    for index in range(count - 1, -1, -1):
+        parent = parent_index[index]
+        if parent < 0:
+            order.append(index)
+        else:
+            next_sibling[index] = first_child[parent]
+            first_child[parent] = index
+    order.reverse()
+    cursor = 0
+    while cursor < len(order):
+        child = first_child[order[cursor]]
+        while child >= 0:
+            order.append(child)
+            child = next_sibling[child]
+        cursor += 1
+    return order
+
+
+class LedgerSnapshot:
+    def __init__(self, bets: Iterable[tuple[UUID, Optional[UUID]]]) -> None:
+        bets = list(bets)
+        self.bet_ids = [bet_id for bet_id, _ in bets]
+        self.position = {bet_id: index for index, bet_id in enumerate(self.bet_ids)}
+        # Bets whose parent is unknown are treated as roots.
+        self.parent_index = array("l", (self.position.get(parent_id, -1) for _, parent_id in bets))
+        self.order = topological_order(self.parent_index)
+
+        self.entry_bet = array("l")
+        self.entry_cents = array("q")  # revenue positive, expenses negative
+        self.entry_type = array("b")
+        self.entry_time = array("q")
+
+    def __len__(self) -> int:
+        return len(self.entry_bet)
+
+    def _extend(self, indices: list[int], cents: list[int], kind: int, times: list[int]) -> None:
+        self.entry_bet.extend(indices)
+        self.entry_cents.extend(cents if kind == REVENUE else [-value for value in cents])
+        self.entry_type.extend(array("b", [kind]) * len(indices))
+        self.entry_time.extend(times)
+
+    def add(self, rows: Iterable[tuple[UUID, Decimal, TransactionType, Optional[datetime]]]) -> None:
+        """Add raw ledger rows of (bet id, amount, type, date)."""
+        position = self.position
+        rows = [row for row in rows if row[0] in position]
+        for kind in (REVENUE, EXPENSE):
+            selected = [row for row in rows if (row[2] == TransactionType.REVENUE) == (kind == REVENUE)]
+            self._extend(
+                [position[row[0]] for row in selected],
+                [to_cents(row[1]) for row in selected],
+                kind,
+                [to_micros(row[3]) for row in selected],
+            )
+
+    def add_aggregates(self, aggregates: Iterable) -> None:
+        """Add per-bet rows with ``direct_revenue``, ``direct_expenses`` and ``last_transaction_at``."""
+        position = self.position
+        rows = [row for row in aggregates if row.bet_id in position]
+        indices = [position[row.bet_id] for row in rows]
+        times = [to_micros(row.last_transaction_at) for row in rows]
+        self._extend(indices, [to_cents(row.direct_revenue) for row in rows], REVENUE, times)
+        self._extend(indices, [to_cents(row.direct_expenses) for row in rows], EXPENSE, times)
+
+    def direct_totals(self) -> tuple[array, array, array]:
+        """Group entries by bet: (revenue cents, expense cents, latest timestamp)."""
+        count = len(self.bet_ids)
+        revenue = array("q", bytes(8 * count))
+        expenses = array("q", bytes(8 * count))
+        latest = array("q", [NO_TIME]) * count
+        for index, cents, kind, moment in zip(self.entry_bet, self.entry_cents, self.entry_type, self.entry_time):
+            if kind == REVENUE:
+                revenue[index] += cents
+            else:
+                expenses[index] -= cents
+            if moment > latest[index]:
+                latest[index] = moment
+        return revenue, expenses, latest
+
+    def subtree_totals(self, revenue: array, expenses: array) -> tuple[array, array]:
+        """Fold every bet into its parent once, children before parents."""
+        total_revenue = array("q", revenue)
+        total_expenses = array("q", expenses)
+        parent_index = self.parent_index
+        for index in reversed(self.order):
+            parent = parent_index[index]
+            if parent >= 0:
+                total_revenue[parent] += total_revenue[index]
+                total_expenses[parent] += total_expenses[index]
+        return total_revenue, total_expenses
+
+    def totals(self) -> tuple[dict[UUID, dict[str, Decimal]], dict[UUID, Optional[datetime]]]:
+        revenue, expenses, latest = self.direct_totals()
+        total_revenue, total_expenses = self.subtree_totals(revenue, expenses)
+        columns = [[from_cents(cents) for cents in column] for column in (revenue, expenses, total_revenue, total_expenses)]
+        totals = {
+            bet_id: {
+                "direct_revenue": direct_revenue,
+                "direct_expenses": direct_expenses,
+                "total_revenue": rolled_revenue,
+                "total_expenses": rolled_expenses,
+            }
+            for bet_id, direct_revenue, direct_expenses, rolled_revenue, rolled_expenses in zip(self.bet_ids, *columns)
+        }
+        last_transaction_at = dict(zip(self.bet_ids, map(from_micros, latest)))
+        return totals, last_transaction_at
@@ -1,17 +1,43 @@
 import asyncio
 import os
+from contextlib import asynccontextmanager
 from pathlib import Path
-from fastapi import FastAPI
+from fastapi import Depends, FastAPI, Request, Response, status
 from fastapi.middleware.cors import CORSMiddleware
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncSession
 
 print("Main module loading...")
 
+from app import crud, snapshots, sweeper, telemetry
 from app.api.v1.api import api_router
+from app.database import AsyncSessionLocal, get_db, mark_write
+from app.events import stream_broker
+
+
+async def load_ancestor_chains(bet_ids):
+    async with AsyncSessionLocal() as session:
+        return await crud.get_ancestor_chains(session, bet_ids)
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    print("Application startup event triggered!")
+    print("Connecting to DB...")
+    sweeper_task = sweeper.start()
+    snapshot_task = snapshots.start()
+    stream_task = stream_broker.start(load_ancestor_chains)
+    yield
+    await stream_broker.stop(stream_task)
+    await snapshots.stop(snapshot_task)
+    await sweeper.stop(sweeper_task)
+
 
 app = FastAPI(
     title="BetMetric API",
     description="The Financial Control Tower for Strategic Bets",
-    version="0.1.0"
+    version="0.1.0",
+    lifespan=lifespan,
 )
 
 # Configure CORS
@@ -23,19 +49,31 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["ETag", "X-Next-Cursor", "Server-Timing", "X-Snapshot-Id", "X-Snapshot-Taken-At"],
 )
+app.add_middleware(telemetry.RequestTimingMiddleware)
 
-app.include_router(api_router, prefix="/v1")
+@app.middleware("http")
+async def pin_reads_after_write(request: Request, call_next):
+    response = await call_next(request)
+    mark_write(request, response)
+    return response
 
-@app.on_event("startup")
-async def startup_event():
-    print("Application startup event triggered!")
-    print("Connecting to DB...")
+app.include_router(api_router, prefix="/v1")
 
 @app.get("/")
 async def root():
     return {"message": "Welcome to BetMetric API. Access docs at /docs"}
 
 @app.get("/health")
-async def health_check():
+async def health_check(response: Response, db: AsyncSession = Depends(get_db)):
+    try:
+        await db.execute(text("SELECT 1"))
+    except Exception as exc:
+        response.status_code = status.HTTP_503_SERVICE_UNAVAILABLE
+        return {"status": "unhealthy", "detail": type(exc).__name__}
     return {"status": "healthy"}
+
+@app.get("/metrics", include_in_schema=False)
+async def metrics():
+    return Response(telemetry.render(), media_type=telemetry.CONTENT_TYPE)
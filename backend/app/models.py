@@ -1,7 +1,7 @@
 import uuid
 from datetime import datetime
 from enum import Enum
-from sqlalchemy import Column, String, Numeric, DateTime, ForeignKey, Text, Enum as SQLEnum, Boolean
+from sqlalchemy import Column, String, Numeric, Date, DateTime, ForeignKey, Text, Enum as SQLEnum, Boolean, Integer, Index, text
 from sqlalchemy.dialects.postgresql import UUID
 from sqlalchemy.orm import relationship
 from .database import Base
@@ -17,6 +17,17 @@ class TransactionType(str, Enum):
     REVENUE = "REVENUE"
     EXPENSE = "EXPENSE"
 
+# Full-text documents behind /v1/search. Queries must repeat these expressions
+# verbatim for Postgres to use the GIN indexes built on them.
+BET_SEARCH_DOCUMENT = (
+    "setweight(to_tsvector('simple'::regconfig, coalesce(name, '')), 'A') || "
+    "setweight(to_tsvector('simple'::regconfig, coalesce(description, '')), 'B')"
+)
+TRANSACTION_SEARCH_DOCUMENT = (
+    "setweight(to_tsvector('simple'::regconfig, coalesce(description, '')), 'A') || "
+    "setweight(to_tsvector('simple'::regconfig, coalesce(source, '')), 'B')"
+)
+
 class Bet(Base):
     __tablename__ = "bets"
 
@@ -34,6 +45,14 @@ class Bet(Base):
     children = relationship("Bet", backref="parent", remote_side=[id])
     transactions = relationship("Transaction", back_populates="bet")
 
+    __table_args__ = (
+        Index("ix_bets_created_at_id", "created_at", "id"),
+        Index("ix_bets_status_created_at_id", "status", "created_at", "id"),
+        Index("ix_bets_parent_id", "parent_id"),
+        Index("ux_bets_name", "name", unique=True),
+        Index("ix_bets_search_document", text(f"({BET_SEARCH_DOCUMENT})"), postgresql_using="gin"),
+    )
+
 class Transaction(Base):
     __tablename__ = "transactions"
 
@@ -43,9 +62,104 @@ class Transaction(Base):
     type = Column(SQLEnum(TransactionType), nullable=False)
     description = Column(String, nullable=False)
     source = Column(String, nullable=True)
+    external_id = Column(String, nullable=True)
+    # Set by ledger sync: a hash of ``external_id``, or of the row's content when the export has no ids.
+    dedupe_key = Column(String(64), nullable=True)
     date = Column(DateTime, default=datetime.utcnow)
     created_at = Column(DateTime, default=datetime.utcnow)
     updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
     
     # Relationships
     bet = relationship("Bet", back_populates="transactions")
+
+    __table_args__ = (
+        Index("ix_transactions_date_id", "date", "id"),
+        Index("ix_transactions_bet_id_date_id", "bet_id", "date", "id"),
+        Index("ux_transactions_source_dedupe_key", "source", "dedupe_key", unique=True),
+        Index("ix_transactions_search_document", text(f"({TRANSACTION_SEARCH_DOCUMENT})"), postgresql_using="gin"),
+    )
+
+class SyncWatermark(Base):
+    """Latest ledger date already synced from one export source."""
+
+    __tablename__ = "sync_watermarks"
+
+    source = Column(String(255), primary_key=True)
+    watermark = Column(DateTime, nullable=True)
+    synced_at = Column(DateTime, nullable=True)
+
+class BetRollup(Base):
+    __tablename__ = "bet_rollups"
+
+    bet_id = Column(UUID(as_uuid=True), ForeignKey("bets.id"), primary_key=True)
+    # Direct P&L (This bet only)
+    direct_revenue = Column(Numeric(18, 2), nullable=False, default=0)
+    direct_expenses = Column(Numeric(18, 2), nullable=False, default=0)
+    # Recursive P&L (This bet + all descendants)
+    total_revenue = Column(Numeric(18, 2), nullable=False, default=0)
+    total_expenses = Column(Numeric(18, 2), nullable=False, default=0)
+    last_transaction_at = Column(DateTime, nullable=True, index=True)
+    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+
+class BetClosure(Base):
+    """One row per (ancestor, descendant) pair, including each bet paired with itself at depth 0."""
+
+    __tablename__ = "bet_closure"
+
+    ancestor_id = Column(UUID(as_uuid=True), ForeignKey("bets.id"), primary_key=True)
+    descendant_id = Column(UUID(as_uuid=True), ForeignKey("bets.id"), primary_key=True)
+    depth = Column(Integer, nullable=False)
+
+    __table_args__ = (
+        Index("ix_bet_closure_descendant_depth", "descendant_id", "depth"),
+        Index("ix_bet_closure_ancestor_depth", "ancestor_id", "depth"),
+    )
+
+class LedgerBucket(Base):
+    """Direct revenue/expenses per bet, pre-aggregated by day and by month."""
+
+    __tablename__ = "ledger_buckets"
+
+    bet_id = Column(UUID(as_uuid=True), ForeignKey("bets.id"), primary_key=True)
+    granularity = Column(String(8), primary_key=True)
+    bucket_start = Column(Date, primary_key=True)
+    revenue = Column(Numeric(18, 2), nullable=False, default=0)
+    expenses = Column(Numeric(18, 2), nullable=False, default=0)
+    transaction_count = Column(Integer, nullable=False, default=0)
+
+    __table_args__ = (Index("ix_ledger_buckets_granularity_start", "granularity", "bucket_start"),)
+
+class Snapshot(Base):
+    """One point-in-time capture of every bet's summary, written by ``app.snapshots``."""
+
+    __tablename__ = "snapshots"
+
+    id = Column(Integer, primary_key=True, autoincrement=True)
+    taken_at = Column(DateTime, nullable=False)
+    changed_bets = Column(Integer, nullable=False, default=0)
+
+    __table_args__ = (Index("ix_snapshots_taken_at", "taken_at"),)
+
+class BetSnapshot(Base):
+    """A bet's values as of ``snapshot_id``, written only when they differ from its previous row."""
+
+    __tablename__ = "bet_snapshots"
+
+    bet_id = Column(UUID(as_uuid=True), ForeignKey("bets.id"), primary_key=True)
+    snapshot_id = Column(Integer, ForeignKey("snapshots.id"), primary_key=True)
+    name = Column(String, nullable=False)
+    description = Column(Text, nullable=True)
+    budget = Column(Numeric(14, 2), nullable=False)
+    status = Column(SQLEnum(BetStatus), nullable=False)
+    flagged = Column(Boolean, nullable=False)
+    parent_id = Column(UUID(as_uuid=True), nullable=True)
+    created_at = Column(DateTime, nullable=True)
+    updated_at = Column(DateTime, nullable=True)
+    direct_revenue = Column(Numeric(18, 2), nullable=False)
+    direct_expenses = Column(Numeric(18, 2), nullable=False)
+    total_revenue = Column(Numeric(18, 2), nullable=False)
+    total_expenses = Column(Numeric(18, 2), nullable=False)
+    last_transaction_at = Column(DateTime, nullable=True)
+    health = Column(String(16), nullable=False)
+
+    __table_args__ = (Index("ix_bet_snapshots_snapshot_id", "snapshot_id"),)
@@ -0,0 +1,52 @@
+"""Opaque keyset cursors for the list endpoints.
+
+A cursor encodes the sort key of the last row on a page, e.g. ``(date, id)``
+for the ledger, so the next page is an index range scan rather than an
+``OFFSET`` that re-reads every earlier row.
+"""
+from __future__ import annotations
+
+import base64
+import json
+from datetime import datetime
+from typing import Optional
+from uuid import UUID
+
+from sqlalchemy import and_, or_, tuple_
+
+NEXT_CURSOR_HEADER = "X-Next-Cursor"
+
+
+def encode_cursor(sort_value: Optional[datetime], row_id: UUID) -> str:
+    payload = [sort_value.isoformat() if sort_value else None, str(row_id)]
+    return base64.urlsafe_b64encode(json.dumps(payload).encode()).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str) -> tuple[Optional[datetime], UUID]:
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        payload = json.loads(base64.urlsafe_b64decode(padded))
+        if not isinstance(payload, list) or len(payload) != 2:
+            raise ValueError("cursor payload must be a pair")
+        sort_value, row_id = payload
+        if not isinstance(sort_value, (str, type(None))) or not isinstance(row_id, str):
+            raise ValueError("cursor payload holds unexpected types")
+        return (datetime.fromisoformat(sort_value) if sort_value else None), UUID(row_id)
+    except (ValueError, TypeError) as exc:
+        raise ValueError("Invalid pagination cursor") from exc
+
+
+def after_descending(column, id_column, cursor: str):
+    """Rows after ``cursor`` for ``ORDER BY column DESC NULLS LAST, id DESC``."""
+    sort_value, row_id = decode_cursor(cursor)
+    if sort_value is None:
+        return and_(column.is_(None), id_column < row_id)
+    return or_(tuple_(column, id_column) < (sort_value, row_id), column.is_(None))
+
+
+def after_ascending(column, id_column, cursor: str):
+    """Rows after ``cursor`` for ``ORDER BY column ASC NULLS FIRST, id ASC``."""
+    sort_value, row_id = decode_cursor(cursor)
+    if sort_value is None:
+        return or_(and_(column.is_(None), id_column > row_id), column.is_not(None))
+    return tuple_(column, id_column) > (sort_value, row_id)
@@ -0,0 +1,119 @@
+"""Incremental maintenance of the ``bet_rollups`` store.
+
+Every ledger write pushes its delta along the ancestor path of the affected
+bet inside the caller's DB transaction, so reads never have to replay the
+ledger. ``crud.rebuild_rollups`` recomputes the store from scratch.
+"""
+from __future__ import annotations
+
+from decimal import Decimal
+from typing import Optional
+from uuid import UUID
+
+from sqlalchemy import case, func, select, update
+from sqlalchemy.ext.asyncio import AsyncSession
+from .hierarchy import ancestor_ids
+from .models import BetRollup, Transaction, TransactionType
+
+ZERO = Decimal("0")
+
+
+def split_amount(tx_type: TransactionType, amount: Decimal) -> tuple[Decimal, Decimal]:
+    if tx_type == TransactionType.REVENUE:
+        return amount, ZERO
+    return ZERO, amount
+
+
+async def _push_delta(
+    db: AsyncSession,
+    bet_id: UUID,
+    revenue: Decimal,
+    expenses: Decimal,
+    last_transaction_at=None,
+) -> None:
+    is_self = BetRollup.bet_id == bet_id
+    values = {
+        "direct_revenue": BetRollup.direct_revenue + case((is_self, revenue), else_=ZERO),
+        "direct_expenses": BetRollup.direct_expenses + case((is_self, expenses), else_=ZERO),
+        "total_revenue": BetRollup.total_revenue + revenue,
+        "total_expenses": BetRollup.total_expenses + expenses,
+    }
+    if last_transaction_at is not None:
+        values["last_transaction_at"] = case(
+            (is_self, last_transaction_at),
+            else_=BetRollup.last_transaction_at,
+        )
+    await db.execute(
+        update(BetRollup)
+        .where(BetRollup.bet_id.in_(ancestor_ids(bet_id)))
+        .values(**values)
+        .execution_options(synchronize_session=False)
+    )
+
+
+async def record_transaction(db: AsyncSession, tx: Transaction) -> None:
+    revenue, expenses = split_amount(tx.type, tx.amount)
+    latest = func.greatest(BetRollup.last_transaction_at, tx.date) if tx.date else None
+    await _push_delta(db, tx.bet_id, revenue, expenses, latest)
+
+
+async def record_batch(db: AsyncSession, rows: list[dict]) -> None:
+    """Apply many inserted ledger rows with one ancestor-path update per affected bet."""
+    deltas: dict[UUID, list] = {}
+    for row in rows:
+        revenue, expenses = split_amount(row["type"], row["amount"])
+        delta = deltas.setdefault(row["bet_id"], [ZERO, ZERO, None])
+        delta[0] += revenue
+        delta[1] += expenses
+        if row.get("date") and (delta[2] is None or row["date"] > delta[2]):
+            delta[2] = row["date"]
+
+    for bet_id, (revenue, expenses, latest_date) in deltas.items():
+        latest = func.greatest(BetRollup.last_transaction_at, latest_date) if latest_date else None
+        await _push_delta(db, bet_id, revenue, expenses, latest)
+
+
+async def remove_transaction(db: AsyncSession, tx: Transaction) -> None:
+    """Reverse ``tx``. The delete must already be flushed so the last activity is recomputed without it."""
+    revenue, expenses = split_amount(tx.type, tx.amount)
+    latest = (
+        select(func.max(Transaction.date))
+        .where(Transaction.bet_id == tx.bet_id)
+        .scalar_subquery()
+    )
+    await _push_delta(db, tx.bet_id, -revenue, -expenses, latest)
+
+
+async def _shift_path(db: AsyncSession, start_id: UUID, revenue: Decimal, expenses: Decimal) -> None:
+    await db.execute(
+        update(BetRollup)
+        .where(BetRollup.bet_id.in_(ancestor_ids(start_id)))
+        .values(
+            total_revenue=BetRollup.total_revenue + revenue,
+            total_expenses=BetRollup.total_expenses + expenses,
+        )
+        .execution_options(synchronize_session=False)
+    )
+
+
+async def move_subtree(
+    db: AsyncSession,
+    bet_id: UUID,
+    old_parent_id: Optional[UUID],
+    new_parent_id: Optional[UUID],
+) -> None:
+    """Move the recursive totals of ``bet_id`` from the old ancestor path to the new one."""
+    if old_parent_id == new_parent_id:
+        return
+    result = await db.execute(
+        select(BetRollup.total_revenue, BetRollup.total_expenses)
+        .where(BetRollup.bet_id == bet_id)
+        .with_for_update()
+    )
+    row = result.one_or_none()
+    if row is None:
+        return
+    if old_parent_id is not None:
+        await _shift_path(db, old_parent_id, -row.total_revenue, -row.total_expenses)
+    if new_parent_id is not None:
+        await _shift_path(db, new_parent_id, row.total_revenue, row.total_expenses)
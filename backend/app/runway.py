@@ -0,0 +1,134 @@
+"""Per-bet runway ("death clock") projection.
+
+Every node gets its remaining budget, trailing monthly burn and projected
+zero date from one batched pass: inputs are loaded as parallel integer-cent
+arrays, subtree burn is accumulated bottom-up over a topological order, and
+the projection is computed column-wise. Money only becomes ``Decimal`` again
+when the result is serialized.
+"""
+from __future__ import annotations
+
+import os
+from array import array
+from dataclasses import dataclass
+from datetime import date, datetime, timedelta
+from typing import Optional
+from uuid import UUID
+
+from sqlalchemy import func, select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from .ledger import from_cents, to_cents
+from .models import Bet, BetClosure, BetRollup, BetStatus, LedgerBucket
+from .schemas import RunwayNode, TimeGranularity
+
+RUNWAY_WINDOW_DAYS = int(os.getenv("RUNWAY_WINDOW_DAYS", "90"))
+DAYS_PER_MONTH = 30
+
+
+@dataclass
+class RunwayInputs:
+    ids: list[UUID]
+    names: list[str]
+    parent_index: array  # -1 for roots
+    budget_cents: array
+    spent_cents: array  # recursive expenses to date
+    trailing_cents: array  # direct expenses inside the trailing window; 0 for LOST bets
+    lost: array  # 1 for LOST bets: projected so parent links resolve, but not returned
+
+
+@dataclass
+class RunwayProjection:
+    inputs: RunwayInputs
+    remaining_cents: array
+    monthly_burn_cents: array
+    runway_months: list[Optional[float]]
+    zero_dates: list[Optional[date]]
+
+
+def project(inputs: RunwayInputs, window_days: int, today: date) -> RunwayProjection:
+    """Project every node at once. ``inputs`` must list parents before their children."""
+    parent_index = inputs.parent_index
+
+    # Walking the topological order backwards folds each node into its parent exactly once.
+    subtree_burn = array("q", inputs.trailing_cents)
+    for index in range(len(parent_index) - 1, -1, -1):
+        parent = parent_index[index]
+        if parent >= 0:
+            subtree_burn[parent] += subtree_burn[index]
+
+    remaining = array(
+        "q", [budget - spent if budget > spent else 0 for budget, spent in zip(inputs.budget_cents, inputs.spent_cents)]
+    )
+    monthly_burn = array("q", [burn * DAYS_PER_MONTH // window_days for burn in subtree_burn])
+    days_left = [left * window_days / burn if burn > 0 else None for left, burn in zip(remaining, subtree_burn)]
+    runway_months = [None if days is None else days / DAYS_PER_MONTH for days in days_left]
+
+    origin = today.toordinal()
+    horizon = date.max.toordinal() - origin
+    zero_dates = [
+        date.fromordinal(origin + int(days)) if days is not None and days < horizon else None for days in days_left
+    ]
+    return RunwayProjection(inputs, remaining, monthly_burn, runway_months, zero_dates)
+
+
+def to_nodes(projection: RunwayProjection) -> list[RunwayNode]:
+    inputs = projection.inputs
+    ids = inputs.ids
+    return [
+        RunwayNode.model_construct(
+            bet_id=ids[index],
+            parent_id=ids[inputs.parent_index[index]] if inputs.parent_index[index] >= 0 else None,
+            name=inputs.names[index],
+            budget=from_cents(inputs.budget_cents[index]),
+            total_expenses=from_cents(inputs.spent_cents[index]),
+            remaining_budget=from_cents(projection.remaining_cents[index]),
+            monthly_burn=from_cents(projection.monthly_burn_cents[index]),
+            runway_months=projection.runway_months[index],
+            projected_zero_date=projection.zero_dates[index],
+        )
+        for index in range(len(ids))
+        if not inputs.lost[index]
+    ]
+
+
+async def load_inputs(db: AsyncSession, window_days: int, today: date) -> RunwayInputs:
+    depth = select(func.max(BetClosure.depth)).where(BetClosure.descendant_id == Bet.id).scalar_subquery()
+    bets = await db.execute(
+        select(Bet.id, Bet.name, Bet.parent_id, Bet.status, Bet.budget, BetRollup.total_expenses)
+        .outerjoin(BetRollup, BetRollup.bet_id == Bet.id)
+        .order_by(depth, Bet.id)
+    )
+    rows = bets.all()
+
+    trailing = await db.execute(
+        select(LedgerBucket.bet_id, func.sum(LedgerBucket.expenses))
+        .where(
+            LedgerBucket.granularity == TimeGranularity.DAY.value,
+            LedgerBucket.bucket_start > today - timedelta(days=window_days),
+            LedgerBucket.bucket_start <= today,
+        )
+        .group_by(LedgerBucket.bet_id)
+    )
+    trailing_map = {bet_id: to_cents(expenses) for bet_id, expenses in trailing.all()}
+
+    ids = [row.id for row in rows]
+    # A LOST bet burns nothing itself and, as in the tree, is not returned; it is still
+    # loaded so its children keep their parent.
+    lost = array("b", (row.status == BetStatus.LOST for row in rows))
+    position = {bet_id: index for index, bet_id in enumerate(ids)}
+    return RunwayInputs(
+        ids=ids,
+        names=[row.name for row in rows],
+        parent_index=array("l", (position.get(row.parent_id, -1) for row in rows)),
+        budget_cents=array("q", (to_cents(row.budget) for row in rows)),
+        spent_cents=array("q", (to_cents(row.total_expenses) for row in rows)),
+        trailing_cents=array("q", (0 if lost[index] else trailing_map.get(bet_id, 0) for index, bet_id in enumerate(ids))),
+        lost=lost,
+    )
+
+
+async def get_runway(db: AsyncSession, window_days: int = RUNWAY_WINDOW_DAYS) -> list[RunwayNode]:
+    today = datetime.utcnow().date()
+    inputs = await load_inputs(db, window_days, today)
+    return to_nodes(project(inputs, window_days, today))
@@ -0,0 +1,308 @@
+"""What-if drafts for budget reallocation over a shared tree snapshot.
+
+A ``ScenarioBase`` is built once per cache generation and shared by every
+draft. A ``Scenario`` copies a node into its own overlay only when a change
+touches it: a budget change rewrites one node, a re-parent rewrites the old
+and new ancestor paths. Health and runway are derived for overlay nodes
+only. Nothing reaches the ``bets`` table until ``commit`` replays the draft
+through ``crud.apply_bet_changes`` in a single transaction.
+"""
+from __future__ import annotations
+
+import os
+import time
+import uuid
+from collections import OrderedDict
+from dataclasses import dataclass, replace
+from datetime import datetime
+from decimal import Decimal
+from typing import Iterable, Iterator, Optional
+from uuid import UUID
+
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from . import crud, ledger, runway
+from .cache import summary_cache
+from .models import Bet, BetStatus
+from .schemas import Scenario as ScenarioOut
+from .schemas import ScenarioChange, ScenarioNode, ScenarioOperation
+
+SCENARIO_MAX_DRAFTS = int(os.getenv("SCENARIO_MAX_DRAFTS", "1000"))
+SCENARIO_TTL_SECONDS = float(os.getenv("SCENARIO_TTL_SECONDS", "3600"))
+# Drafts keep the base they were opened on alive, so the store is also capped by base size.
+SCENARIO_MAX_BASE_NODES = int(os.getenv("SCENARIO_MAX_BASE_NODES", "500000"))
+ZERO = Decimal("0")
+
+
+@dataclass
+class DraftNode:
+    bet_id: UUID
+    parent_id: Optional[UUID]
+    status: BetStatus
+    budget: Decimal
+    total_revenue: Decimal
+    total_expenses: Decimal
+    monthly_burn: Decimal  # trailing burn of the whole subtree
+    inactive_days: Optional[int]
+
+
+@dataclass
+class ScenarioBase:
+    generation: int
+    nodes: dict[UUID, DraftNode]
+    children: dict[UUID, tuple[UUID, ...]]
+
+
+async def _build_base(db: AsyncSession) -> ScenarioBase:
+    generation = summary_cache.generation
+    now = datetime.utcnow()
+    result = await db.execute(crud._bets_with_rollups())
+    rows = result.all()
+
+    projection = runway.project(
+        await runway.load_inputs(db, runway.RUNWAY_WINDOW_DAYS, now.date()), runway.RUNWAY_WINDOW_DAYS, now.date()
+    )
+    burn = {
+        bet_id: ledger.from_cents(cents) for bet_id, cents in zip(projection.inputs.ids, projection.monthly_burn_cents)
+    }
+
+    nodes: dict[UUID, DraftNode] = {}
+    children: dict[UUID, list[UUID]] = {}
+    for bet, rollup in rows:
+        summary = crud.summary_from_rollup(bet, rollup, now)
+        nodes[bet.id] = DraftNode(
+            bet_id=bet.id,
+            parent_id=bet.parent_id,
+            status=bet.status,
+            budget=bet.budget,
+            total_revenue=summary.total_revenue,
+            total_expenses=summary.total_expenses,
+            monthly_burn=burn.get(bet.id, ZERO),
+            inactive_days=summary.inactive_days,
+        )
+        if bet.parent_id:
+            children.setdefault(bet.parent_id, []).append(bet.id)
+    return ScenarioBase(generation, nodes, {parent_id: tuple(ids) for parent_id, ids in children.items()})
+
+
+async def load_base(db: AsyncSession) -> ScenarioBase:
+    return await summary_cache.get_or_compute(("scenario-base",), lambda: _build_base(db), db=db)
+
+
+def _runway_months(node: DraftNode) -> Optional[float]:
+    if node.monthly_burn <= 0:
+        return None
+    return float(max(node.budget - node.total_expenses, ZERO) / node.monthly_burn)
+
+
+def _health(node: DraftNode):
+    return crud._health_for_bet(node.status, node.total_expenses, node.total_revenue, node.budget, node.inactive_days)
+
+
+class Scenario:
+    def __init__(self, base: ScenarioBase, name: Optional[str] = None) -> None:
+        self.id = uuid.uuid4()
+        self.name = name
+        self.base = base
+        self.created_at = datetime.utcnow()
+        self.changes: list[ScenarioChange] = []
+        self._nodes: dict[UUID, DraftNode] = {}
+        self._children: dict[UUID, list[UUID]] = {}
+
+    def node(self, bet_id: UUID) -> DraftNode:
+        node = self._nodes.get(bet_id) or self.base.nodes.get(bet_id)
+        if node is None:
+            raise ValueError(f"Bet {bet_id} not found")
+        return node
+
+    def _writable(self, bet_id: UUID) -> DraftNode:
+        if bet_id not in self._nodes:
+            self._nodes[bet_id] = replace(self.node(bet_id))
+        return self._nodes[bet_id]
+
+    def children(self, bet_id: UUID) -> Iterable[UUID]:
+        if bet_id in self._children:
+            return self._children[bet_id]
+        return self.base.children.get(bet_id, ())
+
+    def _path(self, bet_id: Optional[UUID]) -> Iterator[UUID]:
+        """``bet_id`` and its ancestors, nearest first."""
+        while bet_id is not None:
+            yield bet_id
+            bet_id = self.node(bet_id).parent_id
+
+    def _allocated(self, parent_id: UUID, exclude_id: Optional[UUID] = None) -> Decimal:
+        return sum((self.node(child_id).budget for child_id in self.children(parent_id) if child_id != exclude_id), ZERO)
+
+    def _set_budget(self, bet_id: UUID, budget: Decimal) -> None:
+        if budget <= 0:
+            raise ValueError("Budget must be greater than 0")
+        node = self.node(bet_id)
+        if node.parent_id and self._allocated(node.parent_id, exclude_id=bet_id) + budget > self.node(node.parent_id).budget:
+            raise ValueError("Child budget exceeds parent remaining allocation")
+        if self._allocated(bet_id) > budget:
+            raise ValueError("Bet budget cannot be lower than allocated child budgets")
+        self._writable(bet_id).budget = budget
+
+    def _shift(self, start: Optional[UUID], sign: int, node: DraftNode) -> None:
+        for ancestor_id in list(self._path(start)):
+            ancestor = self._writable(ancestor_id)
+            ancestor.total_revenue += sign * node.total_revenue
+            ancestor.total_expenses += sign * node.total_expenses
+            ancestor.monthly_burn += sign * node.monthly_burn
+
+    def _reparent(self, bet_id: UUID, parent_id: Optional[UUID]) -> None:
+        node = self.node(bet_id)
+        if parent_id == node.parent_id:
+            return
+        if parent_id is not None:
+            parent = self.node(parent_id)
+            if bet_id in self._path(parent_id):
+                raise ValueError("A bet cannot be its own ancestor")
+            if self._allocated(parent_id) + node.budget > parent.budget:
+                raise ValueError("Child budget exceeds parent remaining allocation")
+
+        old_parent_id = node.parent_id
+        self._shift(old_parent_id, -1, node)
+        self._shift(parent_id, 1, node)
+        if old_parent_id is not None:
+            self._children[old_parent_id] = [child for child in self.children(old_parent_id) if child != bet_id]
+        if parent_id is not None:
+            self._children[parent_id] = [*self.children(parent_id), bet_id]
+        self._writable(bet_id).parent_id = parent_id
+
+    def _apply(self, change: ScenarioChange) -> None:
+        if change.op == ScenarioOperation.SET_BUDGET:
+            if change.budget is None:
+                raise ValueError("set_budget requires budget")
+            self._set_budget(change.bet_id, change.budget)
+        elif change.op == ScenarioOperation.MOVE_BUDGET:
+            if change.amount is None or change.target_id is None:
+                raise ValueError("move_budget requires amount and target_id")
+            # Shrink the source first so a sibling or child can absorb the freed allocation.
+            self._set_budget(change.bet_id, self.node(change.bet_id).budget - change.amount)
+            self._set_budget(change.target_id, self.node(change.target_id).budget + change.amount)
+        elif change.op == ScenarioOperation.REPARENT:
+            self._reparent(change.bet_id, change.parent_id)
+        self.changes.append(change)
+
+    def apply(self, changes: Iterable[ScenarioChange]) -> None:
+        """Apply ``changes`` in order; on any error the draft is left as it was."""
+        saved_nodes = {bet_id: replace(node) for bet_id, node in self._nodes.items()}
+        saved_children = {bet_id: list(ids) for bet_id, ids in self._children.items()}
+        saved_changes = len(self.changes)
+        try:
+            for change in changes:
+                self._apply(change)
+        except ValueError:
+            self._nodes, self._children = saved_nodes, saved_children
+            del self.changes[saved_changes:]
+            raise
+
+    def to_schema(self) -> ScenarioOut:
+        nodes = []
+        for bet_id, node in self._nodes.items():
+            base_node = self.base.nodes[bet_id]
+            nodes.append(
+                ScenarioNode(
+                    bet_id=bet_id,
+                    parent_id=node.parent_id,
+                    budget=node.budget,
+                    total_revenue=node.total_revenue,
+                    total_expenses=node.total_expenses,
+                    remaining_budget=max(node.budget - node.total_expenses, ZERO),
+                    monthly_burn=node.monthly_burn,
+                    health=_health(node),
+                    runway_months=_runway_months(node),
+                    base_health=_health(base_node),
+                    base_runway_months=_runway_months(base_node),
+                )
+            )
+        return ScenarioOut(
+            id=self.id,
+            name=self.name,
+            created_at=self.created_at,
+            base_generation=self.base.generation,
+            stale=self.base.generation != summary_cache.generation,
+            changes=self.changes,
+            nodes=nodes,
+        )
+
+    async def commit(self, db: AsyncSession) -> list[Bet]:
+        reparents = [
+            (change.bet_id, change.parent_id) for change in self.changes if change.op == ScenarioOperation.REPARENT
+        ]
+        budgets = {
+            bet_id: node.budget
+            for bet_id, node in self._nodes.items()
+            if node.budget != self.base.nodes[bet_id].budget
+        }
+        if not reparents and not budgets:
+            return []
+        return await crud.apply_bet_changes(db, reparents, budgets)
+
+
+class ScenarioStore:
+    """In-process drafts, evicted least-recently-used or after ``ttl_seconds`` idle.
+
+    Drafts opened in one generation share its base; after writes, each draft may
+    pin a different full-org base. Besides ``max_drafts``, eviction keeps the
+    nodes of all distinct pinned bases within ``max_base_nodes``. The most
+    recently used draft is always kept.
+    """
+
+    def __init__(self, max_drafts: int, ttl_seconds: float, max_base_nodes: int = SCENARIO_MAX_BASE_NODES) -> None:
+        self.max_drafts = max_drafts
+        self.ttl_seconds = ttl_seconds
+        self.max_base_nodes = max_base_nodes
+        self.base_nodes = 0
+        self._drafts: OrderedDict[UUID, tuple[float, Scenario]] = OrderedDict()
+        # Drafts per pinned base, by ``id()``: a base stays alive while a draft holds it.
+        self._base_refs: dict[int, int] = {}
+
+    def _pin(self, base: ScenarioBase) -> None:
+        refs = self._base_refs.get(id(base), 0)
+        if refs == 0:
+            self.base_nodes += len(base.nodes)
+        self._base_refs[id(base)] = refs + 1
+
+    def _unpin(self, base: ScenarioBase) -> None:
+        refs = self._base_refs.pop(id(base)) - 1
+        if refs:
+            self._base_refs[id(base)] = refs
+        else:
+            self.base_nodes -= len(base.nodes)
+
+    def _remove(self, scenario_id: UUID) -> None:
+        _, scenario = self._drafts.pop(scenario_id)
+        self._unpin(scenario.base)
+
+    def add(self, scenario: Scenario) -> None:
+        if scenario.id not in self._drafts:
+            self._pin(scenario.base)
+        self._drafts[scenario.id] = (time.monotonic(), scenario)
+        self._drafts.move_to_end(scenario.id)
+        while len(self._drafts) > 1 and (
+            len(self._drafts) > self.max_drafts or self.base_nodes > self.max_base_nodes
+        ):
+            self._remove(next(iter(self._drafts)))
+
+    def get(self, scenario_id: UUID) -> Optional[Scenario]:
+        entry = self._drafts.get(scenario_id)
+        if entry is None:
+            return None
+        touched_at, scenario = entry
+        if self.ttl_seconds > 0 and time.monotonic() - touched_at > self.ttl_seconds:
+            self._remove(scenario_id)
+            return None
+        self.add(scenario)
+        return scenario
+
+    def pop(self, scenario_id: UUID) -> Optional[Scenario]:
+        scenario = self.get(scenario_id)
+        if scenario is not None:
+            self._remove(scenario_id)
+        return scenario
+
+
+scenario_store = ScenarioStore(SCENARIO_MAX_DRAFTS, SCENARIO_TTL_SECONDS)
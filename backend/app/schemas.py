@@ -1,10 +1,10 @@
-from datetime import datetime
-from decimal import Decimal
+from datetime import date, datetime
+from decimal import ROUND_HALF_UP, Decimal, InvalidOperation
 from enum import Enum
-from typing import Optional, List
+from typing import Any, Dict, Optional, List
 from uuid import UUID
 
-from pydantic import BaseModel, Field
+from pydantic import BaseModel, Field, field_validator
 
 from .models import BetStatus, TransactionType
 
@@ -39,12 +39,22 @@ class BetInDB(BetBase):
 # --- Transaction Schemas ---
 class TransactionBase(BaseModel):
     bet_id: UUID
-    amount: Decimal = Field(..., gt=0)
+    amount: Decimal = Field(..., gt=0) # Stored as Numeric(14, 2)
     type: TransactionType
     description: str = Field(..., min_length=1, max_length=500)
     source: Optional[str] = Field(None, max_length=255)
+    external_id: Optional[str] = Field(None, max_length=255) # Row id assigned by the exporting system
     date: datetime = Field(default_factory=datetime.utcnow) # Default to current UTC time
 
+    @field_validator("amount")
+    @classmethod
+    def round_to_cents(cls, amount: Decimal) -> Decimal:
+        # Rounded as Postgres rounds into Numeric(14, 2), so rollups match the stored row.
+        try:
+            return amount.quantize(Decimal("0.01"), rounding=ROUND_HALF_UP)
+        except InvalidOperation as exc:
+            raise ValueError("amount is too large") from exc
+
 class TransactionCreate(TransactionBase):
     pass
 
@@ -56,6 +66,10 @@ class TransactionInDB(TransactionBase):
     class Config:
         from_attributes = True # Allow SQLAlchemy models to be converted to Pydantic
 
+class ExportFormat(str, Enum):
+    CSV = "csv"
+    NDJSON = "ndjson"
+
 class BetHealth(str, Enum):
     PROFIT = "profit"
     BURN = "burn"
@@ -94,9 +108,32 @@ class BetSummary(BetInDB):
 class BetTree(BetSummary):
     children: List["BetTree"] = Field(default_factory=list)
 
+# Depth-limited tree: ``children`` is empty below the requested depth, ``child_count`` is not.
+class BetTreeNode(BetSummary):
+    child_count: int = 0
+    children: List["BetTreeNode"] = Field(default_factory=list)
+
 class TransactionOut(TransactionInDB):
     bet_name: str
 
+class BulkRowError(BaseModel):
+    index: int
+    error: str
+
+class BulkTransactionResult(BaseModel):
+    received: int = 0
+    inserted: int = 0
+    errors: List[BulkRowError] = Field(default_factory=list)
+
+class SyncResult(BaseModel):
+    source: str
+    received: int = 0
+    skipped: int = 0 # Older than the source's watermark
+    duplicates: int = 0
+    inserted: int = 0
+    watermark: Optional[datetime] = None
+    errors: List[BulkRowError] = Field(default_factory=list)
+
 class SummaryMetrics(BaseModel):
     total_burn: Decimal = Decimal("0.00")
     total_revenue: Decimal = Decimal("0.00")
@@ -104,4 +141,198 @@ class SummaryMetrics(BaseModel):
     runway_months: Optional[float] = None
     last_refreshed_at: datetime = Field(default_factory=datetime.utcnow)
 
+class TimeGranularity(str, Enum):
+    DAY = "day"
+    MONTH = "month"
+
+class TimeseriesPoint(BaseModel):
+    bucket_start: date
+    revenue: Decimal = Decimal("0.00")
+    expenses: Decimal = Decimal("0.00")
+    net: Decimal = Decimal("0.00")
+
+class BetTimeseries(BaseModel):
+    bet_id: Optional[UUID] = None
+    granularity: TimeGranularity
+    points: List[TimeseriesPoint] = Field(default_factory=list)
+
+class RunwayNode(BaseModel):
+    bet_id: UUID
+    parent_id: Optional[UUID] = None
+    name: str
+    budget: Decimal = Decimal("0.00")
+    total_expenses: Decimal = Decimal("0.00")
+    remaining_budget: Decimal = Decimal("0.00")
+    monthly_burn: Decimal = Decimal("0.00")
+    runway_months: Optional[float] = None
+    projected_zero_date: Optional[date] = None
+
+class ScenarioOperation(str, Enum):
+    SET_BUDGET = "set_budget"
+    MOVE_BUDGET = "move_budget"
+    REPARENT = "reparent"
+
+class ScenarioChange(BaseModel):
+    op: ScenarioOperation
+    bet_id: UUID
+    budget: Optional[Decimal] = Field(None, gt=0)  # set_budget
+    amount: Optional[Decimal] = Field(None, gt=0)  # move_budget, from bet_id to target_id
+    target_id: Optional[UUID] = None
+    parent_id: Optional[UUID] = None  # reparent; None moves the bet to the root
+
+class ScenarioCreate(BaseModel):
+    name: Optional[str] = Field(None, max_length=255)
+    changes: List[ScenarioChange] = Field(default_factory=list)
+
+class ScenarioNode(BaseModel):
+    bet_id: UUID
+    parent_id: Optional[UUID] = None
+    budget: Decimal
+    total_revenue: Decimal
+    total_expenses: Decimal
+    remaining_budget: Decimal
+    monthly_burn: Decimal
+    health: BetHealth
+    runway_months: Optional[float] = None
+    base_health: BetHealth
+    base_runway_months: Optional[float] = None
+
+class Scenario(BaseModel):
+    id: UUID
+    name: Optional[str] = None
+    created_at: datetime
+    base_generation: int
+    stale: bool = False
+    changes: List[ScenarioChange] = Field(default_factory=list)
+    nodes: List[ScenarioNode] = Field(default_factory=list)
+
+class StreamOperation(str, Enum):
+    BET_CREATED = "bet.created"
+    BET_UPDATED = "bet.updated"
+    BET_DELETED = "bet.deleted"
+    TRANSACTION_CREATED = "transaction.created"
+    TRANSACTION_DELETED = "transaction.deleted"
+
+# One node whose totals changed, with its ancestors from the root down.
+class StreamDelta(BaseModel):
+    seq: int
+    op: StreamOperation
+    bet_id: UUID
+    node: Optional[BetSummary] = None
+    ancestors: List[BetSummary] = Field(default_factory=list)
+
+class SearchKind(str, Enum):
+    BET = "bet"
+    TRANSACTION = "transaction"
+
+class SearchHit(BaseModel):
+    kind: SearchKind
+    id: UUID
+    bet_id: UUID
+    bet_name: str
+    title: str # Bet name, or transaction description
+    detail: Optional[str] = None # Bet description, or transaction source
+    amount: Optional[Decimal] = None
+    type: Optional[TransactionType] = None
+    date: Optional[datetime] = None # Bet created_at, or transaction date
+    rank: float
+
+class AnalyticsDimension(str, Enum):
+    BET = "bet"
+    CHILD = "child" # The direct child of filters.root_id whose subtree holds the row
+    MONTH = "month"
+    SOURCE = "source"
+    TYPE = "type"
+
+class AnalyticsFunction(str, Enum):
+    SUM = "sum"
+    COUNT = "count"
+    MAX = "max"
+
+class AnalyticsMeasure(str, Enum):
+    AMOUNT = "amount"
+    REVENUE = "revenue"
+    EXPENSES = "expenses"
+    NET = "net" # Revenue minus expenses
+
+class AnalyticsComparison(str, Enum):
+    LT = "lt"
+    LE = "le"
+    GT = "gt"
+    GE = "ge"
+    EQ = "eq"
+    NE = "ne"
+
+class AnalyticsFilters(BaseModel):
+    root_id: Optional[UUID] = None # Only bets in this subtree
+    start: Optional[datetime] = None
+    end: Optional[datetime] = None # Exclusive
+    type: Optional[TransactionType] = None
+    status: List[BetStatus] = Field(default_factory=list)
+    health: List[BetHealth] = Field(default_factory=list)
+
+class AnalyticsAggregate(BaseModel):
+    fn: AnalyticsFunction
+    measure: AnalyticsMeasure = AnalyticsMeasure.AMOUNT
+    alias: Optional[str] = Field(None, pattern=r"^[a-z][a-z0-9_]{0,62}$") # Defaults to "<fn>_<measure>"
+
+    @property
+    def name(self) -> str:
+        return self.alias or f"{self.fn.value}_{self.measure.value}"
+
+class AnalyticsHaving(BaseModel):
+    aggregate: str
+    op: AnalyticsComparison
+    value: Decimal
+
+class AnalyticsOrder(BaseModel):
+    key: str
+    descending: bool = False
+
+class AnalyticsSpec(BaseModel):
+    filters: AnalyticsFilters = Field(default_factory=AnalyticsFilters)
+    group_by: List[AnalyticsDimension] = Field(default_factory=list, max_length=3)
+    aggregates: List[AnalyticsAggregate] = Field(..., min_length=1, max_length=8)
+    having: List[AnalyticsHaving] = Field(default_factory=list, max_length=8)
+    order_by: List[AnalyticsOrder] = Field(default_factory=list, max_length=8)
+    limit: int = Field(..., ge=1, le=1000) # Required: every answer is bounded
+
+class AnalyticsResult(BaseModel):
+    plan: str # Table the answer was computed from: "month_buckets", "day_buckets" or "ledger"
+    columns: List[str]
+    rows: List[Dict[str, Any]] = Field(default_factory=list)
+
+class SnapshotInfo(BaseModel):
+    id: int
+    taken_at: datetime
+    changed_bets: int = 0 # Bets whose values differed from the previous snapshot
+
+    class Config:
+        from_attributes = True
+
+class SnapshotChange(str, Enum):
+    ADDED = "added"
+    CHANGED = "changed"
+
+class SnapshotDiffEntry(BaseModel):
+    bet_id: UUID
+    name: str
+    change: SnapshotChange
+    before: Optional[BetSummary] = None
+    after: BetSummary
+    revenue_delta: Decimal = Decimal("0.00")
+    expenses_delta: Decimal = Decimal("0.00")
+    net_profit_delta: Decimal = Decimal("0.00")
+
+class SnapshotDiff(BaseModel):
+    base: SnapshotInfo
+    target: SnapshotInfo
+    changes: List[SnapshotDiffEntry] = Field(default_factory=list)
+
+class DormancySweepResult(BaseModel):
+    zombified: int = 0
+    revived: int = 0
+    swept_at: datetime = Field(default_factory=datetime.utcnow)
+
 BetTree.model_rebuild() # Rebuild to resolve forward reference
+BetTreeNode.model_rebuild()
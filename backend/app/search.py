@@ -0,0 +1,133 @@
+"""Ranked full-text search over bets and the ledger.
+
+Bet names and descriptions, and transaction descriptions and sources, are
+matched against GIN indexes on the ``*_SEARCH_DOCUMENT`` expressions in
+``models``. Every word of the query is a prefix match, so ``aws ec`` finds
+"AWS EC2 reserved instances".
+
+A common word can match millions of ledger rows, so ranking never looks at
+all of them: each kind contributes at most ``SEARCH_MAX_CANDIDATES`` matches,
+newest first. With a ``LIMIT`` the planner can either read the GIN index for
+a rare word or walk the ``(date, id)`` index backwards and stop early for a
+common one, which keeps latency flat as the ledger grows. Only those
+candidates are ranked and paginated.
+"""
+from __future__ import annotations
+
+import os
+import re
+from typing import Optional
+
+from sqlalchemy import Numeric, String, cast, func, literal, literal_column, null, select, union_all
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from .models import BET_SEARCH_DOCUMENT, TRANSACTION_SEARCH_DOCUMENT, Bet, Transaction
+from .schemas import SearchHit, SearchKind
+
+SEARCH_MAX_CANDIDATES = int(os.getenv("SEARCH_MAX_CANDIDATES", "1000"))
+SEARCH_MAX_TERMS = 8
+
+WORD = re.compile(r"[^\W_]+")
+
+
+def parse_query(q: str) -> str:
+    """A ``to_tsquery`` string requiring every word of ``q`` as a prefix."""
+    words = WORD.findall(q.lower())[:SEARCH_MAX_TERMS]
+    if not words:
+        raise ValueError("Search query must contain at least one letter or digit")
+    return " & ".join(f"{word}:*" for word in words)
+
+
+def _matches(document: str, tsquery):
+    return literal_column(f"({document})").op("@@")(tsquery)
+
+
+def _rank(document: str, tsquery):
+    # Unqualified column names in the document resolve against the candidate subquery.
+    return func.ts_rank(literal_column(f"({document})"), tsquery).label("rank")
+
+
+# Candidates are ordered by plain ``DESC`` (nulls first) so that a backward
+# scan of the ``(created_at, id)`` / ``(date, id)`` indexes can serve them.
+def _bet_hits(tsquery):
+    candidates = (
+        select(Bet.id, Bet.name, Bet.description, Bet.created_at)
+        .where(_matches(BET_SEARCH_DOCUMENT, tsquery))
+        .order_by(Bet.created_at.desc(), Bet.id.desc())
+        .limit(SEARCH_MAX_CANDIDATES)
+        .subquery("bet_candidates")
+    )
+    return select(
+        literal(SearchKind.BET.value).label("kind"),
+        candidates.c.id,
+        candidates.c.id.label("bet_id"),
+        candidates.c.name.label("bet_name"),
+        candidates.c.name.label("title"),
+        candidates.c.description.label("detail"),
+        cast(null(), Numeric(14, 2)).label("amount"),
+        cast(null(), String).label("type"),
+        candidates.c.created_at.label("date"),
+        _rank(BET_SEARCH_DOCUMENT, tsquery),
+    ).select_from(candidates)
+
+
+def _transaction_hits(tsquery):
+    candidates = (
+        select(
+            Transaction.id,
+            Transaction.bet_id,
+            Transaction.description,
+            Transaction.source,
+            Transaction.amount,
+            Transaction.type,
+            Transaction.date,
+        )
+        .where(_matches(TRANSACTION_SEARCH_DOCUMENT, tsquery))
+        .order_by(Transaction.date.desc(), Transaction.id.desc())
+        .limit(SEARCH_MAX_CANDIDATES)
+        .subquery("transaction_candidates")
+    )
+    ranked = select(candidates, _rank(TRANSACTION_SEARCH_DOCUMENT, tsquery)).subquery("ranked_transactions")
+    return (
+        select(
+            literal(SearchKind.TRANSACTION.value).label("kind"),
+            ranked.c.id,
+            ranked.c.bet_id,
+            Bet.name.label("bet_name"),
+            ranked.c.description.label("title"),
+            ranked.c.source.label("detail"),
+            ranked.c.amount,
+            cast(ranked.c.type, String).label("type"),
+            ranked.c.date,
+            ranked.c.rank,
+        )
+        .select_from(ranked)
+        .join(Bet, Bet.id == ranked.c.bet_id)
+    )
+
+
+def search_query(q: str, kind: Optional[SearchKind] = None, skip: int = 0, limit: int = 20):
+    tsquery = func.to_tsquery(literal_column("'simple'::regconfig"), parse_query(q))
+    parts = []
+    if kind in (None, SearchKind.BET):
+        parts.append(_bet_hits(tsquery))
+    if kind in (None, SearchKind.TRANSACTION):
+        parts.append(_transaction_hits(tsquery))
+    hits = union_all(*parts).subquery("hits") if len(parts) > 1 else parts[0].subquery("hits")
+    return (
+        select(hits)
+        .order_by(hits.c.rank.desc(), hits.c.date.desc().nulls_last(), hits.c.kind, hits.c.id)
+        .offset(skip)
+        .limit(limit)
+    )
+
+
+async def search(
+    db: AsyncSession,
+    q: str,
+    kind: Optional[SearchKind] = None,
+    skip: int = 0,
+    limit: int = 20,
+) -> list[SearchHit]:
+    result = await db.execute(search_query(q, kind, skip, limit))
+    return [SearchHit(**row) for row in result.mappings()]
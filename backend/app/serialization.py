@@ -0,0 +1,41 @@
+"""JSON encoding for bet trees that skips response-model validation.
+
+Nodes are trusted (built by ``crud`` from typed rows), so they are encoded
+straight to bytes by pydantic-core's native serializer, skipping both the
+intermediate Python structure and the stdlib encoder. The bytes match what
+the ``response_model`` path produces, apart from exponent formatting of very
+small floats (``1e-7`` rather than ``1e-07``; the same JSON number).
+"""
+from __future__ import annotations
+
+from typing import Iterable, Iterator, List
+
+from pydantic import TypeAdapter
+
+from .schemas import BetTree, BetTreeNode
+
+MEDIA_TYPE = "application/json"
+
+_forest_adapter = TypeAdapter(List[BetTree])
+_tree_adapter = TypeAdapter(BetTree)
+_nodes_adapter = TypeAdapter(List[BetTreeNode])
+
+
+def encode_tree(node: BetTree) -> bytes:
+    return _tree_adapter.dump_json(node)
+
+
+def encode_forest(roots: List[BetTree]) -> bytes:
+    return _forest_adapter.dump_json(roots)
+
+
+def encode_nodes(nodes: List[BetTreeNode]) -> bytes:
+    return _nodes_adapter.dump_json(nodes)
+
+
+def iter_forest(roots: Iterable[BetTree]) -> Iterator[bytes]:
+    """Encode one root tree per chunk so large forests never exist as one buffer."""
+    yield b"["
+    for index, root in enumerate(roots):
+        yield (b"," if index else b"") + encode_tree(root)
+    yield b"]"
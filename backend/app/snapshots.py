@@ -0,0 +1,275 @@
+"""Point-in-time snapshots of every bet's summary.
+
+``take_snapshot`` records one ``snapshots`` row and, in a single
+``INSERT ... SELECT``, a ``bet_snapshots`` row for each bet whose values
+(structure, rollup totals, last activity and health) differ from that bet's
+latest snapshot row. Unchanged bets cost nothing, so a daily snapshot of a
+quiet org stays a few rows.
+
+A bet's state as of snapshot ``S`` is its newest row with ``snapshot_id <= S``.
+``/v1/bets/tree?as_of=`` and ``/v1/snapshots/diff`` read that directly; neither
+replays the ledger. ``inactive_days`` is derived from the snapshot time
+when read, so it does not count as a change.
+
+The periodic task takes a snapshot every ``SNAPSHOT_INTERVAL_SECONDS``. An
+advisory lock and a minimum age keep several worker processes from taking
+one each.
+"""
+from __future__ import annotations
+
+import asyncio
+import contextlib
+import os
+import traceback
+from datetime import datetime, timedelta
+from decimal import Decimal
+from typing import Optional
+from uuid import UUID
+
+from sqlalchemy import func, insert, literal, select, true, tuple_, update
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import aliased
+
+from . import crud, serialization
+from .analytics import health_expression
+from .cache import summary_cache
+from .database import AsyncSessionLocal
+from .models import Bet, BetRollup, BetSnapshot, Snapshot
+from .schemas import BetHealth, BetSummary, SnapshotChange, SnapshotDiff, SnapshotDiffEntry, SnapshotInfo
+
+SNAPSHOT_INTERVAL_SECONDS = float(os.getenv("SNAPSHOT_INTERVAL_SECONDS", "86400"))
+SNAPSHOT_LOCK_ID = 0x62657473 # Advisory lock key shared by every process taking snapshots
+
+VALUE_COLUMNS = [
+    "name",
+    "description",
+    "budget",
+    "status",
+    "flagged",
+    "parent_id",
+    "created_at",
+    "updated_at",
+    "direct_revenue",
+    "direct_expenses",
+    "total_revenue",
+    "total_expenses",
+    "last_transaction_at",
+    "health",
+]
+
+
+def _current_values(now: datetime) -> list:
+    """Live values in ``VALUE_COLUMNS`` order, over ``Bet`` outer-joined to ``BetRollup``."""
+    return [
+        Bet.name,
+        Bet.description,
+        Bet.budget,
+        Bet.status,
+        Bet.flagged,
+        Bet.parent_id,
+        Bet.created_at,
+        Bet.updated_at,
+        func.coalesce(BetRollup.direct_revenue, 0),
+        func.coalesce(BetRollup.direct_expenses, 0),
+        func.coalesce(BetRollup.total_revenue, 0),
+        func.coalesce(BetRollup.total_expenses, 0),
+        BetRollup.last_transaction_at,
+        health_expression(now),
+    ]
+
+
+async def take_snapshot(
+    db: AsyncSession,
+    now: Optional[datetime] = None,
+    min_interval: Optional[timedelta] = None,
+) -> Optional[SnapshotInfo]:
+    """Snapshot every changed bet; ``None`` if one was taken less than ``min_interval`` ago."""
+    # Taken under the lock so snapshot ids and times increase together.
+    await db.execute(select(func.pg_advisory_xact_lock(SNAPSHOT_LOCK_ID)))
+    now = now or datetime.utcnow()
+    if min_interval is not None:
+        latest = await db.scalar(select(func.max(Snapshot.taken_at)))
+        if latest is not None and now - latest < min_interval:
+            await db.rollback()
+            return None
+
+    snapshot_id = await db.scalar(insert(Snapshot).values(taken_at=now, changed_bets=0).returning(Snapshot.id))
+    current = _current_values(now)
+    previous = (
+        select(*(getattr(BetSnapshot, column) for column in VALUE_COLUMNS))
+        .where(BetSnapshot.bet_id == Bet.id)
+        .order_by(BetSnapshot.snapshot_id.desc())
+        .limit(1)
+        .lateral("previous")
+    )
+    # A bet with no earlier row compares against all NULLs, and ``name`` is never NULL.
+    changed = (
+        select(literal(snapshot_id), Bet.id, *current)
+        .select_from(Bet)
+        .outerjoin(BetRollup, BetRollup.bet_id == Bet.id)
+        .outerjoin(previous, true())
+        .where(tuple_(*current).is_distinct_from(tuple_(*previous.c)))
+    )
+    result = await db.execute(
+        insert(BetSnapshot).from_select(["snapshot_id", "bet_id", *VALUE_COLUMNS], changed)
+    )
+    await db.execute(update(Snapshot).where(Snapshot.id == snapshot_id).values(changed_bets=result.rowcount))
+    # Live data is unchanged, so cached summaries stay valid: no ``crud._commit``.
+    await db.commit()
+    return SnapshotInfo(id=snapshot_id, taken_at=now, changed_bets=result.rowcount)
+
+
+async def list_snapshots(db: AsyncSession, limit: int = 50) -> list[SnapshotInfo]:
+    result = await db.execute(select(Snapshot).order_by(Snapshot.taken_at.desc(), Snapshot.id.desc()).limit(limit))
+    return [SnapshotInfo.model_validate(snapshot) for snapshot in result.scalars()]
+
+
+async def snapshot_as_of(db: AsyncSession, as_of: datetime) -> Optional[Snapshot]:
+    """The latest snapshot taken at or before ``as_of``."""
+    result = await db.execute(
+        select(Snapshot)
+        .where(Snapshot.taken_at <= as_of)
+        .order_by(Snapshot.taken_at.desc(), Snapshot.id.desc())
+        .limit(1)
+    )
+    return result.scalar_one_or_none()
+
+
+def _state(snapshot_id: int):
+    """Each bet's newest row at or before ``snapshot_id``."""
+    return (
+        select(BetSnapshot)
+        .where(BetSnapshot.snapshot_id <= snapshot_id)
+        .distinct(BetSnapshot.bet_id)
+        .order_by(BetSnapshot.bet_id, BetSnapshot.snapshot_id.desc())
+    )
+
+
+def _summary(row: BetSnapshot, taken_at: datetime) -> BetSummary:
+    net_profit = row.total_revenue - row.total_expenses
+    roi = float((net_profit / row.total_expenses) * 100) if row.total_expenses > 0 else 0.0
+    return BetSummary(
+        id=row.bet_id,
+        name=row.name,
+        description=row.description,
+        budget=row.budget,
+        status=row.status,
+        flagged=row.flagged,
+        parent_id=row.parent_id,
+        created_at=row.created_at,
+        updated_at=row.updated_at,
+        direct_revenue=row.direct_revenue,
+        direct_expenses=row.direct_expenses,
+        total_revenue=row.total_revenue,
+        total_expenses=row.total_expenses,
+        net_profit=net_profit,
+        roi=roi,
+        health=BetHealth(row.health),
+        last_transaction_at=row.last_transaction_at,
+        inactive_days=crud._calculate_inactive_days(row.last_transaction_at or row.created_at, taken_at),
+    )
+
+
+async def get_tree_as_of_json(db: AsyncSession, as_of: datetime) -> Optional[tuple[SnapshotInfo, bytes]]:
+    snapshot = await snapshot_as_of(db, as_of)
+    if snapshot is None:
+        return None
+
+    async def compute() -> bytes:
+        result = await db.execute(_state(snapshot.id))
+        summaries = {row.bet_id: _summary(row, snapshot.taken_at) for row in result.scalars()}
+        nodes = crud._assemble_tree(list(summaries.values()), summaries)
+        roots = [node for node in nodes.values() if node.parent_id is None]
+        roots.sort(key=lambda node: node.created_at or datetime.min)
+        return serialization.encode_forest(roots)
+
+    body = await summary_cache.get_or_compute(("tree-as-of", snapshot.id), compute, db=db)
+    return SnapshotInfo.model_validate(snapshot), body
+
+
+def _same_values(before: BetSnapshot, after: BetSnapshot) -> bool:
+    return all(getattr(before, column) == getattr(after, column) for column in VALUE_COLUMNS)
+
+
+async def diff(db: AsyncSession, base_id: int, target_id: Optional[int] = None) -> Optional[SnapshotDiff]:
+    """Bets whose values differ between two snapshots, largest net profit change first."""
+    if target_id is None:
+        target_id = await db.scalar(select(func.max(Snapshot.id)))
+    result = await db.execute(select(Snapshot).where(Snapshot.id.in_([base_id, target_id])))
+    snapshots = {snapshot.id: snapshot for snapshot in result.scalars()}
+    if base_id not in snapshots or target_id not in snapshots:
+        return None
+    base, target = snapshots[base_id], snapshots[target_id]
+    if base.taken_at > target.taken_at:
+        raise ValueError("base must not be taken after target")
+
+    between = aliased(BetSnapshot, name="between_snapshots")
+    touched = (
+        select(between.bet_id)
+        .where(between.snapshot_id > base.id, between.snapshot_id <= target.id)
+        .distinct()
+    )
+    result = await db.execute(_state(base.id).where(BetSnapshot.bet_id.in_(touched)))
+    before_rows: dict[UUID, BetSnapshot] = {row.bet_id: row for row in result.scalars()}
+    result = await db.execute(_state(target.id).where(BetSnapshot.bet_id.in_(touched)))
+
+    changes = []
+    for after_row in result.scalars():
+        before_row = before_rows.get(after_row.bet_id)
+        # Values that changed and changed back between the two snapshots are no change.
+        if before_row is not None and _same_values(before_row, after_row):
+            continue
+        before = _summary(before_row, base.taken_at) if before_row is not None else None
+        after = _summary(after_row, target.taken_at)
+        zero = Decimal("0.00")
+        changes.append(
+            SnapshotDiffEntry(
+                bet_id=after.id,
+                name=after.name,
+                change=SnapshotChange.ADDED if before is None else SnapshotChange.CHANGED,
+                before=before,
+                after=after,
+                revenue_delta=after.total_revenue - (before.total_revenue if before else zero),
+                expenses_delta=after.total_expenses - (before.total_expenses if before else zero),
+                net_profit_delta=after.net_profit - (before.net_profit if before else zero),
+            )
+        )
+    changes.sort(key=lambda entry: (-abs(entry.net_profit_delta), entry.name))
+    return SnapshotDiff(
+        base=SnapshotInfo.model_validate(base),
+        target=SnapshotInfo.model_validate(target),
+        changes=changes,
+    )
+
+
+async def snapshot_once(min_interval: Optional[timedelta] = None) -> Optional[SnapshotInfo]:
+    async with AsyncSessionLocal() as session:
+        return await take_snapshot(session, min_interval=min_interval)
+
+
+async def _run_forever(interval: float) -> None:
+    # Another worker's snapshot from the last half interval counts as this one.
+    min_interval = timedelta(seconds=interval / 2)
+    while True:
+        try:
+            snapshot = await snapshot_once(min_interval)
+            if snapshot is not None:
+                print(f"Snapshot {snapshot.id}: {snapshot.changed_bets} bets changed")
+        except Exception:
+            traceback.print_exc()
+        await asyncio.sleep(interval)
+
+
+def start(interval: float = SNAPSHOT_INTERVAL_SECONDS) -> Optional[asyncio.Task]:
+    """Start periodic snapshots; an interval of 0 or less disables them."""
+    if interval <= 0:
+        return None
+    return asyncio.create_task(_run_forever(interval), name="snapshotter")
+
+
+async def stop(task: Optional[asyncio.Task]) -> None:
+    if task is None:
+        return
+    task.cancel()
+    with contextlib.suppress(asyncio.CancelledError):
+        await task
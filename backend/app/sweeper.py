@@ -0,0 +1,50 @@
+"""Background dormancy sweeper.
+
+Reads never change ``Bet.status``; instead this task periodically flips
+ACTIVE/DORMANT bets to ZOMBIE (and back) with set-based updates driven by
+the last-activity index on ``bet_rollups``.
+"""
+from __future__ import annotations
+
+import asyncio
+import contextlib
+import os
+import traceback
+from typing import Optional
+
+from . import crud
+from .database import AsyncSessionLocal
+from .schemas import DormancySweepResult
+
+DORMANCY_SWEEP_INTERVAL_SECONDS = float(os.getenv("DORMANCY_SWEEP_INTERVAL_SECONDS", "300"))
+
+
+async def sweep_once() -> DormancySweepResult:
+    async with AsyncSessionLocal() as session:
+        return await crud.sweep_dormancy(session)
+
+
+async def _run_forever(interval: float) -> None:
+    while True:
+        try:
+            result = await sweep_once()
+            if result.zombified or result.revived:
+                print(f"Dormancy sweep: {result.zombified} zombified, {result.revived} revived")
+        except Exception:
+            traceback.print_exc()
+        await asyncio.sleep(interval)
+
+
+def start(interval: float = DORMANCY_SWEEP_INTERVAL_SECONDS) -> Optional[asyncio.Task]:
+    """Start the periodic sweep; an interval of 0 or less disables it."""
+    if interval <= 0:
+        return None
+    return asyncio.create_task(_run_forever(interval), name="dormancy-sweeper")
+
+
+async def stop(task: Optional[asyncio.Task]) -> None:
+    if task is None:
+        return
+    task.cancel()
+    with contextlib.suppress(asyncio.CancelledError):
+        await task
@@ -0,0 +1,236 @@
+"""Request, database and stage metrics in the Prometheus text format.
+
+``instrument_engine`` hooks SQLAlchemy cursor events to count and time
+queries, ``RequestTimingMiddleware`` records per-route latency and writes a
+``Server-Timing`` header, and ``stage`` times named sections of hot code
+paths. Everything is exposed by ``render`` for the ``/metrics`` route.
+"""
+from __future__ import annotations
+
+import threading
+import time
+from bisect import bisect_left
+from contextlib import contextmanager
+from contextvars import ContextVar
+from dataclasses import dataclass, field
+from typing import Callable, Iterable, Iterator, Optional
+
+from sqlalchemy import event
+from sqlalchemy.ext.asyncio import AsyncEngine
+from starlette.middleware.base import BaseHTTPMiddleware
+from starlette.requests import Request
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+QUERY_COUNT_BUCKETS = (1, 2, 5, 10, 20, 50, 100, 250, 1000)
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _format_labels(names: tuple[str, ...], values: tuple[str, ...], extra: str = "") -> str:
+    pairs = [f'{name}="{_escape(value)}"' for name, value in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+class _Metric:
+    kind = ""
+
+    def __init__(self, name: str, documentation: str, labelnames: tuple[str, ...] = ()) -> None:
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = labelnames
+        self._lock = threading.Lock()
+        REGISTRY.append(self)
+
+    def _key(self, labels: dict) -> tuple[str, ...]:
+        return tuple(str(labels[name]) for name in self.labelnames)
+
+    def header(self) -> Iterator[str]:
+        yield f"# HELP {self.name} {self.documentation}"
+        yield f"# TYPE {self.name} {self.kind}"
+
+
+class Counter(_Metric):
+    kind = "counter"
+
+    def __init__(self, name: str, documentation: str, labelnames: tuple[str, ...] = ()) -> None:
+        super().__init__(name, documentation, labelnames)
+        self._values: dict[tuple[str, ...], float] = {}
+
+    def inc(self, amount: float = 1.0, **labels) -> None:
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0.0) + amount
+
+    def collect(self) -> Iterator[str]:
+        yield from self.header()
+        with self._lock:
+            values = list(self._values.items())
+        for key, value in values:
+            yield f"{self.name}{_format_labels(self.labelnames, key)} {value}"
+
+
+class Histogram(_Metric):
+    kind = "histogram"
+
+    def __init__(
+        self,
+        name: str,
+        documentation: str,
+        labelnames: tuple[str, ...] = (),
+        buckets: tuple[float, ...] = LATENCY_BUCKETS,
+    ) -> None:
+        super().__init__(name, documentation, labelnames)
+        self.buckets = buckets
+        # Per label set: non-cumulative bucket counts (last slot is +Inf), sum.
+        self._series: dict[tuple[str, ...], tuple[list[int], list[float]]] = {}
+
+    def observe(self, value: float, **labels) -> None:
+        key = self._key(labels)
+        with self._lock:
+            series = self._series.get(key)
+            if series is None:
+                series = self._series[key] = ([0] * (len(self.buckets) + 1), [0.0])
+            series[0][bisect_left(self.buckets, value)] += 1
+            series[1][0] += value
+
+    def collect(self) -> Iterator[str]:
+        yield from self.header()
+        with self._lock:
+            snapshot = [(key, list(counts), total[0]) for key, (counts, total) in self._series.items()]
+        for key, counts, total in snapshot:
+            cumulative = 0
+            for bound, count in zip((*self.buckets, "+Inf"), counts):
+                cumulative += count
+                labels = _format_labels(self.labelnames, key, f'le="{bound}"')
+                yield f"{self.name}_bucket{labels} {cumulative}"
+            labels = _format_labels(self.labelnames, key)
+            yield f"{self.name}_sum{labels} {total}"
+            yield f"{self.name}_count{labels} {cumulative}"
+
+
+class GaugeFunction(_Metric):
+    """Gauge whose value is read from ``function`` at scrape time."""
+
+    kind = "gauge"
+
+    def __init__(self, name: str, documentation: str, function: Callable[[], Optional[float]]) -> None:
+        super().__init__(name, documentation)
+        self.function = function
+
+    def collect(self) -> Iterator[str]:
+        value = self.function()
+        if value is None:
+            return
+        yield from self.header()
+        yield f"{self.name} {value}"
+
+
+REGISTRY: list[_Metric] = []
+
+REQUEST_SECONDS = Histogram(
+    "betmetric_http_request_duration_seconds",
+    "HTTP request latency by route template.",
+    ("method", "route", "status"),
+)
+REQUEST_QUERIES = Histogram(
+    "betmetric_http_request_db_queries",
+    "Database queries issued per HTTP request.",
+    ("method", "route"),
+    buckets=QUERY_COUNT_BUCKETS,
+)
+REQUEST_QUERY_SECONDS = Histogram(
+    "betmetric_http_request_db_seconds",
+    "Time spent in database queries per HTTP request.",
+    ("method", "route"),
+)
+QUERIES_TOTAL = Counter("betmetric_db_queries_total", "Database queries executed.")
+QUERY_SECONDS_TOTAL = Counter("betmetric_db_query_seconds_total", "Time spent executing database queries.")
+STAGE_SECONDS = Histogram("betmetric_stage_duration_seconds", "Duration of instrumented code stages.", ("stage",))
+
+
+@dataclass
+class RequestStats:
+    queries: int = 0
+    query_seconds: float = 0.0
+    stages: dict[str, float] = field(default_factory=dict)
+
+
+# Mutated in place so the greenlets SQLAlchemy runs cursor events in see the same object.
+_request_stats: ContextVar[Optional[RequestStats]] = ContextVar("request_stats", default=None)
+
+
+@contextmanager
+def stage(name: str) -> Iterator[None]:
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        elapsed = time.perf_counter() - started
+        STAGE_SECONDS.observe(elapsed, stage=name)
+        stats = _request_stats.get()
+        if stats is not None:
+            stats.stages[name] = stats.stages.get(name, 0.0) + elapsed
+
+
+def instrument_engine(engine: AsyncEngine, pool_name: str = "db_pool") -> None:
+    sync_engine = engine.sync_engine
+
+    @event.listens_for(sync_engine, "before_cursor_execute")
+    def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        conn.info.setdefault("query_started", []).append(time.perf_counter())
+
+    @event.listens_for(sync_engine, "after_cursor_execute")
+    def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        elapsed = time.perf_counter() - conn.info["query_started"].pop()
+        QUERIES_TOTAL.inc()
+        QUERY_SECONDS_TOTAL.inc(elapsed)
+        stats = _request_stats.get()
+        if stats is not None:
+            stats.queries += 1
+            stats.query_seconds += elapsed
+
+    pool = sync_engine.pool
+    if not hasattr(pool, "checkedout"):
+        return
+    prefix = f"betmetric_{pool_name}"
+    GaugeFunction(f"{prefix}_size", "Configured connection pool size.", pool.size)
+    GaugeFunction(f"{prefix}_checked_out", "Connections currently checked out of the pool.", pool.checkedout)
+    GaugeFunction(f"{prefix}_checked_in", "Idle connections held by the pool.", pool.checkedin)
+    # QueuePool reports overflow as negative while it still has unopened slots.
+    GaugeFunction(f"{prefix}_overflow", "Connections open beyond the pool size.", lambda: max(pool.overflow(), 0))
+
+
+def _server_timing(stats: RequestStats, total: float) -> str:
+    entries = [f'db;dur={stats.query_seconds * 1000:.1f};desc="{stats.queries} queries"']
+    entries.extend(f"{name};dur={seconds * 1000:.1f}" for name, seconds in stats.stages.items())
+    entries.append(f"total;dur={total * 1000:.1f}")
+    return ", ".join(entries)
+
+
+class RequestTimingMiddleware(BaseHTTPMiddleware):
+    async def dispatch(self, request: Request, call_next):
+        stats = RequestStats()
+        token = _request_stats.set(stats)
+        started = time.perf_counter()
+        try:
+            response = await call_next(request)
+        finally:
+            _request_stats.reset(token)
+        elapsed = time.perf_counter() - started
+
+        route = request.scope.get("route")
+        route_path = getattr(route, "path", "unmatched")
+        REQUEST_SECONDS.observe(elapsed, method=request.method, route=route_path, status=response.status_code)
+        REQUEST_QUERIES.observe(stats.queries, method=request.method, route=route_path)
+        REQUEST_QUERY_SECONDS.observe(stats.query_seconds, method=request.method, route=route_path)
+        response.headers["Server-Timing"] = _server_timing(stats, elapsed)
+        return response
+
+
+def render(metrics: Iterable[_Metric] = REGISTRY) -> str:
+    return "\n".join(line for metric in metrics for line in metric.collect()) + "\n"
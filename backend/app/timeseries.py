@@ -0,0 +1,203 @@
+"""Day and month P&L buckets per bet.
+
+Ledger writes upsert their amounts into ``ledger_buckets`` in the same DB
+transaction, so burn-rate and sparkline queries aggregate a few buckets
+instead of scanning the ledger. ``rebuild`` recomputes the table from
+scratch.
+"""
+from __future__ import annotations
+
+from datetime import date, datetime, timedelta, timezone
+from decimal import Decimal
+from typing import Iterable, Optional
+from uuid import UUID
+
+from sqlalchemy import delete, func, literal, literal_column, select
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from . import hierarchy
+from .models import BetClosure, LedgerBucket, Transaction, TransactionType
+from .rollups import ZERO, split_amount
+from .schemas import BetTimeseries, TimeGranularity, TimeseriesPoint
+
+UPSERT_CHUNK_SIZE = 1000
+DEFAULT_WINDOWS = {
+    TimeGranularity.DAY: timedelta(days=90),
+    TimeGranularity.MONTH: timedelta(days=730),
+}
+
+
+def naive_utc(moment: Optional[datetime]) -> Optional[datetime]:
+    """``moment`` as the naive UTC datetime the ledger stores; naive input is taken as UTC already."""
+    if moment is None or moment.tzinfo is None:
+        return moment
+    return moment.astimezone(timezone.utc).replace(tzinfo=None)
+
+
+def bucket_start(moment: datetime, granularity: TimeGranularity) -> date:
+    if granularity == TimeGranularity.MONTH:
+        return moment.date().replace(day=1)
+    return moment.date()
+
+
+def _bucket_deltas(rows: Iterable[dict], sign: int) -> list[dict]:
+    deltas: dict[tuple, list] = {}
+    for row in rows:
+        if not row.get("date"):
+            continue
+        revenue, expenses = split_amount(row["type"], row["amount"])
+        for granularity in TimeGranularity:
+            key = (row["bet_id"], granularity.value, bucket_start(row["date"], granularity))
+            delta = deltas.setdefault(key, [ZERO, ZERO, 0])
+            delta[0] += sign * revenue
+            delta[1] += sign * expenses
+            delta[2] += sign
+    return [
+        {
+            "bet_id": bet_id,
+            "granularity": granularity,
+            "bucket_start": start,
+            "revenue": revenue,
+            "expenses": expenses,
+            "transaction_count": count,
+        }
+        for (bet_id, granularity, start), (revenue, expenses, count) in deltas.items()
+    ]
+
+
+async def _upsert(db: AsyncSession, deltas: list[dict]) -> None:
+    for start in range(0, len(deltas), UPSERT_CHUNK_SIZE):
+        statement = pg_insert(LedgerBucket).values(deltas[start : start + UPSERT_CHUNK_SIZE])
+        statement = statement.on_conflict_do_update(
+            index_elements=[LedgerBucket.bet_id, LedgerBucket.granularity, LedgerBucket.bucket_start],
+            set_={
+                "revenue": LedgerBucket.revenue + statement.excluded.revenue,
+                "expenses": LedgerBucket.expenses + statement.excluded.expenses,
+                "transaction_count": LedgerBucket.transaction_count + statement.excluded.transaction_count,
+            },
+        )
+        await db.execute(statement)
+
+
+def _as_row(tx: Transaction) -> dict:
+    return {"bet_id": tx.bet_id, "type": tx.type, "amount": tx.amount, "date": tx.date}
+
+
+async def record_rows(db: AsyncSession, rows: Iterable[dict]) -> None:
+    await _upsert(db, _bucket_deltas(rows, 1))
+
+
+async def record_transaction(db: AsyncSession, tx: Transaction) -> None:
+    await record_rows(db, [_as_row(tx)])
+
+
+async def remove_transaction(db: AsyncSession, tx: Transaction) -> None:
+    await _upsert(db, _bucket_deltas([_as_row(tx)], -1))
+
+
+async def rebuild(db: AsyncSession) -> None:
+    """Recompute every bucket from the ledger. The caller owns the transaction."""
+    await db.execute(delete(LedgerBucket))
+    for granularity in TimeGranularity:
+        # Inline the unit so SELECT and GROUP BY render the identical expression.
+        unit = literal_column(f"'{granularity.value}'")
+        start = func.date_trunc(unit, Transaction.date).cast(LedgerBucket.bucket_start.type)
+        await db.execute(
+            pg_insert(LedgerBucket).from_select(
+                ["bet_id", "granularity", "bucket_start", "revenue", "expenses", "transaction_count"],
+                select(
+                    Transaction.bet_id,
+                    literal(granularity.value),
+                    start,
+                    func.coalesce(func.sum(Transaction.amount).filter(Transaction.type == TransactionType.REVENUE), 0),
+                    func.coalesce(func.sum(Transaction.amount).filter(Transaction.type == TransactionType.EXPENSE), 0),
+                    func.count(),
+                )
+                .where(Transaction.date.is_not(None))
+                .group_by(Transaction.bet_id, start),
+            )
+        )
+
+
+async def expenses_since(db: AsyncSession, cutoff: datetime) -> Decimal:
+    """Exact ledger expenses dated at or after ``cutoff``.
+
+    Whole days come from the day buckets; only the partial first day reads raw transactions.
+    """
+    first_full_day = cutoff.date() + timedelta(days=1)
+    from_buckets = (
+        select(func.coalesce(func.sum(LedgerBucket.expenses), 0))
+        .where(
+            LedgerBucket.granularity == TimeGranularity.DAY.value,
+            LedgerBucket.bucket_start >= first_full_day,
+        )
+        .scalar_subquery()
+    )
+    partial_day = (
+        select(func.coalesce(func.sum(Transaction.amount), 0))
+        .where(
+            Transaction.type == TransactionType.EXPENSE,
+            Transaction.date >= cutoff,
+            Transaction.date < datetime.combine(first_full_day, datetime.min.time()),
+        )
+        .scalar_subquery()
+    )
+    result = await db.execute(select(from_buckets + partial_day))
+    return Decimal(result.scalar_one())
+
+
+async def get_timeseries(
+    db: AsyncSession,
+    granularity: TimeGranularity,
+    bet_id: Optional[UUID] = None,
+    start: Optional[date] = None,
+    end: Optional[date] = None,
+) -> list[BetTimeseries]:
+    """Subtree-rolled series for ``bet_id``, or one series per bet when ``bet_id`` is omitted."""
+    end = end or datetime.utcnow().date()
+    start = start or end - DEFAULT_WINDOWS[granularity]
+    if granularity == TimeGranularity.MONTH:
+        start = start.replace(day=1)
+
+    in_range = (
+        LedgerBucket.granularity == granularity.value,
+        LedgerBucket.bucket_start >= start,
+        LedgerBucket.bucket_start <= end,
+    )
+    revenue = func.sum(LedgerBucket.revenue).label("revenue")
+    expenses = func.sum(LedgerBucket.expenses).label("expenses")
+
+    if bet_id is not None:
+        query = (
+            select(LedgerBucket.bucket_start, revenue, expenses)
+            .where(*in_range, LedgerBucket.bet_id.in_(hierarchy.descendant_ids(bet_id)))
+            .group_by(LedgerBucket.bucket_start)
+            .order_by(LedgerBucket.bucket_start)
+        )
+    else:
+        query = (
+            select(BetClosure.ancestor_id.label("bet_id"), LedgerBucket.bucket_start, revenue, expenses)
+            .select_from(LedgerBucket)
+            .join(BetClosure, BetClosure.descendant_id == LedgerBucket.bet_id)
+            .where(*in_range)
+            .group_by(BetClosure.ancestor_id, LedgerBucket.bucket_start)
+            .order_by(BetClosure.ancestor_id, LedgerBucket.bucket_start)
+        )
+
+    result = await db.execute(query)
+    series: dict[UUID, BetTimeseries] = {}
+    if bet_id is not None:
+        series[bet_id] = BetTimeseries(bet_id=bet_id, granularity=granularity)
+    for row in result.all():
+        row_bet_id = bet_id if bet_id is not None else row.bet_id
+        entry = series.setdefault(row_bet_id, BetTimeseries(bet_id=row_bet_id, granularity=granularity))
+        entry.points.append(
+            TimeseriesPoint(
+                bucket_start=row.bucket_start,
+                revenue=row.revenue,
+                expenses=row.expenses,
+                net=row.revenue - row.expenses,
+            )
+        )
+    return list(series.values())
@@ -0,0 +1,120 @@
+"""Load test for single-flight coalescing of summary computations.
+
+Run from ``backend/``::
+
+    python -m benchmarks.coalescing                               # in-process, no database
+    python -m benchmarks.coalescing --url http://localhost:8000   # against a running server
+
+In-process, ``--concurrency`` simultaneous tree requests miss an empty
+``SummaryCache`` and each would run the full-tree computation: a simulated
+database round trip (``--db-latency``) followed by the real summarize,
+assemble and serialize stages over a synthetic org. The run is repeated with
+coalescing off and on, and reports how many computations ran and the wall time.
+
+Against a server, the same number of concurrent ``GET /v1/bets/tree`` requests
+are sent and the ``betmetric_summary_cache_lookups_total`` counters are read
+from ``/metrics`` before and after. A cold run (the first after a write, or
+after ``SUMMARY_CACHE_TTL_SECONDS``) should show one ``miss`` per cache key
+and the rest ``coalesced``. A warm run shows ``hit`` instead.
+"""
+from __future__ import annotations
+
+import argparse
+import asyncio
+import json
+import re
+import time
+import urllib.request
+from concurrent.futures import ThreadPoolExecutor
+
+from app import crud, serialization
+from app.cache import SummaryCache
+from benchmarks.synthetic import generate_org
+
+LOOKUP_LINE = re.compile(r'^betmetric_summary_cache_lookups_total\{kind="([^"]*)",result="([^"]*)"\} (\S+)$')
+
+
+async def run_in_process(bet_count: int, concurrency: int, db_latency: float, coalesce: bool) -> dict:
+    org = generate_org(bet_count)
+    rows = org.rows
+    cache = SummaryCache(max_entries=16, ttl_seconds=0, coalesce=coalesce)
+    computations = 0
+
+    async def compute_tree_json() -> bytes:
+        nonlocal computations
+        computations += 1
+        await asyncio.sleep(db_latency)
+        bets, summaries = crud._summarize_rows(rows)
+        roots = [node for node in crud._assemble_tree(bets, summaries).values() if node.parent_id is None]
+        return serialization.encode_forest(roots)
+
+    started = time.perf_counter()
+    bodies = await asyncio.gather(
+        *(cache.get_or_compute(("tree", "json"), compute_tree_json) for _ in range(concurrency))
+    )
+    elapsed = time.perf_counter() - started
+    return {
+        "coalesce": coalesce,
+        "requests": concurrency,
+        "computations": computations,
+        "distinct_bodies": len({id(body) for body in bodies}),
+        "seconds": round(elapsed, 4),
+    }
+
+
+def _lookup_counters(url: str) -> dict[str, float]:
+    with urllib.request.urlopen(f"{url}/metrics") as response:
+        text = response.read().decode("utf-8")
+    counters = {}
+    for line in text.splitlines():
+        match = LOOKUP_LINE.match(line)
+        if match:
+            kind, result, value = match.groups()
+            counters[f"{kind}:{result}"] = float(value)
+    return counters
+
+
+def _get(url: str) -> int:
+    with urllib.request.urlopen(url) as response:
+        response.read()
+        return response.status
+
+
+def run_against_server(url: str, concurrency: int) -> dict:
+    url = url.rstrip("/")
+    before = _lookup_counters(url)
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        statuses = list(pool.map(_get, [f"{url}/v1/bets/tree"] * concurrency))
+    elapsed = time.perf_counter() - started
+    after = _lookup_counters(url)
+    deltas = {key: after[key] - before.get(key, 0.0) for key in after if after[key] != before.get(key, 0.0)}
+    return {
+        "requests": concurrency,
+        "statuses": {str(code): statuses.count(code) for code in sorted(set(statuses))},
+        "seconds": round(elapsed, 4),
+        "lookups": deltas,
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--url", help="Base URL of a running server; omit to run in-process")
+    parser.add_argument("--concurrency", type=int, default=50)
+    parser.add_argument("--bets", type=int, default=10_000, help="Synthetic org size (in-process only)")
+    parser.add_argument("--db-latency", type=float, default=0.05, help="Simulated query time in seconds (in-process only)")
+    args = parser.parse_args()
+
+    if args.url:
+        print(json.dumps(run_against_server(args.url, args.concurrency), indent=2))
+        return
+
+    results = [
+        asyncio.run(run_in_process(args.bets, args.concurrency, args.db_latency, coalesce))
+        for coalesce in (False, True)
+    ]
+    print(json.dumps(results, indent=2))
+
+
+if __name__ == "__main__":
+    main()
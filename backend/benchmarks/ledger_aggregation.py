@@ -0,0 +1,143 @@
+"""Compare ORM hydration against GROUP BY aggregation for the ledger recompute.
+
+Run from ``backend/`` against a throwaway database::
+
+    python -m benchmarks.ledger_aggregation --seed 1000000 --bets 2000
+
+``--seed`` inserts synthetic bets and transactions first; omit it to measure
+whatever the database already holds. Prints one JSON document with latency and
+peak Python memory for both strategies and fails if their totals differ.
+"""
+from __future__ import annotations
+
+import argparse
+import asyncio
+import json
+import os
+import time
+import tracemalloc
+import uuid
+from datetime import datetime
+from decimal import Decimal
+
+from sqlalchemy import insert, select, text
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
+
+from app import crud, ledger
+from app.models import Bet, Transaction
+
+
+async def seed(session: AsyncSession, bet_count: int, fanout: int, transaction_count: int) -> None:
+    now = datetime.utcnow()
+    ids = [uuid.uuid4() for _ in range(bet_count)]
+    await session.execute(
+        insert(Bet),
+        [
+            {
+                "id": bet_id,
+                "name": f"bench-{bet_id}",
+                "budget": Decimal("1000000.00"),
+                "parent_id": ids[(index - 1) // fanout] if index else None,
+                "created_at": now,
+                "updated_at": now,
+            }
+            for index, bet_id in enumerate(ids)
+        ],
+    )
+    await session.execute(
+        text(
+            """
+            INSERT INTO transactions (id, bet_id, amount, type, description, source, date, created_at, updated_at)
+            SELECT
+                gen_random_uuid(),
+                ids[1 + (g % cardinality(ids))],
+                round((random() * 1000)::numeric, 2) + 0.01,
+                CASE WHEN g % 4 = 0 THEN 'REVENUE'::transactiontype ELSE 'EXPENSE'::transactiontype END,
+                'benchmark',
+                'benchmark',
+                now() - (g % 365) * interval '1 day',
+                now(),
+                now()
+            FROM generate_series(1, :count) AS g, (SELECT array_agg(id) AS ids FROM bets) AS all_bets
+            """
+        ),
+        {"count": transaction_count},
+    )
+    await session.commit()
+
+
+async def hydrate_transactions(session: AsyncSession) -> dict:
+    """The pre-aggregation strategy: one ORM object per ledger row, summed in Python."""
+    bets = (await session.execute(select(Bet))).scalars().all()
+    transactions = (await session.execute(select(Transaction))).scalars().all()
+    snapshot = ledger.LedgerSnapshot([(bet.id, bet.parent_id) for bet in bets])
+    snapshot.add((tx.bet_id, tx.amount, tx.type, tx.date) for tx in transactions)
+    totals, last_tx_map = snapshot.totals()
+    return {bet_id: (bet_totals, last_tx_map[bet_id]) for bet_id, bet_totals in totals.items()}
+
+
+async def aggregate_in_sql(session: AsyncSession) -> dict:
+    _, totals_cache, last_tx_map = await crud._compute_totals_from_ledger(session)
+    return {bet_id: (totals, last_tx_map.get(bet_id)) for bet_id, totals in totals_cache.items()}
+
+
+async def measure(session_factory, strategy) -> tuple[dict, dict]:
+    async with session_factory() as session:
+        started = time.perf_counter()
+        result = await strategy(session)
+        elapsed = time.perf_counter() - started
+
+    tracemalloc.start()
+    async with session_factory() as session:
+        await strategy(session)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    return result, {"seconds": round(elapsed, 4), "peak_mib": round(peak / 2**20, 2)}
+
+
+async def run(args: argparse.Namespace) -> None:
+    engine = create_async_engine(args.database_url)
+    session_factory = async_sessionmaker(engine, expire_on_commit=False)
+
+    if args.seed:
+        async with session_factory() as session:
+            await seed(session, args.bets, args.fanout, args.seed)
+
+    async with session_factory() as session:
+        row_count = (await session.execute(text("SELECT count(*) FROM transactions"))).scalar_one()
+
+    hydrated, hydrate_stats = await measure(session_factory, hydrate_transactions)
+    aggregated, aggregate_stats = await measure(session_factory, aggregate_in_sql)
+    await engine.dispose()
+
+    if hydrated != aggregated:
+        raise SystemExit("Aggregated totals differ from the hydrated ledger")
+
+    print(
+        json.dumps(
+            {
+                "transactions": row_count,
+                "bets": len(aggregated),
+                "orm_hydration": hydrate_stats,
+                "sql_group_by": aggregate_stats,
+            },
+            indent=2,
+        )
+    )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--database-url", default=os.getenv("DATABASE_URL"))
+    parser.add_argument("--seed", type=int, default=0, help="Synthetic transactions to insert before measuring")
+    parser.add_argument("--bets", type=int, default=2000, help="Synthetic bets to insert with --seed")
+    parser.add_argument("--fanout", type=int, default=8, help="Children per synthetic bet")
+    args = parser.parse_args()
+    if not args.database_url:
+        parser.error("--database-url or DATABASE_URL is required")
+    asyncio.run(run(args))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,155 @@
+"""Microbenchmarks for the in-memory summary pipeline, without a database.
+
+Run from ``backend/``::
+
+    python -m benchmarks.summary_pipeline                  # compare with the stored baseline
+    python -m benchmarks.summary_pipeline --save-baseline  # record a new baseline
+
+Each size gets a synthetic org (see ``benchmarks.synthetic``) and every stage
+is timed in isolation. Results are printed as JSON; when comparing, the
+command exits 1 if any stage's best time is slower than the baseline by more
+than ``--threshold``. Baselines are machine- and interpreter-specific, so
+record one on the machine you compare on, with the supported Python (3.13);
+a comparison against a baseline from another Python version warns.
+"""
+from __future__ import annotations
+
+import argparse
+import gc
+import json
+import platform
+import statistics
+import sys
+import time
+from pathlib import Path
+from typing import Callable
+
+from app import crud, ledger, serialization
+from benchmarks.synthetic import SyntheticOrg, generate_org
+
+BASELINE_PATH = Path(__file__).parent / "baselines" / "summary_pipeline.json"
+DEFAULT_SIZES = (1_000, 10_000, 100_000)
+
+
+def _build_snapshot(org: SyntheticOrg) -> ledger.LedgerSnapshot:
+    snapshot = ledger.LedgerSnapshot([(bet.id, bet.parent_id) for bet in org.bets])
+    snapshot.add_aggregates(org.aggregates)
+    return snapshot
+
+
+def stages(org: SyntheticOrg) -> dict[str, Callable[[], object]]:
+    """Stage name -> zero-argument callable. Inputs are prepared outside the timed call."""
+    snapshot = _build_snapshot(org)
+    rows = org.rows
+    bets, summaries = crud._summarize_rows(rows)
+    roots = [node for node in crud._assemble_tree(bets, summaries).values() if node.parent_id is None]
+    return {
+        "build_snapshot": lambda: _build_snapshot(org),
+        "rollup_totals": snapshot.totals,
+        # Dormancy moved to the background sweeper; per-bet health and inactivity
+        # are now derived while summarizing rollup rows.
+        "summarize": lambda: crud._summarize_rows(rows),
+        "assemble_tree": lambda: crud._assemble_tree(bets, summaries),
+        "serialize_tree": lambda: serialization.encode_forest(roots),
+    }
+
+
+def time_stage(function: Callable[[], object], repeat: int) -> dict:
+    samples = []
+    for _ in range(repeat):
+        gc.collect()
+        started = time.perf_counter()
+        function()
+        samples.append(time.perf_counter() - started)
+    return {"best": round(min(samples), 6), "median": round(statistics.median(samples), 6)}
+
+
+def run(sizes: list[int], depth: int, fanout: int, transactions_per_bet: int, repeat: int) -> dict:
+    results: dict[str, dict] = {}
+    for size in sizes:
+        org = generate_org(size, depth=depth, fanout=fanout, transactions_per_bet=transactions_per_bet)
+        # Large orgs get fewer repeats so the full suite stays in the minutes range.
+        size_repeat = max(1, repeat if size <= 10_000 else repeat // 2)
+        results[str(size)] = {name: time_stage(function, size_repeat) for name, function in stages(org).items()}
+        print(f"{size} bets: {json.dumps(results[str(size)])}", file=sys.stderr)
+    return {
+        "config": {
+            "depth": depth,
+            "fanout": fanout,
+            "transactions_per_bet": transactions_per_bet,
+            "repeat": repeat,
+            "python": platform.python_version(),
+            "python_implementation": platform.python_implementation(),
+            "machine": platform.machine(),
+        },
+        "results": results,
+    }
+
+
+def compare(current: dict, baseline: dict, threshold: float) -> list[dict]:
+    report = []
+    for size, stage_results in current["results"].items():
+        for stage, timing in stage_results.items():
+            reference = baseline.get("results", {}).get(size, {}).get(stage)
+            if not reference or not reference["best"]:
+                continue
+            ratio = timing["best"] / reference["best"]
+            report.append(
+                {
+                    "bets": int(size),
+                    "stage": stage,
+                    "baseline": reference["best"],
+                    "current": timing["best"],
+                    "ratio": round(ratio, 3),
+                    "regressed": ratio > 1 + threshold,
+                }
+            )
+    return report
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes", type=int, nargs="+", default=list(DEFAULT_SIZES))
+    parser.add_argument("--depth", type=int, default=6)
+    parser.add_argument("--fanout", type=int, default=8)
+    parser.add_argument("--transactions-per-bet", type=int, default=5)
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--threshold", type=float, default=0.25, help="Allowed slowdown before failing (0.25 = 25%%)")
+    parser.add_argument("--baseline", type=Path, default=BASELINE_PATH)
+    parser.add_argument("--save-baseline", action="store_true", help="Write results to --baseline instead of comparing")
+    args = parser.parse_args()
+
+    current = run(args.sizes, args.depth, args.fanout, args.transactions_per_bet, args.repeat)
+
+    if args.save_baseline:
+        args.baseline.parent.mkdir(parents=True, exist_ok=True)
+        args.baseline.write_text(json.dumps(current, indent=2) + "\n")
+        print(json.dumps(current, indent=2))
+        return
+
+    if not args.baseline.exists():
+        print(json.dumps(current, indent=2))
+        raise SystemExit(f"No baseline at {args.baseline}; run with --save-baseline first")
+
+    baseline = json.loads(args.baseline.read_text())
+    baseline_python = baseline.get("config", {}).get("python", "unknown")
+    if baseline_python.split(".")[:2] != current["config"]["python"].split(".")[:2]:
+        print(
+            f"Warning: baseline was recorded on Python {baseline_python}, this run is on "
+            f"{current['config']['python']}; timings are not comparable",
+            file=sys.stderr,
+        )
+    report = compare(current, baseline, args.threshold)
+    summary = {
+        "threshold": args.threshold,
+        "python": current["config"]["python"],
+        "baseline_python": baseline_python,
+        "stages": report,
+    }
+    print(json.dumps(summary, indent=2))
+    if any(entry["regressed"] for entry in report):
+        raise SystemExit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,102 @@
+"""Synthetic organisations for benchmarking the summary pipeline without a database.
+
+``generate_org`` builds transient ``Bet`` and ``BetRollup`` objects plus the
+per-bet ledger aggregates the rollup recompute consumes. Bets are laid out
+breadth-first: each bet gets up to ``fanout`` children until ``depth`` levels
+exist, after which further bets start new root trees.
+"""
+from __future__ import annotations
+
+import random
+import uuid
+from collections import namedtuple
+from dataclasses import dataclass
+from datetime import datetime, timedelta
+from decimal import Decimal
+
+from app import ledger
+from app.models import Bet, BetRollup, BetStatus
+
+LedgerAggregate = namedtuple("LedgerAggregate", "bet_id direct_revenue direct_expenses last_transaction_at")
+
+
+@dataclass
+class SyntheticOrg:
+    bets: list[Bet]
+    aggregates: list[LedgerAggregate]
+    rollups: dict[uuid.UUID, BetRollup]
+    transaction_count: int
+
+    @property
+    def rows(self) -> list[tuple[Bet, BetRollup]]:
+        return [(bet, self.rollups[bet.id]) for bet in self.bets]
+
+
+def _breadth_first_parents(bet_count: int, depth: int, fanout: int) -> list[int]:
+    parents = [-1] * bet_count
+    levels = [0] * bet_count
+    child_counts = [0] * bet_count
+    open_parent = 0
+    for index in range(1, bet_count):
+        while open_parent < index and (levels[open_parent] >= depth - 1 or child_counts[open_parent] >= fanout):
+            open_parent += 1
+        if open_parent >= index:
+            # The current forest is full; start a new root at this index.
+            open_parent = index
+            continue
+        parents[index] = open_parent
+        levels[index] = levels[open_parent] + 1
+        child_counts[open_parent] += 1
+    return parents
+
+
+def generate_org(
+    bet_count: int,
+    depth: int = 6,
+    fanout: int = 8,
+    transactions_per_bet: int = 5,
+    seed: int = 0,
+) -> SyntheticOrg:
+    rng = random.Random(seed)
+    now = datetime.utcnow()
+    ids = [uuid.UUID(int=rng.getrandbits(128), version=4) for _ in range(bet_count)]
+    parents = _breadth_first_parents(bet_count, depth, fanout)
+
+    bets = []
+    aggregates = []
+    for index, bet_id in enumerate(ids):
+        created_at = now - timedelta(days=rng.randrange(1, 720))
+        bets.append(
+            Bet(
+                id=bet_id,
+                name=f"bench-{index}",
+                description=None,
+                budget=Decimal(rng.randrange(10_000, 10_000_000)).scaleb(-2),
+                status=BetStatus.ACTIVE,
+                flagged=False,
+                parent_id=ids[parents[index]] if parents[index] >= 0 else None,
+                created_at=created_at,
+                updated_at=created_at,
+            )
+        )
+        if not transactions_per_bet:
+            continue
+        revenue = expenses = Decimal("0")
+        last = None
+        for _ in range(transactions_per_bet):
+            amount = Decimal(rng.randrange(1, 100_000)).scaleb(-2)
+            if rng.random() < 0.25:
+                revenue += amount
+            else:
+                expenses += amount
+            moment = now - timedelta(days=rng.randrange(0, 365))
+            last = moment if last is None or moment > last else last
+        aggregates.append(LedgerAggregate(bet_id, revenue, expenses, last))
+
+    snapshot = ledger.LedgerSnapshot([(bet.id, bet.parent_id) for bet in bets])
+    snapshot.add_aggregates(aggregates)
+    totals, last_tx_map = snapshot.totals()
+    rollups = {
+        bet.id: BetRollup(bet_id=bet.id, last_transaction_at=last_tx_map[bet.id], **totals[bet.id]) for bet in bets
+    }
+    return SyntheticOrg(bets, aggregates, rollups, bet_count * transactions_per_bet)
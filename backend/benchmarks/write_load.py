@@ -0,0 +1,111 @@
+"""Concurrent write load test against a running server.
+
+Run from ``backend/``::
+
+    python -m benchmarks.write_load --url http://localhost:8000 --concurrency 32 --requests 2000
+
+Creates a parent bet, then posts ledger rows and child bets from
+``--concurrency`` threads at once. Each child asks for ``--child-budget`` and
+the parent only has room for ``--children-fit`` of them, so most child
+creations must be rejected. The report gives latency percentiles per operation
+and checks that the accepted children still fit the parent's budget.
+"""
+from __future__ import annotations
+
+import argparse
+import json
+import time
+import urllib.error
+import urllib.request
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from decimal import Decimal
+
+
+def _request(method: str, url: str, payload: dict | None = None) -> tuple[int, float, object]:
+    data = None if payload is None else json.dumps(payload).encode("utf-8")
+    request = urllib.request.Request(url, data=data, method=method, headers={"Content-Type": "application/json"})
+    started = time.perf_counter()
+    try:
+        with urllib.request.urlopen(request) as response:
+            body = response.read()
+            status = response.status
+    except urllib.error.HTTPError as exc:
+        body = exc.read()
+        status = exc.code
+    elapsed = time.perf_counter() - started
+    return status, elapsed, json.loads(body) if body else None
+
+
+def _percentiles(samples: list[float]) -> dict:
+    if not samples:
+        return {}
+    ordered = sorted(samples)
+
+    def at(fraction: float) -> float:
+        return round(ordered[min(len(ordered) - 1, int(fraction * len(ordered)))] * 1000, 2)
+
+    return {"count": len(ordered), "p50_ms": at(0.50), "p95_ms": at(0.95), "p99_ms": at(0.99), "max_ms": at(1.0)}
+
+
+def run(url: str, concurrency: int, requests: int, child_budget: Decimal, children_fit: int) -> dict:
+    url = url.rstrip("/")
+    run_id = uuid.uuid4().hex[:8]
+    status, _, parent = _request(
+        "POST",
+        f"{url}/v1/bets/",
+        {"name": f"write-load-{run_id}", "budget": str(child_budget * children_fit)},
+    )
+    if status != 201:
+        raise SystemExit(f"Could not create the parent bet: {status} {parent}")
+
+    def operation(index: int) -> tuple[str, int, float]:
+        if index % 4 == 0:
+            payload = {"name": f"write-load-{run_id}-{index}", "budget": str(child_budget), "parent_id": parent["id"]}
+            status, elapsed, _ = _request("POST", f"{url}/v1/bets/", payload)
+            return "create_bet", status, elapsed
+        payload = {"bet_id": parent["id"], "amount": "1.00", "type": "EXPENSE", "description": f"load {index}"}
+        status, elapsed, _ = _request("POST", f"{url}/v1/transactions/", payload)
+        return "create_transaction", status, elapsed
+
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        results = list(pool.map(operation, range(requests)))
+    elapsed = time.perf_counter() - started
+
+    report: dict = {"requests": requests, "concurrency": concurrency, "seconds": round(elapsed, 3), "operations": {}}
+    for name in sorted({name for name, _, _ in results}):
+        matching = [(status, seconds) for op, status, seconds in results if op == name]
+        report["operations"][name] = {
+            "statuses": {str(code): [status for status, _ in matching].count(code) for code in {s for s, _ in matching}},
+            **_percentiles([seconds for _, seconds in matching]),
+        }
+
+    _, _, children = _request("GET", f"{url}/v1/bets/{parent['id']}/children")
+    allocated = sum(Decimal(child["budget"]) for child in children or [])
+    report["allocation"] = {
+        "parent_budget": str(child_budget * children_fit),
+        "children": len(children or []),
+        "allocated": str(allocated),
+        "within_budget": allocated <= child_budget * children_fit,
+    }
+    return report
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--url", required=True, help="Base URL of a running server")
+    parser.add_argument("--concurrency", type=int, default=32)
+    parser.add_argument("--requests", type=int, default=2000)
+    parser.add_argument("--child-budget", type=Decimal, default=Decimal("100.00"))
+    parser.add_argument("--children-fit", type=int, default=10)
+    args = parser.parse_args()
+
+    report = run(args.url, args.concurrency, args.requests, args.child_budget, args.children_fit)
+    print(json.dumps(report, indent=2))
+    if not report["allocation"]["within_budget"]:
+        raise SystemExit(1)
+
+
+if __name__ == "__main__":
+    main()
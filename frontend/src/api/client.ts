@@ -13,6 +13,8 @@ const request = async <T>(path: string, options: RequestOptions = {}) => {
   }
 
   const response = await fetch(`${API_PREFIX}${path}`, {
+    // Sends the backend's read-your-writes cookie, which keeps reads after a write on the primary.
+    credentials: 'include',
     ...options,
     headers,
     body: options.json !== undefined ? JSON.stringify(options.json) : options.body
@@ -6,6 +6,8 @@ console.log('Configured API_URL:', API_URL);
 
 export const apiClient = axios.create({
   baseURL: API_URL,
+  // Sends the backend's read-your-writes cookie, which keeps reads after a write on the primary.
+  withCredentials: true,
   headers: {
     'Content-Type': 'application/json',
   },